@@ -0,0 +1,160 @@
+"""
+Admission Control Module
+Bounded concurrency around LLM generation with a short, per-client fair
+wait queue and fast rejection when the queue is full
+"""
+from typing import Dict
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+import math
+import threading
+import time
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A queued request waiting for a generation slot"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    """Concurrency limiter with round-robin fair queuing across clients"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 max_queued_per_client: int):
+        """
+        Initialize admission controller
+
+        Args:
+            max_concurrent: Requests allowed to run generation at once
+            max_queue: Requests allowed to wait for a slot
+            queue_timeout: Seconds a request may wait before being rejected
+            max_queued_per_client: Waiting requests allowed per client
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_queued_per_client = max_queued_per_client
+
+        self.active = 0
+        self.queue_depth = 0
+        self.counters = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_client_limit": 0,
+            "rejected_timeout": 0
+        }
+        self.service_time_ewma = None
+
+        # client_id -> deque of waiters, rotated for round-robin service
+        self._queues = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up for a new request"""
+        service_time = self.service_time_ewma or 1.0
+        backlog = (self.queue_depth + self.active) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(service_time * backlog))
+
+    def _reject(self, counter: str, reason: str):
+        self.counters[counter] += 1
+        raise AdmissionRejected(reason, self._retry_after())
+
+    def _acquire(self, client_id: str):
+        with self._lock:
+            if self.active < self.max_concurrent and self.queue_depth == 0:
+                self.active += 1
+                self.counters["admitted"] += 1
+                return
+
+            if self.queue_depth >= self.max_queue:
+                self._reject("rejected_queue_full", "Server busy: wait queue is full")
+
+            client_queue = self._queues.get(client_id)
+            if client_queue is not None and len(client_queue) >= self.max_queued_per_client:
+                self._reject("rejected_client_limit", "Too many pending questions from this client")
+
+            waiter = _Waiter()
+            if client_queue is None:
+                client_queue = self._queues[client_id] = deque()
+            client_queue.append(waiter)
+            self.queue_depth += 1
+            self.counters["queued"] += 1
+
+        waiter.event.wait(self.queue_timeout)
+
+        with self._lock:
+            if waiter.granted:
+                self.counters["admitted"] += 1
+                return
+
+            client_queue.remove(waiter)
+            if not client_queue:
+                del self._queues[client_id]
+            self.queue_depth -= 1
+            self._reject("rejected_timeout", "Timed out waiting for a generation slot")
+
+    def _release(self, service_time: float):
+        with self._lock:
+            if self.service_time_ewma is None:
+                self.service_time_ewma = service_time
+            else:
+                self.service_time_ewma = 0.2 * service_time + 0.8 * self.service_time_ewma
+
+            if not self._queues:
+                self.active -= 1
+                return
+
+            # Hand the slot to the head waiter of the next client in rotation
+            client_id, client_queue = self._queues.popitem(last=False)
+            waiter = client_queue.popleft()
+            if client_queue:
+                self._queues[client_id] = client_queue
+            self.queue_depth -= 1
+
+            waiter.granted = True
+            waiter.event.set()
+
+    @contextmanager
+    def admit(self, client_id: str):
+        """
+        Hold a generation slot for the duration of the block
+
+        Args:
+            client_id: Identifier used for fair queuing (e.g. client IP)
+
+        Raises:
+            AdmissionRejected: When the queue is full or the wait times out
+        """
+        self._acquire(client_id)
+        start_time = time.time()
+        try:
+            yield
+        finally:
+            self._release(time.time() - start_time)
+
+    def stats(self) -> Dict:
+        """Queue depth, active slots and rejection counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats.update({
+                "active": self.active,
+                "queue_depth": self.queue_depth,
+                "waiting_clients": len(self._queues),
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "service_time_ewma": self.service_time_ewma
+            })
+        return stats
@@ -2,11 +2,13 @@
 Flask Web Server for AI Teaching Assistant
 Provides REST API for the teaching assistant
 """
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template
+from itertools import chain
 from flask_cors import CORS
 from main import AITeachingAssistant
 from config import Config
-import os
+from admission import AdmissionController, AdmissionRejected
+from readiness import IndexLoader
 
 app = Flask(__name__)
 CORS(app)
@@ -14,10 +16,21 @@ CORS(app)
 # Initialize Teaching Assistant
 ta = AITeachingAssistant()
 
-# Try to load existing knowledge base
-if os.path.exists(Config.VECTOR_STORE_PATH):
-    ta.load_knowledge_base()
-    ta.initialize_rag()
+# Bound concurrent generations; excess requests queue briefly or get a 429
+admission = AdmissionController(
+    max_concurrent=Config.ADMISSION_MAX_CONCURRENT,
+    max_queue=Config.ADMISSION_MAX_QUEUE,
+    queue_timeout=Config.ADMISSION_QUEUE_TIMEOUT,
+    max_queued_per_client=Config.ADMISSION_MAX_QUEUED_PER_CLIENT
+)
+
+# Load an existing knowledge base in the background so the port opens
+# immediately; /api/health/ready reports progress until it is usable.
+# Snapshots published later (by any process) are hot-swapped in.
+index_loader = IndexLoader(ta, Config.VECTOR_STORE_PATH,
+                           retry_after=Config.INDEX_READY_RETRY_AFTER,
+                           watch_interval=Config.SNAPSHOT_WATCH_INTERVAL)
+index_loader.start(background=Config.INDEX_BACKGROUND_LOAD)
 
 
 @app.route('/')
@@ -31,10 +44,50 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
+        'ready': index_loader.ready,
         'knowledge_base_loaded': ta.vector_store_manager.vector_store is not None
     })
 
 
+def client_id():
+    """Client identity used for fair queuing"""
+    return request.headers.get('X-Client-Id') or request.remote_addr or 'anonymous'
+
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    """Liveness probe: the process is up, even while the index loads"""
+    return jsonify(index_loader.live())
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: 200 once the knowledge base is loaded, else 503"""
+    status = index_loader.status()
+    if status['ready']:
+        return jsonify(status)
+    return jsonify(status), 503, {'Retry-After': str(index_loader.retry_after)}
+
+
+def not_ready():
+    """503 + Retry-After for requests that arrive before the index is loaded"""
+    message = ('Knowledge base failed to load' if index_loader.state == 'failed'
+               else 'Knowledge base is still loading, retry shortly')
+    return jsonify({
+        'error': message,
+        'readiness': index_loader.status()
+    }), 503, {'Retry-After': str(index_loader.retry_after)}
+
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Admission control queue depth, rejection and coalescing counters"""
+    return jsonify({
+        'admission': admission.stats(),
+        'coalescing': ta.singleflight.stats()
+    })
+
+
 @app.route('/api/ask', methods=['POST'])
 def ask_question():
     """
@@ -45,6 +98,9 @@ def ask_question():
         "question": "Your question here"
     }
     """
+    if not index_loader.ready:
+        return not_ready()
+    
     try:
         data = request.get_json()
         
@@ -60,10 +116,62 @@ def ask_question():
                 'error': 'Knowledge base not loaded. Please upload course materials first.'
             }), 503
         
-        response = ta.ask(question, verbose=False)
+        cid = client_id()
+        response = ta.ask(question, verbose=False, guard=lambda: admission.admit(cid))
         
         return jsonify(response)
     
+    except AdmissionRejected as e:
+        return jsonify({
+            'error': str(e)
+        }), 429, {'Retry-After': str(e.retry_after)}
+    
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/ask/stream', methods=['POST'])
+def ask_question_stream():
+    """
+    Stream the answer as plain text; identical concurrent questions
+    share one generation
+    
+    Request body:
+    {
+        "question": "Your question here"
+    }
+    """
+    if not index_loader.ready:
+        return not_ready()
+    
+    try:
+        data = request.get_json()
+        
+        if not data or 'question' not in data:
+            return jsonify({
+                'error': 'Missing question in request body'
+            }), 400
+        
+        if not ta.vector_store_manager.vector_store:
+            return jsonify({
+                'error': 'Knowledge base not loaded. Please upload course materials first.'
+            }), 503
+        
+        cid = client_id()
+        tokens = ta.ask_stream(data['question'], guard=lambda: admission.admit(cid))
+        
+        # Pull the first fragment eagerly so admission rejections become a 429
+        first = next(tokens, '')
+        
+        return Response(chain([first], tokens), mimetype='text/plain')
+    
+    except AdmissionRejected as e:
+        return jsonify({
+            'error': str(e)
+        }), 429, {'Retry-After': str(e.retry_after)}
+    
     except Exception as e:
         return jsonify({
             'error': str(e)
@@ -81,10 +189,19 @@ def upload_materials():
             "youtube": ["url1", "url2"],
             "pdf": ["path1", "path2"],
             "wikipedia": ["query1"],
-            "text": ["path1"]
-        }
+            "text": ["path1"],
+            "directory": ["course/", "notes/*.md"]
+        },
+        "pipelined": false,
+        "incremental": false
     }
+    
+    With "incremental": true only files of 'directory' sources that are
+    new, modified or deleted since the last update are (re)indexed.
     """
+    if not index_loader.accepts_uploads:
+        return not_ready()
+    
     try:
         data = request.get_json()
         
@@ -95,6 +212,49 @@ def upload_materials():
         
         sources = data['sources']
         
+        if data.get('incremental'):
+            # Index only new, modified and deleted files of 'directory' sources
+            if not sources.get('directory'):
+                return jsonify({
+                    'error': "Incremental updates need 'directory' sources"
+                }), 400
+            
+            report = ta.update_course_materials(sources)
+            changed = report['chunks_indexed'] or any(
+                report.get(name) for name in ('modified', 'removed')
+            )
+            if changed:
+                ta.save_knowledge_base()
+                ta.initialize_rag()
+                index_loader.rebuilt()
+            
+            return jsonify({
+                'message': 'Course materials updated successfully' if changed
+                           else 'Course materials are up to date',
+                'chunks_created': report['chunks_indexed'],
+                'update': report
+            })
+        
+        if data.get('pipelined'):
+            # Overlap loading, splitting, embedding and indexing
+            report = ta.ingest_pipelined(sources)
+            
+            if not report['chunks_indexed']:
+                return jsonify({
+                    'error': 'No documents loaded'
+                }), 400
+            
+            ta.save_knowledge_base()
+            ta.initialize_rag()
+            index_loader.rebuilt()
+            
+            return jsonify({
+                'message': 'Course materials uploaded successfully',
+                'documents_loaded': report['documents_loaded'],
+                'chunks_created': report['chunks_created'],
+                'pipeline': report
+            })
+        
         # Load materials
         documents = ta.load_course_materials(sources)
         
@@ -111,6 +271,7 @@ def upload_materials():
         
         # Initialize RAG
         ta.initialize_rag()
+        index_loader.rebuilt()
         
         return jsonify({
             'message': 'Course materials uploaded successfully',
@@ -135,6 +296,9 @@ def similarity_search():
         "k": 4
     }
     """
+    if not index_loader.ready:
+        return not_ready()
+    
     try:
         data = request.get_json()
         
@@ -180,7 +344,11 @@ if __name__ == '__main__':
     print(f"Server running at: http://localhost:5000")
     print(f"API Endpoints:")
     print(f"  - GET  /api/health")
+    print(f"  - GET  /api/health/live")
+    print(f"  - GET  /api/health/ready")
+    print(f"  - GET  /api/metrics")
     print(f"  - POST /api/ask")
+    print(f"  - POST /api/ask/stream")
     print(f"  - POST /api/upload")
     print(f"  - POST /api/search")
     print("=" * 60 + "\n")
@@ -0,0 +1,198 @@
+"""
+ASGI Web Server for AI Teaching Assistant
+Async variant of the REST API: one process can hold hundreds of pending
+questions while generation runs on a pooled async HTTP client.
+
+Run with:
+    python app_asgi.py
+    TA_BACKEND=ollama python app_asgi.py
+    uvicorn app_asgi:app --host 0.0.0.0 --port 5000
+"""
+import asyncio
+import contextlib
+import os
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from readiness import IndexLoader
+
+BACKEND = os.getenv('TA_BACKEND', 'openai').lower()
+
+if BACKEND == 'ollama':
+    from main_ollama import AITeachingAssistantOllama as Assistant
+    from config_ollama import ConfigOllama as BackendConfig
+else:
+    from main import AITeachingAssistant as Assistant
+    from config import Config as BackendConfig
+
+# Initialize Teaching Assistant
+ta = Assistant()
+
+# Knowledge base loads in the background once the server starts; new
+# snapshots are hot-swapped in (FAISS only, Chroma persists in place)
+index_loader = IndexLoader(ta, BackendConfig.VECTOR_STORE_PATH,
+                           retry_after=BackendConfig.INDEX_READY_RETRY_AFTER,
+                           watch_interval=0 if BACKEND == 'ollama' else BackendConfig.SNAPSHOT_WATCH_INTERVAL)
+
+
+async def health_check(request):
+    """Health check endpoint"""
+    return JSONResponse({
+        'status': 'healthy',
+        'ready': index_loader.ready,
+        'knowledge_base_loaded': ta.vector_store_manager.vector_store is not None,
+        'backend': BACKEND,
+        'llm_in_flight': ta.rag_chain.async_llm.in_flight if ta.rag_chain else 0
+    })
+
+
+async def liveness(request):
+    """Liveness probe: the process is up, even while the index loads"""
+    return JSONResponse(index_loader.live())
+
+
+async def readiness(request):
+    """Readiness probe: 200 once the knowledge base is loaded, else 503"""
+    status = index_loader.status()
+    if status['ready']:
+        return JSONResponse(status)
+    return JSONResponse(status, status_code=503,
+                        headers={'Retry-After': str(index_loader.retry_after)})
+
+
+def not_ready():
+    """503 + Retry-After for requests that arrive before the index is loaded"""
+    message = ('Knowledge base failed to load' if index_loader.state == 'failed'
+               else 'Knowledge base is still loading, retry shortly')
+    return JSONResponse({
+        'error': message,
+        'readiness': index_loader.status()
+    }, status_code=503, headers={'Retry-After': str(index_loader.retry_after)})
+
+
+async def ask_question(request):
+    """
+    Ask a question to the teaching assistant
+
+    Request body:
+    {
+        "question": "Your question here"
+    }
+    """
+    if not index_loader.ready:
+        return not_ready()
+
+    try:
+        data = await request.json()
+
+        if not data or 'question' not in data:
+            return JSONResponse({
+                'error': 'Missing question in request body'
+            }, status_code=400)
+
+        if not ta.vector_store_manager.vector_store:
+            return JSONResponse({
+                'error': 'Knowledge base not loaded. Please upload course materials first.'
+            }, status_code=503)
+
+        response = await ta.aask(data['question'])
+
+        return JSONResponse(response)
+
+    except Exception as e:
+        return JSONResponse({
+            'error': str(e)
+        }, status_code=500)
+
+
+async def similarity_search(request):
+    """
+    Perform similarity search
+
+    Request body:
+    {
+        "query": "search query",
+        "k": 4
+    }
+    """
+    if not index_loader.ready:
+        return not_ready()
+
+    try:
+        data = await request.json()
+
+        if not data or 'query' not in data:
+            return JSONResponse({
+                'error': 'Missing query in request body'
+            }, status_code=400)
+
+        query = data['query']
+        k = data.get('k', BackendConfig.TOP_K_RESULTS)
+
+        if not ta.vector_store_manager.vector_store:
+            return JSONResponse({
+                'error': 'Knowledge base not loaded'
+            }, status_code=503)
+
+        results = await asyncio.to_thread(
+            ta.vector_store_manager.similarity_search_with_score, query, k
+        )
+
+        return JSONResponse({
+            'query': query,
+            'results': [
+                {
+                    'content': doc.page_content,
+                    'metadata': doc.metadata,
+                    'score': float(score)
+                }
+                for doc, score in results
+            ]
+        })
+
+    except Exception as e:
+        return JSONResponse({
+            'error': str(e)
+        }, status_code=500)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    """Start loading the knowledge base and close the HTTP pool on shutdown"""
+    if BackendConfig.INDEX_BACKGROUND_LOAD:
+        index_loader.start()
+    else:
+        await asyncio.to_thread(index_loader.start, False)
+    yield
+    if ta.rag_chain is not None:
+        await ta.rag_chain.async_llm.aclose()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/health/live', liveness, methods=['GET']),
+        Route('/api/health/ready', readiness, methods=['GET']),
+        Route('/api/ask', ask_question, methods=['POST']),
+        Route('/api/search', similarity_search, methods=['POST']),
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("\n" + "=" * 60)
+    print(f"Starting AI Teaching Assistant ASGI Server ({BACKEND})")
+    print("=" * 60)
+    print(f"Server running at: http://localhost:5000")
+    print(f"API Endpoints:")
+    print(f"  - GET  /api/health")
+    print(f"  - GET  /api/health/live")
+    print(f"  - GET  /api/health/ready")
+    print(f"  - POST /api/ask")
+    print(f"  - POST /api/search")
+    print("=" * 60 + "\n")
+
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,154 @@
+"""
+Async LLM Client Module
+Pooled asyncio HTTP clients for Ollama and OpenAI generation
+"""
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+import httpx
+
+
+class AsyncLLMClient(ABC):
+    """Shared keep-alive HTTP pool with a cap on in-flight generations"""
+
+    def __init__(self, base_url: str, max_in_flight: int, max_connections: int,
+                 max_keepalive: int, timeout: float, connect_timeout: float,
+                 headers: Optional[Dict[str, str]] = None):
+        """
+        Initialize async client (connections are opened lazily on first use)
+
+        Args:
+            base_url: Base URL of the LLM HTTP API
+            max_in_flight: Maximum concurrent generation requests
+            max_connections: Maximum pooled HTTP connections
+            max_keepalive: Maximum idle keep-alive connections
+            timeout: Read/write timeout in seconds
+            connect_timeout: Connect timeout in seconds
+            headers: Extra headers sent with every request
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_in_flight = max_in_flight
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.headers = headers or {}
+        self.in_flight = 0
+
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        """Create the pool on the running event loop (one pool per loop)"""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and self._loop is not loop:
+            self._close_stale_client()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=self.limits,
+                timeout=self.timeout,
+                headers=self.headers
+            )
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+        return self._client
+
+    def _close_stale_client(self):
+        """Close the pool created on a previous event loop"""
+        client, loop = self._client, self._loop
+        self._client = self._semaphore = self._loop = None
+        # Its connections belong to that loop, so close them there (runs
+        # immediately if it serves another thread, else when it next runs);
+        # a closed loop can no longer run anything, and dropping the client
+        # lets the transports' finalizers close the sockets
+        if not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+    async def post_json(self, path: str, payload: Dict) -> Dict:
+        """
+        POST a JSON payload through the shared pool
+
+        Args:
+            path: Request path relative to the base URL
+            payload: JSON request body
+
+        Returns:
+            Decoded JSON response
+        """
+        client = self._ensure_client()
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                response = await client.post(path, json=payload)
+                response.raise_for_status()
+                return response.json()
+            finally:
+                self.in_flight -= 1
+
+    @abstractmethod
+    async def generate(self, prompt: str) -> str:
+        """Generate a completion for the prompt"""
+
+    async def aclose(self):
+        """Close pooled connections"""
+        if self._client is not None and self._loop is not asyncio.get_running_loop():
+            self._close_stale_client()
+        elif self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+            self._loop = None
+
+
+class AsyncOllamaClient(AsyncLLMClient):
+    """Async client for the Ollama /api/generate endpoint"""
+
+    def __init__(self, base_url: str, model: str, temperature: float,
+                 balancer=None, **kwargs):
+        """
+        Args:
+            balancer: Optional OllamaLoadBalancer; when set, each request is
+                      routed to the least-loaded healthy server instead of base_url
+        """
+        super().__init__(base_url, **kwargs)
+        self.model = model
+        self.temperature = temperature
+        self.balancer = balancer
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a completion with Ollama (non-streaming)"""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {"temperature": self.temperature}
+        }
+
+        if self.balancer is None:
+            result = await self.post_json('/api/generate', payload)
+        else:
+            with self.balancer.route() as base_url:
+                result = await self.post_json(f"{base_url}/api/generate", payload)
+        return result["response"]
+
+
+class AsyncOpenAIClient(AsyncLLMClient):
+    """Async client for the OpenAI chat completions endpoint"""
+
+    def __init__(self, base_url: str, api_key: str, model: str, temperature: float, **kwargs):
+        headers = {"Authorization": f"Bearer {api_key}"}
+        super().__init__(base_url, headers=headers, **kwargs)
+        self.model = model
+        self.temperature = temperature
+
+    async def generate(self, prompt: str) -> str:
+        """Generate a chat completion with OpenAI"""
+        result = await self.post_json('/chat/completions', {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": self.temperature
+        })
+        return result["choices"][0]["message"]["content"]
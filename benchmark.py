@@ -0,0 +1,392 @@
+"""
+Benchmark Suite for AI Teaching Assistant
+Measures local performance of pipeline components
+
+Usage:
+    python benchmark.py chunker [--file notes.txt] [--repeat 3] [--workers 4]
+    python benchmark.py imports [--module app] [--repeat 3] [--top 8]
+    python benchmark.py pca [--source ./vector_store] [--dims 64,128,256] [--k 4]
+    python benchmark.py routing [--source ./vector_store] [--fan-outs 2,4,8,16] [--k 4]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _sample_corpus(size: int) -> str:
+    """Transcript-like text: long paragraphs, occasional line breaks"""
+    rng = random.Random(42)
+    words = ("the of and to in a is that for it as was with be by on not he this are or "
+             "machine learning gradient descent neural network embedding retrieval vector "
+             "transformer attention lecture student question answer").split()
+    parts = []
+    total = 0
+    while total < size:
+        sentence = " ".join(rng.choice(words) for _ in range(rng.randint(5, 30))) + "."
+        parts.append(sentence)
+        total += len(sentence) + 1
+        roll = rng.random()
+        parts.append("\n\n" if roll < 0.05 else "\n" if roll < 0.15 else " ")
+    return "".join(parts)[:size]
+
+
+def bench_chunker(args):
+    """Compare chars/s and output equivalence of the fast and LangChain splitters"""
+    from text_splitter import TextChunker
+
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = _sample_corpus(args.size)
+
+    print("=" * 60)
+    print(f"Chunker benchmark: {len(text):,} chars, "
+          f"chunk size {args.chunk_size}, overlap {args.chunk_overlap}")
+    print("=" * 60)
+
+    results = {}
+    for splitter in ('recursive', 'fast'):
+        chunker = TextChunker(args.chunk_size, args.chunk_overlap, splitter=splitter)
+        split = chunker.fast_splitter.split_text if splitter == 'fast' else chunker.text_splitter.split_text
+
+        best = None
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            chunks = split(text)
+            elapsed = time.perf_counter() - start_time
+            best = elapsed if best is None else min(best, elapsed)
+
+        results[splitter] = chunks
+        print(f"{splitter:<10} {len(text) / best / 1e6:8.2f} M chars/s  "
+              f"({best * 1000:.1f} ms, {len(chunks)} chunks)")
+
+    identical = results['recursive'] == results['fast']
+    print("-" * 60)
+    print(f"Outputs identical: {identical}")
+    if not identical:
+        for i, (a, b) in enumerate(zip(results['recursive'], results['fast'])):
+            if a != b:
+                print(f"  First difference at chunk {i}")
+                break
+
+    if args.workers > 1:
+        _bench_parallel_chunking(text, args)
+
+
+def _bench_parallel_chunking(text: str, args):
+    """In-process vs process-pool split_documents over the text cut into documents"""
+    from langchain.schema import Document
+    from text_splitter import TextChunker
+
+    rng = random.Random(7)
+    documents = []
+    position = 0
+    while position < len(text):
+        size = rng.choice((5_000, 50_000, 500_000))
+        documents.append(Document(page_content=text[position:position + size],
+                                  metadata={"source": f"doc-{len(documents)}"}))
+        position += size
+
+    chunker = TextChunker(args.chunk_size, args.chunk_overlap)
+    print("-" * 60)
+    print(f"split_documents over {len(documents)} documents")
+    results = {}
+    for workers in (1, args.workers):
+        start_time = time.perf_counter()
+        results[workers] = chunker.split_documents(documents, verbose=False, workers=workers)
+        elapsed = time.perf_counter() - start_time
+        print(f"workers={workers:<3} {len(text) / elapsed / 1e6:8.2f} M chars/s  ({elapsed * 1000:.1f} ms)")
+
+    same = [(c.page_content, c.metadata) for c in results[1]] == \
+           [(c.page_content, c.metadata) for c in results[args.workers]]
+    print(f"Same chunks and ids: {same}")
+
+
+# Cold import budget per entry point (ms, cumulative as reported by -X importtime).
+# verify_setup.py and demo.py do their work in main(), so importing them
+# costs nothing worth budgeting; verify_setup imports every package on
+# purpose when run.
+IMPORT_BUDGETS_MS = {
+    'main': 300,
+    'main_ollama': 300,
+    'app': 400,
+    'app_ollama': 500,
+    'app_asgi': 400,
+}
+
+
+def _import_profile(module: str, env: dict):
+    """Run `python -X importtime -c 'import module'` and parse its report"""
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - start_time
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indent><name>"
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return wall, entries
+
+
+def bench_imports(args):
+    """Cold import time per entry point against IMPORT_BUDGETS_MS"""
+    modules = [args.module] if args.module else list(IMPORT_BUDGETS_MS)
+
+    # No index on disk, so entry points measure imports and construction only
+    env = dict(os.environ)
+    env['VECTOR_STORE_PATH'] = os.path.join(tempfile.gettempdir(), 'benchmark-no-index')
+    env.setdefault('OPENAI_API_KEY', 'sk-benchmark')
+
+    print("=" * 60)
+    print(f"Import-time benchmark (best of {args.repeat})")
+    print("=" * 60)
+
+    over = []
+    failed = []
+    for module in modules:
+        best = None
+        try:
+            for _ in range(args.repeat):
+                wall, entries = _import_profile(module, env)
+                # Report is post-order: the entry's subtree is listed just before it
+                end = max(i for i, e in enumerate(entries) if e[0] == module and e[1] == 0)
+                start = end
+                while start > 0 and entries[start - 1][1] > 0:
+                    start -= 1
+                subtree = entries[start:end + 1]
+                total = subtree[-1][3]
+                if best is None or total < best[1]:
+                    best = (wall, total, subtree)
+        except (RuntimeError, ValueError) as e:
+            print(f"X {module}: {e}")
+            failed.append(module)
+            continue
+
+        wall, total, entries = best
+        budget = IMPORT_BUDGETS_MS.get(module)
+        status = "" if budget is None else ("OVER" if total / 1000 > budget else "ok")
+        if status == "OVER":
+            over.append(module)
+        print(f"{module:<14} {total / 1000:8.1f} ms import  {wall * 1000:8.1f} ms process  "
+              f"budget {budget or '-'} ms  {status}")
+
+        # Heaviest direct dependencies of the entry point
+        children = sorted(
+            (e for e in entries if e[1] == 1),
+            key=lambda e: e[3], reverse=True
+        )[:args.top]
+        for name, _, _, cumulative in children:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+    print("-" * 60)
+    print(f"Over budget: {', '.join(over) if over else 'none'}")
+    if failed:
+        print(f"Failed to import: {', '.join(failed)}")
+    return 1 if over or failed else 0
+
+
+def _sample_embeddings(count: int, dimension: int, seed: int = 42):
+    """Unit vectors with a decaying spectrum, like text embeddings (most variance in few directions)"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    scales = np.arange(1, dimension + 1) ** -0.7
+    rotation, _ = np.linalg.qr(rng.standard_normal((dimension, dimension)))
+    vectors = (rng.standard_normal((count, dimension)) * scales) @ rotation
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def _search_timed(index, queries, k: int):
+    """Top-k ids and mean latency of one-query-at-a-time search (as when serving)"""
+    import numpy as np
+
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    start_time = time.perf_counter()
+    for i in range(len(queries)):
+        _, ids[i] = index.search(queries[i:i + 1], k)
+    return ids, (time.perf_counter() - start_time) / len(queries)
+
+
+def bench_pca(args):
+    """Recall@k, search latency and index size of PCA-projected vs full-dimension flat search"""
+    import faiss
+    import numpy as np
+    from rebuild_index import build_faiss_index
+
+    if args.source:
+        from embedding_store import load_raw
+        from snapshots import current_snapshot, snapshot_path
+        vectors, _ = load_raw(snapshot_path(args.source, current_snapshot(args.source)), mmap=False)
+        vectors = vectors.astype(np.float32)
+        origin = args.source
+    else:
+        vectors = _sample_embeddings(args.size + args.queries, args.dimension)
+        origin = "synthetic"
+
+    # Held-out queries, so no query is its own nearest neighbour
+    rows = np.random.default_rng(7).permutation(len(vectors))
+    queries = np.ascontiguousarray(vectors[rows[:args.queries]])
+    corpus = np.ascontiguousarray(vectors[rows[args.queries:]])
+    full_dimension = corpus.shape[1]
+
+    print("=" * 60)
+    print(f"PCA benchmark: {len(corpus):,} vectors x {full_dimension} dims ({origin}), "
+          f"{len(queries)} queries, k={args.k}")
+    print("=" * 60)
+
+    exact = build_faiss_index(corpus, "Flat", workers=1)
+    truth, baseline_latency = _search_timed(exact, queries, args.k)
+    baseline_bytes = len(faiss.serialize_index(exact))
+    print(f"{'dims':>6} {'recall@k':>9} {'ms/query':>9} {'speedup':>8} {'index MiB':>10} {'fit s':>7}")
+    print(f"{full_dimension:>6} {1.0:9.3f} {baseline_latency * 1000:9.2f} {1.0:7.1f}x "
+          f"{baseline_bytes / 2**20:10.1f} {'-':>7}")
+
+    for dimension in sorted(int(d) for d in args.dims.split(',')):
+        if dimension >= full_dimension:
+            continue
+        start_time = time.perf_counter()
+        index = build_faiss_index(corpus, f"PCA{dimension},Flat", workers=1, train_size=args.train_size)
+        fit_seconds = time.perf_counter() - start_time
+        found, latency = _search_timed(index, queries, args.k)
+        recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+        print(f"{dimension:>6} {recall:9.3f} {latency * 1000:9.2f} {baseline_latency / latency:7.1f}x "
+              f"{len(faiss.serialize_index(index)) / 2**20:10.1f} {fit_seconds:7.1f}")
+
+
+def _sample_documents(documents: int, chunks_per_document: int, dimension: int, seed: int = 42):
+    """
+    Chunk embeddings clustered by document: documents share one of a few
+    subjects (as lectures of one course do), chunks vary around their document
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    subjects = rng.standard_normal((max(documents // 50, 1), dimension)).astype(np.float32)
+    topics = subjects[rng.integers(len(subjects), size=documents)] + \
+        0.4 * rng.standard_normal((documents, dimension)).astype(np.float32)
+    keys = np.repeat(np.arange(documents), chunks_per_document)
+    vectors = topics[keys] + 2.0 * rng.standard_normal((len(keys), dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors, [f"doc-{key}" for key in keys]
+
+
+def bench_routing(args):
+    """Recall@k and latency of two-stage (document, then chunk) vs flat search"""
+    import numpy as np
+    from document_router import DocumentRouter
+    from rebuild_index import build_faiss_index
+
+    if args.source:
+        from embedding_store import load_raw
+        from snapshots import current_snapshot, snapshot_path
+        vectors, chunks = load_raw(snapshot_path(args.source, current_snapshot(args.source)), mmap=False)
+        vectors = vectors.astype(np.float32)
+        keys = [chunk["metadata"].get("source", "") for chunk in chunks]
+        origin = args.source
+    else:
+        vectors, keys = _sample_documents(args.documents, args.chunks_per_document, args.dimension)
+        origin = "synthetic"
+
+    rows = np.random.default_rng(7).permutation(len(vectors))
+    query_rows, corpus_rows = np.sort(rows[:args.queries]), np.sort(rows[args.queries:])
+    queries = np.ascontiguousarray(vectors[query_rows])
+    corpus = np.ascontiguousarray(vectors[corpus_rows])
+    corpus_keys = [keys[row] for row in corpus_rows]
+    if args.query_noise:
+        # Questions are worded differently from the lecture chunk they target
+        noise = np.random.default_rng(11).standard_normal(queries.shape).astype(np.float32)
+        queries += args.query_noise * noise / np.sqrt(queries.shape[1])
+        queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    start_time = time.perf_counter()
+    router = DocumentRouter.build(corpus_keys, lambda positions: corpus[positions])
+    build_seconds = time.perf_counter() - start_time
+
+    print("=" * 60)
+    print(f"Routing benchmark: {len(corpus):,} chunks in {len(router.keys):,} documents "
+          f"({origin}), {len(queries)} queries, k={args.k}")
+    print(f"Centroid index built in {build_seconds:.2f}s")
+    print("=" * 60)
+
+    exact = build_faiss_index(corpus, "Flat", workers=1)
+    truth, flat_latency = _search_timed(exact, queries, args.k)
+    print(f"{'fan-out':>8} {'recall@k':>9} {'chunks/q':>9} {'ms/query':>9} {'speedup':>8}")
+    print(f"{'flat':>8} {1.0:9.3f} {len(corpus):9,} {flat_latency * 1000:9.2f} {1.0:7.1f}x")
+
+    for fan_out in sorted(int(f) for f in args.fan_outs.split(',')):
+        found = []
+        start_time = time.perf_counter()
+        for query in queries:
+            positions, _ = router.search(query, args.k, fan_out, lambda p: corpus[p])
+            found.append(positions)
+        latency = (time.perf_counter() - start_time) / len(queries)
+        recall = np.mean([len(set(f) & set(t)) / args.k for f, t in zip(found, truth)])
+        scanned = np.mean([sum(len(router.members[d]) for d in router.route(q, fan_out)) for q in queries])
+        print(f"{fan_out:>8} {recall:9.3f} {scanned:9,.0f} {latency * 1000:9.2f} {flat_latency / latency:7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Teaching Assistant benchmarks")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    chunker = subparsers.add_parser('chunker', help='Fast vs LangChain chunker')
+    chunker.add_argument('--file', help='Text file to split (default: synthetic transcript)')
+    chunker.add_argument('--size', type=int, default=5_000_000, help='Synthetic corpus size in chars')
+    chunker.add_argument('--chunk-size', type=int, default=1000)
+    chunker.add_argument('--chunk-overlap', type=int, default=200)
+    chunker.add_argument('--repeat', type=int, default=3)
+    chunker.add_argument('--workers', type=int, default=1,
+                         help='Also compare split_documents in-process vs this many processes')
+    chunker.set_defaults(func=bench_chunker)
+
+    imports = subparsers.add_parser('imports', help='Cold import time per entry point')
+    imports.add_argument('--module', help='Single module to profile (default: all entry points)')
+    imports.add_argument('--repeat', type=int, default=3)
+    imports.add_argument('--top', type=int, default=8, help='Heaviest direct imports to list')
+    imports.set_defaults(func=bench_imports)
+
+    pca = subparsers.add_parser('pca', help='Recall/latency of PCA-projected vs full-dimension search')
+    pca.add_argument('--source', help='Knowledge base whose saved raw embeddings to use '
+                                      '(default: synthetic embeddings)')
+    pca.add_argument('--dims', default='64,128,256,512', help='Comma-separated target dimensions')
+    pca.add_argument('--k', type=int, default=4, help='Results per query (TOP_K_RESULTS)')
+    pca.add_argument('--queries', type=int, default=200, help='Held-out query vectors')
+    pca.add_argument('--size', type=int, default=50_000, help='Synthetic corpus size in vectors')
+    pca.add_argument('--dimension', type=int, default=1536, help='Synthetic vector dimension (ada-002)')
+    pca.add_argument('--train-size', type=int, default=100000, help='Maximum vectors used to fit PCA')
+    pca.set_defaults(func=bench_pca)
+
+    routing = subparsers.add_parser('routing', help='Two-stage (document -> chunk) vs flat search')
+    routing.add_argument('--source', help='Knowledge base whose saved raw embeddings to use '
+                                          '(default: synthetic documents)')
+    routing.add_argument('--fan-outs', default='1,4,8,16,32,48,64', help='Comma-separated documents searched')
+    routing.add_argument('--k', type=int, default=4, help='Results per query (TOP_K_RESULTS)')
+    routing.add_argument('--queries', type=int, default=200, help='Held-out query vectors')
+    routing.add_argument('--query-noise', type=float, default=1.0,
+                         help='Noise norm added to each (unit) held-out query vector')
+    routing.add_argument('--documents', type=int, default=2000, help='Synthetic documents')
+    routing.add_argument('--chunks-per-document', type=int, default=50)
+    routing.add_argument('--dimension', type=int, default=1536, help='Synthetic vector dimension (ada-002)')
+    routing.set_defaults(func=bench_routing)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args) or 0)
+
+
+if __name__ == "__main__":
+    main()
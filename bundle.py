@@ -0,0 +1,301 @@
+"""
+Knowledge Base Bundle Module
+Exports the live snapshot as one checksummed, compressed bundle and imports
+it on another node, so new serving nodes start without re-running ingestion.
+
+Bundle layout (a gzip-compressed tar, readable as a stream):
+    bundle.json          format, embedding-model identity, counts, sha256 per file
+    index.faiss          FAISS index exactly as written by faiss.write_index
+    chunks.jsonl         one {"id", "text", "metadata"} line per index position
+    embeddings.npy       float16 raw embeddings for rebuild_index.py (if saved)
+    routing.npz          document centroids for two-stage retrieval (if built)
+    parents.jsonl        parent windows of small-to-big child chunks (if used)
+    duplicates.json      dedup mapping (if any)
+    manifests/*.json     source manifests for incremental updates (if any)
+
+Chunks travel as JSON rather than the docstore pickle, so a bundle does not
+depend on the exporting node's library versions; the importer writes the
+snapshot files (index.faiss, index.pkl) locally and publishes them
+atomically, ready to be memory-mapped (FAISS_MMAP=true).
+
+Usage:
+    python bundle.py export --out kb.tar.gz
+    python bundle.py export --out - | ssh node2 python bundle.py import -
+    python bundle.py import kb.tar.gz
+"""
+from typing import BinaryIO, Dict, Optional
+from datetime import datetime, timezone
+import argparse
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+from context_compression import SENTENCES_FILE
+from document_router import ROUTING_FILE
+from embedding_store import EMBEDDINGS_FILE, read_chunks, write_docstore
+from parent_store import PARENTS_FILE
+from snapshots import current_snapshot, snapshot_path, write_snapshot
+from source_cache import file_sha256
+from config import Config
+
+BUNDLE_FORMAT = 1
+MANIFEST_NAME = "bundle.json"
+_SNAPSHOT_FILES = ("index.faiss", "chunks.jsonl", EMBEDDINGS_FILE, ROUTING_FILE, PARENTS_FILE,
+                   SENTENCES_FILE, "duplicates.json")
+_MANIFEST_PREFIX = "manifests/"
+
+
+class BundleError(Exception):
+    """Raised when a bundle is malformed, corrupt or incompatible"""
+
+
+def embedding_identity(dimension: int) -> Dict:
+    """Embedding model a bundle's vectors were produced with"""
+    return {"provider": "openai", "model": Config.EMBEDDING_MODEL, "dimension": dimension}
+
+
+def _add_file(tar: tarfile.TarFile, path: str, name: str):
+    info = tar.gettarinfo(path, arcname=name)
+    info.uid = info.gid = 0
+    info.uname = info.gname = ""
+    with open(path, 'rb') as f:
+        tar.addfile(info, f)
+
+
+def export_bundle(out: BinaryIO, root: str = None, cache_dir: str = None,
+                  compresslevel: int = 6) -> Dict:
+    """
+    Write the current snapshot as a bundle
+
+    Args:
+        out: Writable binary stream (file or stdout)
+        root: Knowledge base root (default from config)
+        cache_dir: Cache directory holding source manifests (default from config)
+        compresslevel: gzip level
+
+    Returns:
+        The bundle manifest
+    """
+    import faiss
+    import pickle
+
+    root = root or Config.VECTOR_STORE_PATH
+    cache_dir = cache_dir or Config.CACHE_DIR
+    version = current_snapshot(root)
+    source = snapshot_path(root, version)
+    index_path = os.path.join(source, "index.faiss")
+    if not os.path.exists(index_path):
+        raise BundleError(f"No knowledge base at {root}")
+
+    index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    with open(os.path.join(source, "index.pkl"), 'rb') as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {"index.faiss": index_path}
+
+        chunks_path = os.path.join(tmp, "chunks.jsonl")
+        with open(chunks_path, 'w', encoding='utf-8') as f:
+            for position in range(index.ntotal):
+                doc_id = index_to_docstore_id[position]
+                doc = docstore.search(doc_id)
+                f.write(json.dumps({"id": doc_id, "text": doc.page_content, "metadata": doc.metadata},
+                                   ensure_ascii=False, default=str) + "\n")
+        files["chunks.jsonl"] = chunks_path
+
+        for name in (EMBEDDINGS_FILE, ROUTING_FILE, PARENTS_FILE, SENTENCES_FILE, "duplicates.json"):
+            if os.path.exists(os.path.join(source, name)):
+                files[name] = os.path.join(source, name)
+
+        manifests_dir = os.path.join(cache_dir, "manifests")
+        if os.path.isdir(manifests_dir):
+            for name in sorted(os.listdir(manifests_dir)):
+                if name.endswith(".json"):
+                    files[_MANIFEST_PREFIX + name] = os.path.join(manifests_dir, name)
+
+        manifest = {
+            "format": BUNDLE_FORMAT,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            "snapshot": version,
+            "embedding": embedding_identity(index.d),
+            "index": {"type": type(index).__name__, "vectors": index.ntotal},
+            "files": {
+                name: {"size": os.path.getsize(path), "sha256": file_sha256(path)}
+                for name, path in files.items()
+            }
+        }
+        manifest_bytes = json.dumps(manifest, indent=1).encode('utf-8')
+
+        # Plain tar stream inside gzip: no seeking, so stdout works as a target
+        with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=compresslevel, mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode='w|') as tar:
+                info = tarfile.TarInfo(MANIFEST_NAME)
+                info.size = len(manifest_bytes)
+                tar.addfile(info, io.BytesIO(manifest_bytes))
+                for name, path in files.items():
+                    _add_file(tar, path, name)
+    return manifest
+
+
+def _entry_allowed(name: str) -> bool:
+    """Only known snapshot files and flat manifests/*.json (no path traversal)"""
+    if name in _SNAPSHOT_FILES:
+        return True
+    rest = name[len(_MANIFEST_PREFIX):]
+    return (name.startswith(_MANIFEST_PREFIX) and rest.endswith(".json")
+            and "/" not in rest and "\\" not in rest and not rest.startswith("."))
+
+
+def _check_compatible(manifest: Dict, force: bool):
+    if manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle format {manifest.get('format')}")
+    bundled = manifest["embedding"]
+    local = embedding_identity(bundled["dimension"])
+    if (bundled["provider"], bundled["model"]) != (local["provider"], local["model"]) and not force:
+        raise BundleError(
+            f"Bundle was embedded with {bundled['provider']}/{bundled['model']} but this node "
+            f"queries with {local['provider']}/{local['model']} (use --force to import anyway)"
+        )
+
+
+def _copy_verified(source: BinaryIO, path: str, expected: Dict):
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as f:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+            size += len(block)
+            f.write(block)
+    if size != expected["size"] or digest.hexdigest() != expected["sha256"]:
+        raise BundleError(f"Checksum mismatch for {os.path.basename(path)}")
+
+
+def _write_docstore(chunks_path: str, pkl_path: str, vectors: int):
+    """Rebuild index.pkl (docstore + position -> id map) from chunks.jsonl"""
+    written = write_docstore(read_chunks(chunks_path), pkl_path)
+    if written != vectors:
+        raise BundleError(f"Bundle has {written} chunks for {vectors} vectors")
+
+
+def import_bundle(stream: BinaryIO, root: str = None, cache_dir: str = None,
+                  force: bool = False, manifests: bool = True) -> Dict:
+    """
+    Unpack a bundle into a new snapshot and publish it
+
+    The bundle is read strictly sequentially, so it can come straight from
+    a pipe or HTTP response. Every file is checksummed as it is written;
+    nothing is published unless all of them match.
+
+    Args:
+        stream: Readable binary stream of the bundle
+        root: Knowledge base root (default from config)
+        cache_dir: Cache directory for source manifests (default from config)
+        force: Import even if the embedding model differs from this node's
+        manifests: Also install the bundled source manifests
+
+    Returns:
+        The bundle manifest, with "published" set to the new snapshot version
+    """
+    root = root or Config.VECTOR_STORE_PATH
+    cache_dir = cache_dir or Config.CACHE_DIR
+    os.makedirs(root, exist_ok=True)
+
+    manifest: Optional[Dict] = None
+    received = set()
+    with write_snapshot(root, keep=Config.SNAPSHOT_KEEP) as (staging, version):
+        manifest_staging = os.path.join(staging, ".manifests")
+        with tarfile.open(fileobj=stream, mode='r|gz') as tar:
+            for member in tar:
+                if manifest is None:
+                    if member.name != MANIFEST_NAME:
+                        raise BundleError(f"{MANIFEST_NAME} must be the first bundle entry")
+                    manifest = json.load(tar.extractfile(member))
+                    _check_compatible(manifest, force)
+                    continue
+
+                expected = manifest["files"].get(member.name)
+                if expected is None or not member.isfile() or not _entry_allowed(member.name):
+                    raise BundleError(f"Unexpected bundle entry: {member.name}")
+                if member.name.startswith(_MANIFEST_PREFIX):
+                    name = os.path.basename(member.name)
+                    os.makedirs(manifest_staging, exist_ok=True)
+                    target = os.path.join(manifest_staging, name)
+                else:
+                    target = os.path.join(staging, member.name)
+                _copy_verified(tar.extractfile(member), target, expected)
+                received.add(member.name)
+
+        if manifest is None:
+            raise BundleError("Empty bundle")
+        missing = set(manifest["files"]) - received
+        if missing:
+            raise BundleError(f"Bundle is truncated, missing: {', '.join(sorted(missing))}")
+
+        _write_docstore(os.path.join(staging, "chunks.jsonl"),
+                        os.path.join(staging, "index.pkl"),
+                        manifest["index"]["vectors"])
+
+        if os.path.isdir(manifest_staging):
+            if manifests:
+                target_dir = os.path.join(cache_dir, "manifests")
+                os.makedirs(target_dir, exist_ok=True)
+                for name in os.listdir(manifest_staging):
+                    os.replace(os.path.join(manifest_staging, name), os.path.join(target_dir, name))
+            shutil.rmtree(manifest_staging, ignore_errors=True)
+
+    manifest["published"] = version
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/import knowledge base bundles")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export = subparsers.add_parser('export', help='Write the live snapshot as a bundle')
+    export.add_argument('--out', required=True, help="Bundle path, or '-' for stdout")
+    export.add_argument('--root', help='Knowledge base root (default: VECTOR_STORE_PATH)')
+    export.add_argument('--level', type=int, default=6, help='gzip compression level')
+
+    load = subparsers.add_parser('import', help='Unpack a bundle and publish it as a snapshot')
+    load.add_argument('bundle', help="Bundle path, or '-' for stdin")
+    load.add_argument('--root', help='Knowledge base root (default: VECTOR_STORE_PATH)')
+    load.add_argument('--force', action='store_true', help='Ignore an embedding model mismatch')
+    load.add_argument('--no-manifests', action='store_true', help='Skip bundled source manifests')
+
+    args = parser.parse_args()
+    # Progress goes to stderr so '--out -' can be piped
+    log = sys.stderr
+    try:
+        if args.command == 'export':
+            if args.out == '-':
+                manifest = export_bundle(sys.stdout.buffer, args.root, compresslevel=args.level)
+            else:
+                with open(args.out, 'wb') as f:
+                    manifest = export_bundle(f, args.root, compresslevel=args.level)
+            print(f"+ Exported {manifest['index']['vectors']} vectors "
+                  f"({manifest['embedding']['model']}, snapshot {manifest['snapshot']})", file=log)
+        else:
+            start_time = time.perf_counter()
+            if args.bundle == '-':
+                manifest = import_bundle(sys.stdin.buffer, args.root, force=args.force,
+                                         manifests=not args.no_manifests)
+            else:
+                with open(args.bundle, 'rb') as f:
+                    manifest = import_bundle(f, args.root, force=args.force,
+                                             manifests=not args.no_manifests)
+            seconds = time.perf_counter() - start_time
+            print(f"+ Imported {manifest['index']['vectors']} vectors as snapshot "
+                  f"{manifest['published']} in {seconds:.1f}s", file=log)
+    except (BundleError, OSError, tarfile.TarError) as e:
+        print(f"X {e}", file=log)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,34 +2,34 @@
 import requests
 import json
 import time
+from config_ollama import ConfigOllama
+from ollama_pool import probe_endpoint
 
 print("Checking Ollama Server...")
 
-try:
-    # Check version
-    print("1. Checking version...")
-    response = requests.get('http://localhost:11434/api/version', timeout=5)
-    print(f"   Version: {response.json()['version']}")
-    
-    # Check loaded models
-    print("\n2. Checking tags...")
-    response = requests.get('http://localhost:11434/api/tags', timeout=5)
-    models = [m['name'] for m in response.json()['models']]
-    print(f"   Available models: {models}")
-    
-    # Simple generation test
-    print("\n3. Testing simple generation (hello world)...")
-    start_time = time.time()
-    response = requests.post('http://localhost:11434/api/generate', 
-                           json={
-                               "model": "mistral",
-                               "prompt": "Say hello!",
-                               "stream": False
-                           },
-                           timeout=120) # 2 minute timeout
-    duration = time.time() - start_time
-    print(f"   Response: {response.json()['response']}")
-    print(f"   Time taken: {duration:.2f} seconds")
-    
-except Exception as e:
-    print(f"\nERROR: {e}")
+for base_url in ConfigOllama.OLLAMA_BASE_URLS:
+    print(f"\nEndpoint: {base_url}")
+
+    try:
+        # Check version and loaded models
+        print("1. Checking version and tags...")
+        info = probe_endpoint(base_url)
+        print(f"   Version: {info['version']}")
+        print(f"   Available models: {info['models']}")
+
+        # Simple generation test
+        print("\n2. Testing simple generation (hello world)...")
+        start_time = time.time()
+        response = requests.post(f'{base_url}/api/generate',
+                               json={
+                                   "model": ConfigOllama.LLM_MODEL,
+                                   "prompt": "Say hello!",
+                                   "stream": False
+                               },
+                               timeout=120) # 2 minute timeout
+        duration = time.time() - start_time
+        print(f"   Response: {response.json()['response']}")
+        print(f"   Time taken: {duration:.2f} seconds")
+
+    except Exception as e:
+        print(f"\nERROR: {e}")
@@ -18,6 +18,68 @@ class Config:
     # Text Splitting Settings
     CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 1000))
     CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 200))
+    CHUNKER = os.getenv('CHUNKER', 'fast')  # 'fast' (offset-based) or 'recursive' (LangChain)
+    
+    # Small-to-big retrieval: CHILD_CHUNK_SIZE > 0 embeds child chunks of that
+    # size and answers with their deduplicated CHUNK_SIZE parent windows
+    CHILD_CHUNK_SIZE = int(os.getenv('CHILD_CHUNK_SIZE', 0))
+    CHILD_CHUNK_OVERLAP = int(os.getenv('CHILD_CHUNK_OVERLAP', 50))
+    PARENT_TOP_K = int(os.getenv('PARENT_TOP_K', 2))
+    
+    # Token-aware chunking: CHUNK_LENGTH_UNIT='tokens' measures chunks in tokens
+    CHUNK_LENGTH_UNIT = os.getenv('CHUNK_LENGTH_UNIT', 'chars')
+    CHUNK_SIZE_TOKENS = int(os.getenv('CHUNK_SIZE_TOKENS', 256))
+    CHUNK_OVERLAP_TOKENS = int(os.getenv('CHUNK_OVERLAP_TOKENS', 50))
+    TOKEN_ENCODING = os.getenv('TOKEN_ENCODING', 'cl100k_base')
+    
+    # Parallel chunking: inputs smaller than CHUNK_PARALLEL_MIN_CHARS split in-process
+    CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', os.cpu_count() or 1))
+    CHUNK_PARALLEL_MIN_CHARS = int(os.getenv('CHUNK_PARALLEL_MIN_CHARS', 2_000_000))
+    CHUNK_BATCHES_PER_WORKER = int(os.getenv('CHUNK_BATCHES_PER_WORKER', 4))
+    
+    # Document Loading Settings
+    CACHE_DIR = os.getenv('CACHE_DIR', './.cache')
+    PDF_WORKERS = int(os.getenv('PDF_WORKERS', os.cpu_count() or 1))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 8))
+    
+    # Text files at least TEXT_STREAM_MIN_BYTES are streamed in segments
+    TEXT_STREAM_MIN_BYTES = int(os.getenv('TEXT_STREAM_MIN_BYTES', 16 << 20))
+    TEXT_SEGMENT_CHARS = int(os.getenv('TEXT_SEGMENT_CHARS', 1_000_000))
+    TEXT_WINDOW_BYTES = int(os.getenv('TEXT_WINDOW_BYTES', 1 << 20))
+    
+    # 'directory' sources: file types picked up when walking a course folder
+    DIRECTORY_EXTENSIONS = os.getenv('DIRECTORY_EXTENSIONS', '.pdf,.txt,.md').split(',')
+    
+    # YouTube transcript cache (YOUTUBE_OFFLINE=true rebuilds from cache only;
+    # YOUTUBE_CACHE_DIR can point at recorded fixtures)
+    YOUTUBE_CACHE_DIR = os.getenv('YOUTUBE_CACHE_DIR')
+    YOUTUBE_CACHE_TTL = float(os.getenv('YOUTUBE_CACHE_TTL', 7 * 24 * 3600))
+    YOUTUBE_FETCH_WORKERS = int(os.getenv('YOUTUBE_FETCH_WORKERS', 4))
+    YOUTUBE_RATE_LIMIT = float(os.getenv('YOUTUBE_RATE_LIMIT', 2.0))  # requests/s
+    YOUTUBE_LANGUAGES = os.getenv('YOUTUBE_LANGUAGES', 'en').split(',')
+    YOUTUBE_OFFLINE = os.getenv('YOUTUBE_OFFLINE', 'false').lower() == 'true'
+    
+    # Wikipedia article cache (WIKIPEDIA_OFFLINE=true rebuilds from cache only)
+    WIKIPEDIA_LANG = os.getenv('WIKIPEDIA_LANG', 'en')
+    WIKIPEDIA_MAX_DOCS = int(os.getenv('WIKIPEDIA_MAX_DOCS', 2))
+    WIKIPEDIA_DOC_CHARS_MAX = int(os.getenv('WIKIPEDIA_DOC_CHARS_MAX', 4000))
+    WIKIPEDIA_CACHE_TTL = float(os.getenv('WIKIPEDIA_CACHE_TTL', 7 * 24 * 3600))
+    WIKIPEDIA_FETCH_WORKERS = int(os.getenv('WIKIPEDIA_FETCH_WORKERS', 4))
+    WIKIPEDIA_RATE_LIMIT = float(os.getenv('WIKIPEDIA_RATE_LIMIT', 5.0))  # requests/s
+    WIKIPEDIA_OFFLINE = os.getenv('WIKIPEDIA_OFFLINE', 'false').lower() == 'true'
+    
+    # Pipelined Ingestion Settings
+    PIPELINE_BATCH_SIZE = int(os.getenv('PIPELINE_BATCH_SIZE', 64))
+    PIPELINE_SPLIT_WORKERS = int(os.getenv('PIPELINE_SPLIT_WORKERS', 2))
+    PIPELINE_EMBED_WORKERS = int(os.getenv('PIPELINE_EMBED_WORKERS', 4))
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 8))
+    
+    # Chunk Deduplication (exact hash + MinHash/LSH near-duplicates)
+    DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.85))
+    DEDUP_NUM_PERM = int(os.getenv('DEDUP_NUM_PERM', 64))
+    DEDUP_BANDS = int(os.getenv('DEDUP_BANDS', 16))
+    DEDUP_SHINGLE_SIZE = int(os.getenv('DEDUP_SHINGLE_SIZE', 5))
     
     # Vector Store Settings
     VECTOR_STORE_PATH = os.getenv('VECTOR_STORE_PATH', './vector_store')
@@ -30,6 +92,56 @@ class Config:
     
     # Retrieval Settings
     TOP_K_RESULTS = 4
+    # 'flat' searches every chunk; 'two_stage' first picks the
+    # ROUTING_FAN_OUT documents with the closest centroid, then searches
+    # only their chunks (see document_router.py, `benchmark.py routing`).
+    # Fan-out trades recall for speed: on the synthetic benchmark (2,000
+    # documents, k=4) 8 keeps recall@4 at 0.53, 32 at 0.89, 48 at 0.97
+    # (~10x faster than flat) and 64 at 1.0 (~8x)
+    RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'flat').lower()
+    ROUTING_FAN_OUT = int(os.getenv('ROUTING_FAN_OUT', 48))
+    # Context compression: sentences of retrieved text are embedded at ingest
+    # time; each answer keeps only the sentences closest to the question, up
+    # to CONTEXT_BUDGET_CHARS in total (see context_compression.py)
+    CONTEXT_COMPRESSION = os.getenv('CONTEXT_COMPRESSION', 'false').lower() == 'true'
+    CONTEXT_BUDGET_CHARS = int(os.getenv('CONTEXT_BUDGET_CHARS', 1500))
     
     # Temperature for LLM
     TEMPERATURE = 0.7
+    
+    # Admission Control Settings (/api/ask)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 16))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', 32))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 15))
+    ADMISSION_MAX_QUEUED_PER_CLIENT = int(os.getenv('ADMISSION_MAX_QUEUED_PER_CLIENT', 2))
+    
+    # Startup Settings (index is loaded in the background; /api/health/ready
+    # and /api/ask return 503 with Retry-After until it is)
+    INDEX_BACKGROUND_LOAD = os.getenv('INDEX_BACKGROUND_LOAD', 'true').lower() == 'true'
+    INDEX_READY_RETRY_AFTER = int(os.getenv('INDEX_READY_RETRY_AFTER', 5))
+    
+    # Snapshot Settings (versioned saves, hot reload in running servers)
+    SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', 3))
+    SNAPSHOT_WATCH_INTERVAL = float(os.getenv('SNAPSHOT_WATCH_INTERVAL', 10))
+    FAISS_MMAP = os.getenv('FAISS_MMAP', 'false').lower() == 'true'
+    
+    # Raw Embedding Settings (float16 embeddings.npy saved with each snapshot,
+    # so rebuild_index.py can build other index types without re-embedding)
+    STORE_RAW_EMBEDDINGS = os.getenv('STORE_RAW_EMBEDDINGS', 'true').lower() == 'true'
+    
+    # PCA Settings (0 = full dimension). When set, the saved index projects
+    # stored and query vectors to this many dims; see `benchmark.py pca`.
+    PCA_DIMENSIONS = int(os.getenv('PCA_DIMENSIONS', 0))
+    PCA_TRAIN_SIZE = int(os.getenv('PCA_TRAIN_SIZE', 100000))
+    
+    # Pre-fork Serving Settings (serve_prefork.py)
+    PREFORK_WORKERS = int(os.getenv('PREFORK_WORKERS', os.cpu_count() or 2))
+    PREFORK_MEMORY_REPORT_INTERVAL = float(os.getenv('PREFORK_MEMORY_REPORT_INTERVAL', 300))
+    
+    # Async Generation Settings (pooled HTTP client)
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', 32))
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 64))
+    HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 16))
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 120))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
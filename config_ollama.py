@@ -10,23 +10,89 @@ class ConfigOllama:
     # Ollama Settings
     OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
     
+    # Comma-separated list of Ollama servers to load-balance across
+    OLLAMA_BASE_URLS = [
+        url.strip()
+        for url in os.getenv('OLLAMA_BASE_URLS', OLLAMA_BASE_URL).split(',')
+        if url.strip()
+    ]
+    
+    # Load Balancer Health Settings
+    OLLAMA_FAILURE_THRESHOLD = int(os.getenv('OLLAMA_FAILURE_THRESHOLD', 3))
+    OLLAMA_SLOW_FACTOR = float(os.getenv('OLLAMA_SLOW_FACTOR', 3.0))
+    OLLAMA_EJECT_SECONDS = float(os.getenv('OLLAMA_EJECT_SECONDS', 30))
+    OLLAMA_PROBE_INTERVAL = float(os.getenv('OLLAMA_PROBE_INTERVAL', 10))
+    OLLAMA_PROBE_TIMEOUT = float(os.getenv('OLLAMA_PROBE_TIMEOUT', 5))
+    
     # Model Settings
     LLM_MODEL = os.getenv('OLLAMA_LLM_MODEL', 'mistral')  # or 'llama2'
     EMBEDDING_MODEL = os.getenv('OLLAMA_EMBEDDING_MODEL', 'nomic-embed-text')
     
+    # Warm-up / Keep-alive Settings
+    OLLAMA_WARMUP_ON_START = os.getenv('OLLAMA_WARMUP_ON_START', 'true').lower() == 'true'
+    OLLAMA_KEEP_ALIVE_SECONDS = int(os.getenv('OLLAMA_KEEP_ALIVE_SECONDS', 600))
+    OLLAMA_PING_INTERVAL = float(os.getenv('OLLAMA_PING_INTERVAL', 120))
+    OLLAMA_TRAFFIC_WINDOW = float(os.getenv('OLLAMA_TRAFFIC_WINDOW', 1800))
+    OLLAMA_IDLE_UNLOAD_SECONDS = float(os.getenv('OLLAMA_IDLE_UNLOAD_SECONDS', 300))
+    
     # Text Splitting Settings
     CHUNK_SIZE = int(os.getenv('CHUNK_SIZE', 1000))
     CHUNK_OVERLAP = int(os.getenv('CHUNK_OVERLAP', 200))
     
+    # Pipelined Ingestion Settings
+    PIPELINE_BATCH_SIZE = int(os.getenv('PIPELINE_BATCH_SIZE', 64))
+    PIPELINE_SPLIT_WORKERS = int(os.getenv('PIPELINE_SPLIT_WORKERS', 2))
+    PIPELINE_EMBED_WORKERS = int(os.getenv('PIPELINE_EMBED_WORKERS', 2))
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', 8))
+    
+    # Chunk Deduplication (exact hash + MinHash/LSH near-duplicates)
+    DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+    DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', 0.85))
+    DEDUP_NUM_PERM = int(os.getenv('DEDUP_NUM_PERM', 64))
+    DEDUP_BANDS = int(os.getenv('DEDUP_BANDS', 16))
+    DEDUP_SHINGLE_SIZE = int(os.getenv('DEDUP_SHINGLE_SIZE', 5))
+    
     # Vector Store Settings
     VECTOR_STORE_PATH = os.getenv('VECTOR_STORE_PATH', './vector_store_ollama')
     VECTOR_STORE_TYPE = 'chroma'  # Using Chroma instead of FAISS for Ollama
+    # Export the collection's vectors as float16 embeddings.npy on save, so
+    # rebuild_index.py can rebuild it without re-embedding
+    STORE_RAW_EMBEDDINGS = os.getenv('STORE_RAW_EMBEDDINGS', 'true').lower() == 'true'
     
     # Retrieval Settings
     TOP_K_RESULTS = int(os.getenv('TOP_K_RESULTS', 4))
+    # Parent windows returned when chunks were split small-to-big (CHILD_CHUNK_SIZE)
+    PARENT_TOP_K = int(os.getenv('PARENT_TOP_K', 2))
+    # Context compression: sentences of retrieved text are embedded at ingest
+    # time; each answer keeps only the sentences closest to the question, up
+    # to CONTEXT_BUDGET_CHARS in total. Shorter prompts cut local prefill time.
+    CONTEXT_COMPRESSION = os.getenv('CONTEXT_COMPRESSION', 'false').lower() == 'true'
+    CONTEXT_BUDGET_CHARS = int(os.getenv('CONTEXT_BUDGET_CHARS', 1500))
     
     # Temperature for LLM
     TEMPERATURE = float(os.getenv('TEMPERATURE', 0.7))
     
+    # Admission Control Settings (/api/ask)
+    ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 2))
+    ADMISSION_MAX_QUEUE = int(os.getenv('ADMISSION_MAX_QUEUE', 32))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 15))
+    ADMISSION_MAX_QUEUED_PER_CLIENT = int(os.getenv('ADMISSION_MAX_QUEUED_PER_CLIENT', 2))
+    
+    # Startup Settings (index is loaded in the background; /api/health/ready
+    # and /api/ask return 503 with Retry-After until it is)
+    INDEX_BACKGROUND_LOAD = os.getenv('INDEX_BACKGROUND_LOAD', 'true').lower() == 'true'
+    INDEX_READY_RETRY_AFTER = int(os.getenv('INDEX_READY_RETRY_AFTER', 5))
+    
+    # Pre-fork Serving Settings (serve_prefork.py)
+    PREFORK_WORKERS = int(os.getenv('PREFORK_WORKERS', os.cpu_count() or 2))
+    PREFORK_MEMORY_REPORT_INTERVAL = float(os.getenv('PREFORK_MEMORY_REPORT_INTERVAL', 300))
+    
+    # Async Generation Settings (pooled HTTP client)
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', 8))
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', 16))
+    HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', 8))
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 300))
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 5))
+    
     # No API key needed!
     OPENAI_API_KEY = None
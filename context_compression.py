@@ -0,0 +1,214 @@
+"""
+Context Compression Module
+Keeps only the retrieved sentences most similar to the question, within a
+character budget, so the LLM prompt shrinks to what matters.
+
+Sentence embeddings are computed once at ingest time for every text that
+retrieval can return (chunks, or parent windows for small-to-big chunks)
+and cached by text hash; a question costs one query embedding and a dot
+product, never a sentence embedding call.
+
+    sentences.npz   text hashes, sources, sentence spans and float16 vectors
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import hashlib
+import os
+import re
+import numpy as np
+
+SENTENCES_FILE = "sentences.npz"
+
+_GAP = " ... "
+_BOUNDARY = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]
+
+
+def sentence_spans(text: str, min_chars: int = 30, max_chars: int = 300) -> List[Tuple[int, int]]:
+    """
+    Sentence (start, end) offsets
+
+    Fragments shorter than min_chars are merged into the next sentence, and
+    sentences longer than max_chars (e.g. unpunctuated transcripts) are cut
+    at whitespace, so every unit is worth scoring on its own.
+    """
+    spans = []
+    start = 0
+    pieces = [m.start() for m in _BOUNDARY.finditer(text)] + [len(text)]
+    for end in pieces:
+        segment_start = start
+        while text[segment_start:end].strip():
+            if end - segment_start > max_chars:
+                cut = text.rfind(' ', segment_start, segment_start + max_chars)
+                cut = cut if cut > segment_start else segment_start + max_chars
+            else:
+                cut = end
+            spans.append((segment_start, cut))
+            segment_start = cut
+        match = _BOUNDARY.match(text, end)
+        start = match.end() if match else end
+
+    merged = []
+    for span in spans:
+        if merged and merged[-1][1] - merged[-1][0] < min_chars:
+            merged[-1] = (merged[-1][0], span[1])
+        else:
+            merged.append(span)
+    trimmed = []
+    for start, end in merged:
+        segment = text[start:end]
+        trimmed.append((start + len(segment) - len(segment.lstrip()), end - len(segment) + len(segment.rstrip())))
+    return trimmed
+
+
+class SentenceStore:
+    """Sentence spans and embeddings per retrievable text"""
+
+    def __init__(self):
+        # text hash -> (source, [n, 2] int32 spans, [n, dim] float16 vectors)
+        self._entries: Dict[str, Tuple[Optional[str], np.ndarray, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, texts: Sequence[str], sources: Sequence[Optional[str]],
+            embed: Callable[[List[str]], List[List[float]]]) -> int:
+        """
+        Embed the sentences of texts not seen before (one batched call)
+
+        Args:
+            texts: Retrievable texts
+            sources: Source of each text (for delete_sources)
+            embed: embed_documents of the store's embedding model
+
+        Returns:
+            Number of sentences embedded
+        """
+        pending = {}
+        for text, source in zip(texts, sources):
+            key = text_key(text)
+            if key not in self._entries and key not in pending:
+                pending[key] = (text, source, sentence_spans(text))
+        sentences = [text[s:e] for text, _, spans in pending.values() for s, e in spans]
+        if not sentences:
+            return 0
+
+        vectors = np.asarray(embed(sentences), dtype=np.float16)
+        row = 0
+        for key, (_, source, spans) in pending.items():
+            self._entries[key] = (source, np.asarray(spans, dtype=np.int32).reshape(-1, 2),
+                                  vectors[row:row + len(spans)])
+            row += len(spans)
+        return len(sentences)
+
+    def remove_sources(self, sources: Iterable[str]):
+        wanted = set(sources)
+        for key in [k for k, (source, _, _) in self._entries.items() if source in wanted]:
+            del self._entries[key]
+
+    def compress(self, query_vector, texts: Sequence[str], budget: int) -> Tuple[List[Optional[str]], Dict]:
+        """
+        Keep the sentences most similar to the query within a character budget
+
+        Sentences compete across all texts; each kept sentence stays in its
+        original order within its text, with " ... " marking cut material.
+
+        Args:
+            query_vector: Query embedding
+            texts: Retrieved texts, best first
+            budget: Maximum characters kept across all texts (including
+                the separators between kept sentences)
+
+        Returns:
+            (compressed text per input -- None if nothing of it was kept,
+            the input itself if its sentences were never embedded -- and
+            {original_chars, compressed_chars, reduction, sentences_kept,
+            sentences_total, uncached})
+        """
+        query = np.asarray(query_vector, dtype=np.float32)
+        query /= max(np.linalg.norm(query), 1e-12)
+
+        candidates = []  # (score, text index, span)
+        uncached = []
+        for i, text in enumerate(texts):
+            entry = self._entries.get(text_key(text))
+            if entry is None:
+                uncached.append(i)
+                continue
+            _, spans, vectors = entry
+            vectors = vectors.astype(np.float32)
+            scores = vectors @ query / np.maximum(np.linalg.norm(vectors, axis=1), 1e-12)
+            candidates.extend((float(score), i, (int(s), int(e))) for score, (s, e) in zip(scores, spans))
+
+        # Texts that could not be scored are kept whole and use up budget first
+        remaining = budget - sum(len(texts[i]) for i in uncached)
+        kept: Dict[int, List[Tuple[int, int]]] = {}
+        for score, i, (start, end) in sorted(candidates, key=lambda c: -c[0]):
+            # Charged for the widest separator (" ... ") it may need
+            cost = end - start + (len(_GAP) if i in kept else 0)
+            if cost > remaining and kept:
+                continue
+            kept.setdefault(i, []).append((start, end))
+            remaining -= cost
+
+        compressed: List[Optional[str]] = []
+        for i, text in enumerate(texts):
+            if i in uncached:
+                compressed.append(text)
+                continue
+            spans = sorted(kept.get(i, []))
+            if not spans:
+                compressed.append(None)
+                continue
+            parts = []
+            for j, (start, end) in enumerate(spans):
+                if j and start > spans[j - 1][1] + 2:
+                    parts.append(_GAP)
+                elif j:
+                    parts.append(" ")
+                parts.append(text[start:end])
+            compressed.append("".join(parts))
+
+        original = sum(len(text) for text in texts)
+        result = sum(len(text) for text in compressed if text)
+        return compressed, {
+            "original_chars": original,
+            "compressed_chars": result,
+            "reduction": round(1 - result / original, 3) if original else 0.0,
+            "sentences_kept": sum(len(spans) for spans in kept.values()),
+            "sentences_total": len(candidates),
+            "uncached": len(uncached)
+        }
+
+    def save(self, path: str):
+        keys = list(self._entries)
+        entries = [self._entries[k] for k in keys]
+        dimension = entries[0][2].shape[1] if entries else 0
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                keys=np.asarray(keys, dtype=str),
+                sources=np.asarray(["" if source is None else source for source, _, _ in entries], dtype=str),
+                counts=np.asarray([len(spans) for _, spans, _ in entries], dtype=np.int64),
+                spans=np.concatenate([spans for _, spans, _ in entries]) if entries
+                else np.zeros((0, 2), dtype=np.int32),
+                vectors=np.concatenate([vectors for _, _, vectors in entries]) if entries
+                else np.zeros((0, dimension), dtype=np.float16)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'SentenceStore':
+        """Sentences saved with a snapshot (empty store if the file is absent)"""
+        store = cls()
+        if not os.path.exists(path):
+            return store
+        with np.load(path) as data:
+            offsets = np.r_[0, np.cumsum(data["counts"])]
+            spans, vectors = data["spans"], data["vectors"]
+            for i, (key, source) in enumerate(zip(data["keys"], data["sources"])):
+                start, end = offsets[i], offsets[i + 1]
+                store._entries[str(key)] = (str(source) or None, spans[start:end], vectors[start:end])
+        return store
+
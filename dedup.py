@@ -0,0 +1,242 @@
+"""
+Deduplication Module
+Drops exact and near-duplicate chunks before they are embedded.
+Exact duplicates are found by hashing normalized text, near-duplicates
+with MinHash signatures and banded locality-sensitive hashing (LSH).
+"""
+from typing import Dict, List, Optional
+from langchain.schema import Document
+import hashlib
+import json
+import os
+import re
+import zlib
+import numpy as np
+
+_PRIME = 4294967311  # smallest prime above 2**32
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class ChunkDeduplicator:
+    """Incremental exact + MinHash/LSH duplicate filter for chunks"""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64,
+                 bands: int = 16, shingle_size: int = 5, seed: int = 1):
+        """
+        Initialize deduplicator
+
+        Args:
+            threshold: Estimated Jaccard similarity at which a chunk is a near-duplicate
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must be divisible by bands)
+            shingle_size: Words per shingle
+            seed: Seed for the MinHash permutations
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 31, size=(num_perm, 1)).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 31, size=(num_perm, 1)).astype(np.uint64)
+
+        self._exact = {}        # text hash -> survivor chunk id
+        self._signatures = {}   # survivor chunk id -> MinHash signature
+        self._buckets = {}      # (band, band bytes) -> survivor chunk ids
+        self._survivors = {}    # survivor chunk id -> (source, text hash)
+        self._count = 0
+
+        # dropped chunk id -> {"survivor_id", "survivor_source", "metadata"}
+        self.duplicates = {}
+        self._by_survivor = {}
+
+        self.chunks_seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+        self.chars_saved = 0
+
+    def _signature(self, text: str) -> np.ndarray:
+        """MinHash signature over word shingles"""
+        words = text.split(" ")
+        k = self.shingle_size
+        shingles = {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode('utf-8')) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _record(self, chunk: Document, chunk_id: str, survivor_id: str):
+        self.duplicates[chunk_id] = {
+            "survivor_id": survivor_id,
+            "survivor_source": self._survivors[survivor_id][0],
+            # Without the transient parent window text (see parent_store.py)
+            "metadata": {k: v for k, v in chunk.metadata.items() if k != "parent_text"}
+        }
+        self._by_survivor.setdefault(survivor_id, []).append(chunk_id)
+        self.chars_saved += len(chunk.page_content)
+
+    def check(self, chunk: Document) -> Optional[str]:
+        """
+        Register a chunk, or return the id of the chunk it duplicates
+
+        Args:
+            chunk: Chunk Document (chunk_id metadata is used when present)
+
+        Returns:
+            Survivor chunk id if the chunk is a duplicate, else None
+        """
+        self.chunks_seen += 1
+        self._count += 1
+        chunk_id = chunk.metadata.get("chunk_id") or f"chunk-{self._count}"
+        text = normalize_text(chunk.page_content)
+
+        text_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        survivor_id = self._exact.get(text_hash)
+        if survivor_id is not None:
+            self.exact_duplicates += 1
+            self._record(chunk, chunk_id, survivor_id)
+            return survivor_id
+
+        signature = self._signature(text)
+        candidates = set()
+        for key in self._band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+
+        best_id, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity > best_similarity:
+                best_id, best_similarity = candidate, similarity
+        if best_id is not None and best_similarity >= self.threshold:
+            self.near_duplicates += 1
+            self._record(chunk, chunk_id, best_id)
+            return best_id
+
+        self._exact[text_hash] = chunk_id
+        self._signatures[chunk_id] = signature
+        self._survivors[chunk_id] = (chunk.metadata.get("source"), text_hash)
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(chunk_id)
+        return None
+
+    def deduplicate(self, chunks: List[Document], verbose: bool = True) -> List[Document]:
+        """
+        Filter a list of chunks, keeping the first occurrence of each
+
+        Args:
+            chunks: Chunk Documents in ingestion order
+            verbose: Whether to print a summary
+
+        Returns:
+            Surviving chunks in their original order
+        """
+        exact, near = self.exact_duplicates, self.near_duplicates
+        kept = [chunk for chunk in chunks if self.check(chunk) is None]
+        if verbose:
+            exact, near = self.exact_duplicates - exact, self.near_duplicates - near
+            print(f"+ Deduplicated {len(chunks)} chunks -> {len(kept)} kept")
+            print(f"  Exact: {exact}, near: {near}, embedding calls saved: {exact + near}")
+        return kept
+
+    def duplicates_of(self, survivor_id: str) -> List[Dict]:
+        """Metadata of the chunks dropped in favour of a surviving chunk"""
+        return [self.duplicates[i]["metadata"] for i in self._by_survivor.get(survivor_id, ())]
+
+    def forget_sources(self, sources: List[str]) -> List[str]:
+        """
+        Drop state for chunks of sources that are being re-indexed or removed
+
+        Their surviving chunks stop matching new chunks, and mapping entries
+        for their dropped duplicates are removed.
+
+        Args:
+            sources: Source paths whose chunks leave the index
+
+        Returns:
+            Other sources that had chunks dropped in favour of a forgotten
+            survivor; their content is no longer indexed and must be reloaded
+        """
+        stale = set(sources)
+        forgotten = set()
+        for chunk_id, (source, text_hash) in list(self._survivors.items()):
+            if source in stale:
+                forgotten.add(chunk_id)
+                del self._survivors[chunk_id]
+                self._exact.pop(text_hash, None)
+                signature = self._signatures.pop(chunk_id)
+                for key in self._band_keys(signature):
+                    self._buckets[key].remove(chunk_id)
+
+        orphans = set()
+        for chunk_id, entry in list(self.duplicates.items()):
+            source = entry["metadata"].get("source")
+            survivor_stale = entry["survivor_id"] in forgotten or entry.get("survivor_source") in stale
+            if survivor_stale or source in stale:
+                if survivor_stale and source not in stale:
+                    orphans.add(source)
+                del self.duplicates[chunk_id]
+        self._by_survivor = {}
+        for chunk_id, entry in self.duplicates.items():
+            self._by_survivor.setdefault(entry["survivor_id"], []).append(chunk_id)
+        return sorted(o for o in orphans if o)
+
+    def report(self) -> Dict:
+        """Counters, including embedding calls saved (one per dropped chunk)"""
+        dropped = self.exact_duplicates + self.near_duplicates
+        return {
+            "chunks_seen": self.chunks_seen,
+            "chunks_kept": self.chunks_seen - dropped,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "embedding_calls_saved": dropped,
+            "chars_saved": self.chars_saved
+        }
+
+    def save(self, path: str):
+        """Write the dropped -> survivor mapping as JSON"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.duplicates, f, ensure_ascii=False, default=str)
+
+    def load(self, path: str):
+        """Restore the dropped -> survivor mapping (signatures are not persisted)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            self.duplicates = json.load(f)
+        self._by_survivor = {}
+        for chunk_id, entry in self.duplicates.items():
+            self._by_survivor.setdefault(entry["survivor_id"], []).append(chunk_id)
+
+
+def attach_duplicate_sources(response: Dict, deduplicator: Optional[ChunkDeduplicator]) -> Dict:
+    """
+    Add the metadata of dropped duplicates to each source in an answer
+
+    Args:
+        response: Response dictionary with a "sources" list
+        deduplicator: Deduplicator holding the mapping (None leaves response as is)
+
+    Returns:
+        Response with "duplicates" added to sources that absorbed duplicates
+    """
+    if deduplicator is None or not deduplicator.duplicates or not response.get("sources"):
+        return response
+
+    sources = []
+    for source in response["sources"]:
+        duplicates = deduplicator.duplicates_of(source.get("metadata", {}).get("chunk_id"))
+        sources.append(dict(source, duplicates=duplicates) if duplicates else source)
+    return dict(response, sources=sources)
@@ -2,23 +2,32 @@
 Document Loader Module
 Handles loading documents from various sources: YouTube, PDF, Wikipedia
 """
-from typing import List
+from typing import Iterator, List
 from langchain.schema import Document
-from langchain_community.document_loaders import (
-    YoutubeLoader,
-    PyPDFLoader,
-    WikipediaLoader
-)
+from text_stream import iter_text_segments
+from source_manifest import SourceManifest, list_files
+from config import Config
+import hashlib
 import os
 
 
+# Source-specific modules (pypdf, pytube, youtube-transcript-api, MediaWiki
+# client) are imported inside the methods that need them, so a course with
+# only PDFs never pays for the YouTube stack and vice versa
+
+
 class DocumentLoader:
     """Load documents from multiple sources"""
     
+    def __init__(self):
+        """Initialize loader"""
+        # Directory scans recorded by commit_manifests() once indexing succeeds
+        self.pending_scans = []
+    
     @staticmethod
     def load_from_youtube(video_url: str) -> List[Document]:
         """
-        Load transcript from YouTube video
+        Load transcript from YouTube video (served from the transcript cache when fresh)
         
         Args:
             video_url: YouTube video URL
@@ -26,18 +35,61 @@ class DocumentLoader:
         Returns:
             List of Document objects
         """
+        from youtube_cache import extract_video_id, get_youtube_store
         try:
-            loader = YoutubeLoader.from_youtube_url(
-                video_url,
-                add_video_info=True
-            )
-            documents = loader.load()
+            video_id = extract_video_id(video_url)
+            doc = get_youtube_store().get(video_id)
+            documents = [doc] if doc is not None else []
             print(f"+ Loaded YouTube video: {video_url}")
             return documents
         except Exception as e:
             print(f"X Error loading YouTube video: {e}")
             return []
     
+    @staticmethod
+    def load_from_youtube_many(urls: List[str]) -> List[Document]:
+        """
+        Load many YouTube videos and playlists concurrently under a rate limit
+        
+        Args:
+            urls: Video and/or playlist URLs
+            
+        Returns:
+            List of Document objects, in input (and playlist) order
+        """
+        from youtube_cache import get_youtube_store
+        return get_youtube_store().load(urls)
+    
+    @staticmethod
+    def iter_pdf_pages(pdf_path: str, workers: int = None) -> Iterator[Document]:
+        """
+        Stream PDF pages as Documents while later pages are still being extracted
+        
+        Pages are extracted in parallel across processes and cached per
+        (file hash, page), so rebuilding from an unchanged PDF skips parsing.
+        
+        Args:
+            pdf_path: Path to PDF file
+            workers: Worker processes (default from config)
+            
+        Yields:
+            One Document per page, in page order
+        """
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        
+        from pdf_extract import iter_pdf_text
+        for page, text in iter_pdf_text(
+            pdf_path,
+            workers=workers or Config.PDF_WORKERS,
+            pages_per_task=Config.PDF_PAGES_PER_TASK,
+            cache_dir=Config.CACHE_DIR
+        ):
+            yield Document(
+                page_content=text,
+                metadata={"source": pdf_path, "page": page}
+            )
+    
     @staticmethod
     def load_from_pdf(pdf_path: str) -> List[Document]:
         """
@@ -50,11 +102,7 @@ class DocumentLoader:
             List of Document objects
         """
         try:
-            if not os.path.exists(pdf_path):
-                raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-            
-            loader = PyPDFLoader(pdf_path)
-            documents = loader.load()
+            documents = list(DocumentLoader.iter_pdf_pages(pdf_path))
             print(f"+ Loaded PDF: {pdf_path} ({len(documents)} pages)")
             return documents
         except Exception as e:
@@ -62,26 +110,65 @@ class DocumentLoader:
             return []
     
     @staticmethod
-    def load_from_wikipedia(query: str, max_docs: int = 2) -> List[Document]:
+    def load_from_wikipedia(query: str, max_docs: int = None) -> List[Document]:
         """
-        Load content from Wikipedia
+        Load content from Wikipedia (served from the article cache when unchanged)
         
         Args:
             query: Search query for Wikipedia
-            max_docs: Maximum number of documents to load
+            max_docs: Maximum number of documents to load (default from config)
             
         Returns:
             List of Document objects
         """
+        from wikipedia_cache import get_wikipedia_store
         try:
-            loader = WikipediaLoader(query=query, load_max_docs=max_docs)
-            documents = loader.load()
+            documents = get_wikipedia_store().load([query], max_docs or Config.WIKIPEDIA_MAX_DOCS)
             print(f"+ Loaded Wikipedia articles for: {query}")
             return documents
         except Exception as e:
             print(f"X Error loading Wikipedia: {e}")
             return []
     
+    @staticmethod
+    def load_from_wikipedia_many(queries: List[str], max_docs: int = None) -> List[Document]:
+        """
+        Load Wikipedia articles for many queries concurrently
+        
+        Args:
+            queries: Search queries
+            max_docs: Articles per query (default from config)
+            
+        Returns:
+            List of Document objects, in query order
+        """
+        from wikipedia_cache import get_wikipedia_store
+        return get_wikipedia_store().load(queries, max_docs or Config.WIKIPEDIA_MAX_DOCS)
+    
+    @staticmethod
+    def iter_wikipedia_articles(source) -> Iterator[Document]:
+        """
+        Stream articles from a local Wikipedia XML dump without network access
+        
+        Args:
+            source: Dump path, or {'path': ..., 'titles': [...], 'max_pages': N}
+            
+        Yields:
+            One Document per article
+        """
+        if isinstance(source, str):
+            source = {'path': source}
+        if not os.path.exists(source['path']):
+            raise FileNotFoundError(f"Wikipedia dump not found: {source['path']}")
+        
+        from wikipedia_cache import iter_wikipedia_dump
+        yield from iter_wikipedia_dump(
+            source['path'],
+            lang=Config.WIKIPEDIA_LANG,
+            titles=source.get('titles'),
+            max_pages=source.get('max_pages', 0)
+        )
+    
     @staticmethod
     def load_from_text(text_path: str) -> List[Document]:
         """
@@ -109,3 +196,162 @@ class DocumentLoader:
         except Exception as e:
             print(f"X Error loading text file: {e}")
             return []
+    
+    @staticmethod
+    def iter_text_segments(text_path: str) -> Iterator[Document]:
+        """
+        Stream a large text file as segments without reading it into memory
+        
+        Args:
+            text_path: Path to text file
+            
+        Yields:
+            One Document per segment, with byte and character offsets
+        """
+        if not os.path.exists(text_path):
+            raise FileNotFoundError(f"Text file not found: {text_path}")
+        
+        for i, (segment, byte_start, byte_end, char_start) in enumerate(iter_text_segments(
+            text_path,
+            segment_chars=Config.TEXT_SEGMENT_CHARS,
+            window_bytes=Config.TEXT_WINDOW_BYTES
+        )):
+            yield Document(
+                page_content=segment,
+                metadata={
+                    "source": text_path,
+                    "segment": i,
+                    "byte_start": byte_start,
+                    "byte_end": byte_end,
+                    "char_start": char_start
+                }
+            )
+    
+    def iter_sources(self, sources: dict, changed_only: bool = False) -> Iterator[Document]:
+        """
+        Yield documents from every configured source, one source at a time
+        
+        Args:
+            sources: Dictionary with source types and paths/URLs
+                    {
+                        'youtube': ['url1', 'url2'],
+                        'pdf': ['path1', 'path2'],
+                        'wikipedia': ['query1', 'query2'],
+                        'wikipedia_dump': ['enwiki-pages-articles.xml.bz2'],
+                        'text': ['path1', 'path2'],
+                        'directory': ['course/', 'notes/**/*.md']
+                    }
+            changed_only: For 'directory' sources, only load new or modified files
+            
+        Yields:
+            Document objects (PDF pages stream as they are extracted)
+        """
+        # Load YouTube videos and playlists
+        if sources.get('youtube'):
+            yield from self.load_from_youtube_many(sources['youtube'])
+        
+        # Load PDFs
+        for path in sources.get('pdf', []):
+            yield from self._iter_pdf(path)
+        
+        # Load Wikipedia articles
+        if sources.get('wikipedia'):
+            yield from self.load_from_wikipedia_many(sources['wikipedia'])
+        
+        # Stream articles from local Wikipedia dumps
+        for dump in sources.get('wikipedia_dump', []):
+            try:
+                articles = 0
+                for doc in self.iter_wikipedia_articles(dump):
+                    articles += 1
+                    yield doc
+                print(f"+ Loaded Wikipedia dump: {dump} ({articles} articles)")
+            except Exception as e:
+                print(f"X Error loading Wikipedia dump: {e}")
+        
+        # Load text files (large ones stream in segments)
+        for path in sources.get('text', []):
+            yield from self._iter_text(path)
+        
+        # Load directory trees / glob patterns
+        for source in sources.get('directory', []):
+            yield from self.iter_directory(source, changed_only=changed_only)
+    
+    def _iter_pdf(self, path: str) -> Iterator[Document]:
+        try:
+            pages = 0
+            for doc in self.iter_pdf_pages(path):
+                pages += 1
+                yield doc
+            print(f"+ Loaded PDF: {path} ({pages} pages)")
+        except Exception as e:
+            print(f"X Error loading PDF: {e}")
+    
+    def _iter_text(self, path: str) -> Iterator[Document]:
+        if os.path.exists(path) and os.path.getsize(path) >= Config.TEXT_STREAM_MIN_BYTES:
+            try:
+                segments = 0
+                for doc in self.iter_text_segments(path):
+                    segments += 1
+                    yield doc
+                print(f"+ Loaded text file: {path} ({segments} segments)")
+            except Exception as e:
+                print(f"X Error loading text file: {e}")
+        else:
+            yield from self.load_from_text(path)
+    
+    def iter_directory(self, source, changed_only: bool = False) -> Iterator[Document]:
+        """
+        Load files from a directory tree or glob pattern, tracked by a manifest
+        
+        The scan is queued in pending_scans; call commit_manifests() after the
+        documents are indexed so a failed run is retried in full next time.
+        
+        Args:
+            source: Directory/glob, or {'path': ..., 'extensions': ['.pdf', ...]}
+            changed_only: Only load files that are new or modified since the
+                          last committed scan
+            
+        Yields:
+            Documents from the selected files (PDFs as pages)
+        """
+        if isinstance(source, str):
+            source = {'path': source}
+        pattern = source['path']
+        extensions = [e.lower() for e in source.get('extensions') or Config.DIRECTORY_EXTENSIONS]
+        
+        key = hashlib.sha1(f"{os.path.abspath(pattern)}|{','.join(sorted(extensions))}".encode('utf-8'))
+        manifest = SourceManifest(os.path.join(Config.CACHE_DIR, 'manifests', f"{key.hexdigest()[:16]}.json"))
+        
+        files = list_files(pattern, extensions)
+        scan = manifest.scan(files)
+        self.pending_scans.append((manifest, scan))
+        counts = scan.summary()
+        print(f"+ Scanned {pattern}: {counts['added']} new, {counts['modified']} modified, "
+              f"{counts['unchanged']} unchanged, {counts['removed']} removed "
+              f"({counts['hashed']} hashed)")
+        
+        for path in (scan.changed if changed_only else files):
+            yield from self.iter_file(path)
+    
+    def iter_file(self, path: str) -> Iterator[Document]:
+        """Load one file by extension (PDF pages, otherwise text)"""
+        if path.lower().endswith('.pdf'):
+            yield from self._iter_pdf(path)
+        else:
+            yield from self._iter_text(path)
+    
+    @property
+    def stale_sources(self) -> List[str]:
+        """Files from pending scans whose previously indexed chunks are out of date"""
+        return [path for _, scan in self.pending_scans for path in scan.modified + scan.removed]
+    
+    def commit_manifests(self):
+        """Record pending directory scans as ingested"""
+        for manifest, scan in self.pending_scans:
+            manifest.commit(scan)
+        self.pending_scans = []
+    
+    def discard_scans(self):
+        """Drop pending directory scans after a failed run (the next scan sees the same changes)"""
+        self.pending_scans = []
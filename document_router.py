@@ -0,0 +1,125 @@
+"""
+Document Router Module
+Two-stage retrieval: a query first picks the documents whose centroid is
+closest, then only those documents' chunks are scored. With thousands of
+lectures a query touches a few hundred chunk vectors instead of all of them.
+
+    routing.npz   document keys, unit centroids and each document's chunk
+                  positions, saved with the snapshot whose positions they index
+"""
+from typing import Callable, List, Sequence, Tuple
+import numpy as np
+
+ROUTING_FILE = "routing.npz"
+
+# fetch(positions) -> [len(positions), dim] chunk vectors (any float dtype)
+Fetch = Callable[[np.ndarray], np.ndarray]
+
+
+class DocumentRouter:
+    """Coarse index of per-document centroids over a chunk index"""
+
+    def __init__(self, keys: List[str], centroids: np.ndarray, members: List[np.ndarray]):
+        """
+        Initialize router
+
+        Args:
+            keys: Document key (source) per row of centroids
+            centroids: [documents, dim] float32 unit vectors
+            members: Chunk index positions of each document
+        """
+        self.keys = keys
+        self.centroids = centroids
+        self.members = members
+
+    @property
+    def total(self) -> int:
+        """Chunk positions covered"""
+        return sum(len(m) for m in self.members)
+
+    @classmethod
+    def build(cls, doc_keys: Sequence[str], fetch: Fetch, batch_size: int = 10000) -> 'DocumentRouter':
+        """
+        Average each document's chunk vectors into a unit centroid
+
+        Args:
+            doc_keys: Document key of every chunk, in index position order
+            fetch: Returns the chunk vectors at the given positions
+            batch_size: Chunks read per step (bounds memory for large indexes)
+        """
+        keys, inverse = np.unique(np.asarray(doc_keys, dtype=object).astype(str), return_inverse=True)
+        sums = None
+        for start in range(0, len(doc_keys), batch_size):
+            end = min(start + batch_size, len(doc_keys))
+            vectors = np.asarray(fetch(np.arange(start, end)), dtype=np.float32)
+            if sums is None:
+                sums = np.zeros((len(keys), vectors.shape[1]), dtype=np.float32)
+            # Sorting the batch by document makes each document's rows contiguous
+            groups = inverse[start:end]
+            order = np.argsort(groups, kind='stable')
+            groups = groups[order]
+            starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+            sums[groups[starts]] += np.add.reduceat(vectors[order], starts, axis=0)
+        if sums is None:
+            return cls([], np.zeros((0, 0), dtype=np.float32), [])
+
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        centroids = sums / np.maximum(norms, 1e-12)
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.searchsorted(inverse[order], np.arange(len(keys) + 1))
+        members = [order[bounds[i]:bounds[i + 1]] for i in range(len(keys))]
+        return cls(list(keys), centroids, members)
+
+    def route(self, query: np.ndarray, fan_out: int) -> np.ndarray:
+        """Indices of the fan_out documents most similar to the query, best first"""
+        query = np.asarray(query, dtype=np.float32)
+        scores = self.centroids @ (query / max(np.linalg.norm(query), 1e-12))
+        if fan_out >= len(scores):
+            return np.argsort(-scores)
+        top = np.argpartition(-scores, fan_out)[:fan_out]
+        return top[np.argsort(-scores[top])]
+
+    def search(self, query, k: int, fan_out: int, fetch: Fetch) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Nearest chunks within the routed documents
+
+        Args:
+            query: Query vector
+            k: Chunks to return
+            fan_out: Documents searched
+            fetch: Returns the chunk vectors at the given positions
+
+        Returns:
+            (positions, squared L2 distances), nearest first -- the same
+            distances a flat IndexFlatL2 search reports
+        """
+        documents = self.route(query, fan_out)
+        if not len(documents):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        positions = np.concatenate([self.members[d] for d in documents])
+        vectors = np.asarray(fetch(positions), dtype=np.float32)
+        distances = ((vectors - np.asarray(query, dtype=np.float32)) ** 2).sum(axis=1)
+        if k < len(distances):
+            top = np.argpartition(distances, k)[:k]
+        else:
+            top = np.arange(len(distances))
+        top = top[np.argsort(distances[top])]
+        return positions[top], distances[top]
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            np.savez(
+                f,
+                keys=np.asarray(self.keys, dtype=str),
+                centroids=self.centroids,
+                positions=np.concatenate(self.members) if self.members else np.zeros(0, dtype=np.int64),
+                counts=np.asarray([len(m) for m in self.members], dtype=np.int64)
+            )
+
+    @classmethod
+    def load(cls, path: str) -> 'DocumentRouter':
+        with np.load(path) as data:
+            offsets = np.r_[0, np.cumsum(data["counts"])]
+            positions = data["positions"]
+            members = [positions[offsets[i]:offsets[i + 1]] for i in range(len(data["counts"]))]
+            return cls([str(k) for k in data["keys"]], data["centroids"], members)
@@ -0,0 +1,173 @@
+"""
+Embedding Store Module
+Raw chunk embeddings kept next to the index, so an index of a different
+type, shard layout or quantization can be rebuilt without re-embedding.
+
+    embeddings.npy   float16 [n, dim], row i belongs to line i of chunks.jsonl
+    chunks.jsonl     {"id", "text", "metadata"} per row, id = chunk id
+
+float16 halves the file relative to the float32 vectors FAISS holds; the
+rounding error (~1e-3 relative) is far below what changes a neighbour
+ranking for normalized text embeddings.
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import json
+import os
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.jsonl"
+
+
+class EmbeddingTable:
+    """Append/delete log of float16 vectors keyed by chunk id"""
+
+    def __init__(self):
+        self._blocks: List[np.ndarray] = []
+        self._where: Dict[str, Tuple[int, int]] = {}  # chunk id -> (block, row)
+        self._rows = 0  # rows held in blocks, including removed ones
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._where
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return self._blocks[0].shape[1] if self._blocks else None
+
+    def add(self, ids: Sequence[str], vectors):
+        """Record vectors (any float array-like, one row per id)"""
+        block = np.asarray(vectors, dtype=np.float16)
+        if block.ndim != 2 or len(block) != len(ids):
+            raise ValueError(f"Expected {len(ids)} vectors, got shape {block.shape}")
+        index = len(self._blocks)
+        self._blocks.append(block)
+        for row, chunk_id in enumerate(ids):
+            self._where[chunk_id] = (index, row)
+        self._rows += len(block)
+
+    def remove(self, ids: Iterable[str]):
+        for chunk_id in ids:
+            self._where.pop(chunk_id, None)
+        if self._rows > 2 * len(self._where) + 1024:
+            self._compact()
+
+    def _compact(self):
+        """Copy live rows into one block so removed sources stop holding memory"""
+        ids = list(self._where)
+        vectors = [self.get(chunk_id) for chunk_id in ids]
+        self._blocks, self._where, self._rows = [], {}, 0
+        if ids:
+            self.add(ids, np.stack(vectors))
+
+    def get(self, chunk_id: str) -> Optional[np.ndarray]:
+        location = self._where.get(chunk_id)
+        if location is None:
+            return None
+        block, row = location
+        return self._blocks[block][row]
+
+    def stack(self, ids: Sequence[str], fallback=None) -> np.ndarray:
+        """float16 [len(ids), dim] matrix in the given order (fallback as in write)"""
+        rows = []
+        for position, chunk_id in enumerate(ids):
+            vector = self.get(chunk_id)
+            rows.append(fallback(position) if vector is None else vector)
+        return np.asarray(rows, dtype=np.float16)
+
+    def write(self, path: str, ids: Sequence[str], fallback=None):
+        """
+        Write embeddings.npy with one row per id, in the given order
+
+        Args:
+            path: Output file
+            ids: Row order (normally index position order)
+            fallback: Optional callable(position) -> vector for ids not in the
+                table (e.g. reconstructing from a flat index)
+        """
+        dimension = self.dimension
+        if dimension is None and fallback is not None and ids:
+            dimension = len(fallback(0))
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=np.float16,
+                                        shape=(len(ids), dimension or 0))
+        for position, chunk_id in enumerate(ids):
+            vector = self.get(chunk_id)
+            if vector is None:
+                vector = fallback(position)
+            out[position] = vector
+        out.flush()
+        del out
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['EmbeddingTable']:
+        """Table backed by a snapshot's files (memory-mapped), or None if absent"""
+        embeddings_path = os.path.join(directory, EMBEDDINGS_FILE)
+        chunks_path = os.path.join(directory, CHUNKS_FILE)
+        if not (os.path.exists(embeddings_path) and os.path.exists(chunks_path)):
+            return None
+        table = cls()
+        vectors = np.load(embeddings_path, mmap_mode='r')
+        ids = [chunk["id"] for chunk in read_chunks(chunks_path)]
+        if len(ids) != len(vectors):
+            raise ValueError(f"{CHUNKS_FILE} has {len(ids)} rows, {EMBEDDINGS_FILE} has {len(vectors)}")
+        if len(ids):
+            table.add(ids, vectors)
+        return table
+
+
+def write_chunks(path: str, chunks: Iterable[Tuple[str, str, Dict]]):
+    """Write (id, text, metadata) rows as chunks.jsonl"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for chunk_id, text, metadata in chunks:
+            f.write(json.dumps({"id": chunk_id, "text": text, "metadata": metadata},
+                               ensure_ascii=False, default=str) + "\n")
+
+
+def read_chunks(path: str) -> Iterator[Dict]:
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def write_docstore(chunks: Iterable[Dict], path: str) -> int:
+    """
+    Write index.pkl as FAISS.load_local expects it from chunk rows
+
+    Args:
+        chunks: Chunk dicts in index position order
+        path: Output index.pkl
+
+    Returns:
+        Number of chunks written
+    """
+    import pickle
+    from langchain.schema import Document
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+
+    documents = {}
+    index_to_docstore_id = {}
+    for position, chunk in enumerate(chunks):
+        documents[chunk["id"]] = Document(page_content=chunk["text"], metadata=chunk["metadata"])
+        index_to_docstore_id[position] = chunk["id"]
+    with open(path, 'wb') as f:
+        pickle.dump((InMemoryDocstore(documents), index_to_docstore_id), f)
+    return len(index_to_docstore_id)
+
+
+def load_raw(directory: str, mmap: bool = True) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    Embeddings and chunk rows of a snapshot
+
+    Returns:
+        (float16 [n, dim] array, list of chunk dicts in row order)
+    """
+    embeddings_path = os.path.join(directory, EMBEDDINGS_FILE)
+    if not os.path.exists(embeddings_path):
+        raise FileNotFoundError(f"No raw embeddings in {directory} (saved before they were kept?)")
+    vectors = np.load(embeddings_path, mmap_mode='r' if mmap else None)
+    chunks = list(read_chunks(os.path.join(directory, CHUNKS_FILE)))
+    if len(chunks) != len(vectors):
+        raise ValueError(f"{CHUNKS_FILE} has {len(chunks)} rows, {EMBEDDINGS_FILE} has {len(vectors)}")
+    return vectors, chunks
@@ -1,18 +1,20 @@
-import PyPDF2
 import sys
 import io
+from pdf_extract import iter_pdf_text
+from config import Config
 
 # Set UTF-8 encoding for stdout
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
 
 def extract_text_from_pdf(pdf_path):
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
+        pages = iter_pdf_text(
+            pdf_path,
+            workers=Config.PDF_WORKERS,
+            pages_per_task=Config.PDF_PAGES_PER_TASK,
+            cache_dir=Config.CACHE_DIR
+        )
+        return "".join(text + "\n" for _, text in pages)
     except Exception as e:
         return str(e)
 
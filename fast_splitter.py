@@ -0,0 +1,131 @@
+"""
+Fast Splitter Module
+Single-pass recursive character splitter that works on (start, end)
+offsets into the original text instead of slicing and re-joining strings.
+Produces the same chunk boundaries as LangChain's
+RecursiveCharacterTextSplitter (keep_separator=True, strip_whitespace=True).
+"""
+from typing import Callable, List, Optional, Tuple
+from collections import deque
+
+Span = Tuple[int, int]
+LengthFunction = Callable[[int, int], int]
+
+
+class FastRecursiveSplitter:
+    """Offset-based drop-in for RecursiveCharacterTextSplitter"""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: List[str] = None):
+        """
+        Initialize splitter
+
+        Args:
+            chunk_size: Maximum chunk length
+            chunk_overlap: Overlap between consecutive chunks
+            separators: Separators tried in order (default paragraph, line, word, char)
+        """
+        if chunk_overlap > chunk_size:
+            raise ValueError(
+                f"Got a larger chunk overlap ({chunk_overlap}) than chunk size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or ["\n\n", "\n", " ", ""]
+
+    def split_spans(self, text: str, length: Optional[LengthFunction] = None) -> List[Span]:
+        """
+        Split text into chunk spans
+
+        Args:
+            text: Text to split
+            length: Length of text[start:end] (default: character count)
+
+        Returns:
+            List of (start, end) offsets, one per chunk
+        """
+        length = length or (lambda start, end: end - start)
+        spans = []
+        self._split(text, 0, len(text), self.separators, length, spans)
+        return spans
+
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunk strings"""
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def _split(self, text: str, start: int, end: int, separators: List[str],
+               length: LengthFunction, out: List[Span]):
+        # Pick the first separator present in this span
+        separator = separators[-1]
+        new_separators = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        good = []
+        for piece in self._pieces(text, start, end, separator):
+            piece_length = length(*piece)
+            if piece_length < self.chunk_size:
+                good.append((piece, piece_length))
+                continue
+
+            if good:
+                self._merge(text, good, out)
+                good = []
+            if not new_separators:
+                # Unsplittable piece is emitted as-is (not stripped), like LangChain
+                out.append(piece)
+            else:
+                self._split(text, piece[0], piece[1], new_separators, length, out)
+
+        if good:
+            self._merge(text, good, out)
+
+    @staticmethod
+    def _pieces(text: str, start: int, end: int, separator: str) -> List[Span]:
+        """Split a span on separator, keeping the separator at the start of each piece"""
+        if not separator:
+            return [(i, i + 1) for i in range(start, end)]
+
+        pieces = []
+        step = len(separator)
+        previous = start
+        position = text.find(separator, start, end)
+        while position != -1:
+            if position > previous:
+                pieces.append((previous, position))
+            previous = position
+            position = text.find(separator, position + step, end)
+        if end > previous:
+            pieces.append((previous, end))
+        return pieces
+
+    def _merge(self, text: str, splits: List[Tuple[Span, int]], out: List[Span]):
+        """Greedily merge adjacent (span, length) pieces into chunks with overlap"""
+        current = deque()
+        total = 0
+        for piece, piece_length in splits:
+            if total + piece_length > self.chunk_size and current:
+                self._emit(text, current[0][0][0], current[-1][0][1], out)
+                while total > self.chunk_overlap or (
+                    total + piece_length > self.chunk_size and total > 0
+                ):
+                    total -= current.popleft()[1]
+            current.append((piece, piece_length))
+            total += piece_length
+        if current:
+            self._emit(text, current[0][0][0], current[-1][0][1], out)
+
+    @staticmethod
+    def _emit(text: str, start: int, end: int, out: List[Span]):
+        """Append a stripped span, skipping whitespace-only chunks"""
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            out.append((start, end))
@@ -0,0 +1,241 @@
+"""
+Ingestion Pipeline Module
+Runs load -> split -> embed -> index as concurrent stages connected by
+bounded queues, so CPU parsing overlaps network embedding and peak memory
+stays bounded by the queue sizes instead of the whole corpus
+"""
+from typing import Callable, Dict, List
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage"""
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items_in: int, items_out: int, seconds: float):
+        with self._lock:
+            self.items_in += items_in
+            self.items_out += items_out
+            self.busy_seconds += seconds
+
+    def summary(self, wall_seconds: float) -> Dict:
+        """Counters plus items/s over wall-clock time"""
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items_out / wall_seconds, 2) if wall_seconds else 0.0
+        }
+
+
+class IngestionPipeline:
+    """Bounded-queue pipeline from document sources to the vector index"""
+
+    def __init__(self, loader, chunker, vector_store_manager, batch_size: int,
+                 split_workers: int, embed_workers: int, queue_size: int,
+                 deduplicator=None):
+        """
+        Initialize pipeline
+
+        Args:
+            loader: DocumentLoader instance
+            chunker: TextChunker instance
+            vector_store_manager: Manager exposing `embeddings` and add_embeddings()
+            batch_size: Chunks per embedding request
+            split_workers: Threads splitting documents
+            embed_workers: Threads calling the embedding model concurrently
+            queue_size: Capacity of each inter-stage queue
+            deduplicator: Optional ChunkDeduplicator; duplicates are dropped
+                          before batching so they are never embedded
+        """
+        self.loader = loader
+        self.chunker = chunker
+        self.vector_store_manager = vector_store_manager
+        self.batch_size = batch_size
+        self.split_workers = split_workers
+        self.embed_workers = embed_workers
+        self.queue_size = queue_size
+        self.deduplicator = deduplicator
+
+        self._error = None
+        self._failed = threading.Event()
+
+    def _put(self, q: queue.Queue, item):
+        """Blocking put that gives up once another stage has failed"""
+        while not self._failed.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, q: queue.Queue):
+        """Blocking get that gives up once another stage has failed"""
+        while not self._failed.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: Exception):
+        if self._error is None:
+            self._error = error
+        self._failed.set()
+
+    def _run_stage(self, workers: int, target: Callable, inbox: queue.Queue,
+                   outbox: queue.Queue, downstream_workers: int) -> List[threading.Thread]:
+        """Start workers; the last one to finish sends one end marker per downstream worker"""
+        remaining = [workers]
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                target(inbox, outbox)
+            except Exception as e:
+                self._fail(e)
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last and outbox is not None:
+                    for _ in range(downstream_workers):
+                        self._put(outbox, _DONE)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self, sources: dict) -> Dict:
+        """
+        Ingest sources into the vector store
+
+        Args:
+            sources: Dictionary with source types and paths/URLs
+
+        Returns:
+            Totals and per-stage throughput report
+        """
+        self._error = None
+        self._failed.clear()
+
+        documents_q = queue.Queue(self.queue_size)
+        chunks_q = queue.Queue(self.queue_size * self.batch_size)
+        batches_q = queue.Queue(self.queue_size)
+        embedded_q = queue.Queue(self.queue_size)
+
+        stats = {
+            "load": StageStats("load", 1),
+            "split": StageStats("split", self.split_workers),
+            "batch": StageStats("batch", 1),
+            "embed": StageStats("embed", self.embed_workers),
+            "index": StageStats("index", 1)
+        }
+        embeddings = self.vector_store_manager.embeddings
+
+        def load(inbox, outbox):
+            start_time = time.time()
+            for doc in self.loader.iter_sources(sources):
+                stats["load"].record(0, 1, time.time() - start_time)
+                self._put(outbox, doc)
+                if self._failed.is_set():
+                    return
+                start_time = time.time()
+
+        def split(inbox, outbox):
+            while True:
+                doc = self._get(inbox)
+                if doc is _DONE:
+                    return
+                start_time = time.time()
+                chunks = self.chunker.split_documents([doc], verbose=False)
+                stats["split"].record(1, len(chunks), time.time() - start_time)
+                for chunk in chunks:
+                    self._put(outbox, chunk)
+
+        def batch(inbox, outbox):
+            pending = []
+            while True:
+                chunk = self._get(inbox)
+                if chunk is _DONE:
+                    break
+                if self.deduplicator is not None and self.deduplicator.check(chunk) is not None:
+                    continue
+                pending.append(chunk)
+                if len(pending) >= self.batch_size:
+                    stats["batch"].record(len(pending), 1, 0.0)
+                    self._put(outbox, pending)
+                    pending = []
+            if pending and not self._failed.is_set():
+                stats["batch"].record(len(pending), 1, 0.0)
+                self._put(outbox, pending)
+
+        def embed(inbox, outbox):
+            while True:
+                chunks = self._get(inbox)
+                if chunks is _DONE:
+                    return
+                start_time = time.time()
+                vectors = embeddings.embed_documents([c.page_content for c in chunks])
+                stats["embed"].record(len(chunks), len(chunks), time.time() - start_time)
+                self._put(outbox, (chunks, vectors))
+
+        def index(inbox, outbox):
+            while True:
+                item = self._get(inbox)
+                if item is _DONE:
+                    return
+                chunks, vectors = item
+                start_time = time.time()
+                self.vector_store_manager.add_embeddings(
+                    [c.page_content for c in chunks],
+                    vectors,
+                    [c.metadata for c in chunks]
+                )
+                stats["index"].record(len(chunks), len(chunks), time.time() - start_time)
+
+        wall_start = time.time()
+        threads = []
+        threads += self._run_stage(1, load, None, documents_q, self.split_workers)
+        threads += self._run_stage(self.split_workers, split, documents_q, chunks_q, 1)
+        threads += self._run_stage(1, batch, chunks_q, batches_q, self.embed_workers)
+        threads += self._run_stage(self.embed_workers, embed, batches_q, embedded_q, 1)
+        threads += self._run_stage(1, index, embedded_q, None, 0)
+        for thread in threads:
+            thread.join()
+        wall_seconds = time.time() - wall_start
+
+        if self._error is not None:
+            raise self._error
+
+        report = {
+            "documents_loaded": stats["load"].items_out,
+            "chunks_created": stats["split"].items_out,
+            "chunks_indexed": stats["index"].items_out,
+            "wall_seconds": round(wall_seconds, 3),
+            "stages": [s.summary(wall_seconds) for s in stats.values()]
+        }
+        if self.deduplicator is not None:
+            report["dedup"] = self.deduplicator.report()
+
+        print(f"+ Pipelined ingestion: {report['documents_loaded']} documents -> "
+              f"{report['chunks_indexed']} chunks in {wall_seconds:.2f}s")
+        for stage in report["stages"]:
+            print(f"  {stage['stage']:<6} x{stage['workers']}: {stage['items_out']} items, "
+                  f"{stage['items_per_second']}/s, busy {stage['busy_seconds']}s")
+
+        return report
@@ -2,11 +2,13 @@
 AI Teaching Assistant - Main Application
 Complete RAG pipeline implementation
 """
-from document_loader import DocumentLoader
-from text_splitter import TextChunker
 from vector_store import VectorStoreManager
-from rag_chain import RAGChain
+from singleflight import SingleFlight, normalize_question
+from ingestion_pipeline import IngestionPipeline
+from snapshots import current_snapshot, snapshot_path, write_snapshot
 from config import Config
+import argparse
+import contextlib
 import os
 
 
@@ -15,15 +17,42 @@ class AITeachingAssistant:
     
     def __init__(self):
         """Initialize the teaching assistant"""
-        self.loader = DocumentLoader()
-        self.chunker = TextChunker()
+        # Loader and chunker (and their LangChain/parser imports) are built on
+        # first use so importing this module and starting a server stay fast
+        self._loader = None
+        self._chunker = None
         self.vector_store_manager = VectorStoreManager()
         self.rag_chain = None
         
+        # Identical concurrent questions share one execution; the version
+        # keeps answers from an old knowledge base from being shared
+        self.singleflight = SingleFlight()
+        self.knowledge_base_version = 0
+        
+        # Dropped duplicate chunk -> surviving chunk, for source attribution
+        self.deduplicator = None
+        
+        # Snapshot (see snapshots.py) the in-memory index was loaded from or saved as
+        self.snapshot_version = None
+        
         print("=" * 60)
         print("AI Teaching Assistant Initialized")
         print("=" * 60)
     
+    @property
+    def loader(self):
+        if self._loader is None:
+            from document_loader import DocumentLoader
+            self._loader = DocumentLoader()
+        return self._loader
+    
+    @property
+    def chunker(self):
+        if self._chunker is None:
+            from text_splitter import TextChunker
+            self._chunker = TextChunker()
+        return self._chunker
+    
     def load_course_materials(self, sources: dict):
         """
         Load course materials from multiple sources
@@ -34,41 +63,30 @@ class AITeachingAssistant:
                         'youtube': ['url1', 'url2'],
                         'pdf': ['path1', 'path2'],
                         'wikipedia': ['query1', 'query2'],
-                        'text': ['path1', 'path2']
+                        'text': ['path1', 'path2'],
+                        'directory': ['course/', 'notes/**/*.md']
                     }
         """
-        all_documents = []
-        
         print("\nLoading Course Materials...")
         print("-" * 60)
         
-        # Load YouTube videos
-        if 'youtube' in sources:
-            for url in sources['youtube']:
-                docs = self.loader.load_from_youtube(url)
-                all_documents.extend(docs)
-        
-        # Load PDFs
-        if 'pdf' in sources:
-            for path in sources['pdf']:
-                docs = self.loader.load_from_pdf(path)
-                all_documents.extend(docs)
-        
-        # Load Wikipedia articles
-        if 'wikipedia' in sources:
-            for query in sources['wikipedia']:
-                docs = self.loader.load_from_wikipedia(query)
-                all_documents.extend(docs)
-        
-        # Load text files
-        if 'text' in sources:
-            for path in sources['text']:
-                docs = self.loader.load_from_text(path)
-                all_documents.extend(docs)
+        all_documents = list(self.loader.iter_sources(sources))
         
         print(f"\nTotal documents loaded: {len(all_documents)}")
         return all_documents
     
+    def _new_deduplicator(self):
+        from dedup import ChunkDeduplicator
+        return ChunkDeduplicator(
+            threshold=Config.DEDUP_THRESHOLD,
+            num_perm=Config.DEDUP_NUM_PERM,
+            bands=Config.DEDUP_BANDS,
+            shingle_size=Config.DEDUP_SHINGLE_SIZE
+        )
+    
+    def _duplicates_path(self, path: str = None):
+        return os.path.join(path or Config.VECTOR_STORE_PATH, "duplicates.json")
+    
     def process_documents(self, documents):
         """
         Process documents: split into chunks and create embeddings
@@ -80,48 +98,217 @@ class AITeachingAssistant:
         print("-" * 60)
         chunks = self.chunker.split_documents(documents)
         
+        if Config.DEDUP_ENABLED:
+            self.deduplicator = self._new_deduplicator()
+            chunks = self.deduplicator.deduplicate(chunks)
+        
         print("\nCreating Vector Store (Embeddings)...")
         print("-" * 60)
         self.vector_store_manager.create_vector_store(chunks)
+        self.knowledge_base_version += 1
+        if self.vector_store_manager.vector_store is not None:
+            if Config.RETRIEVAL_MODE == 'two_stage':
+                self.vector_store_manager.build_router()
+            self.loader.commit_manifests()
         
         return chunks
     
+    def update_course_materials(self, sources: dict):
+        """
+        Incrementally index new and modified files from 'directory' sources
+        
+        Files are compared against the manifest from the last committed run
+        (size/mtime first, hash only when those differ). Chunks of modified
+        and deleted files are removed before the changed files are added.
+        Other source types have no change detection and are ignored here.
+        
+        Args:
+            sources: Dictionary with a 'directory' list (paths or globs)
+            
+        Returns:
+            Counts of added/modified/removed files and chunks indexed
+        """
+        directories = {'directory': sources.get('directory', [])}
+        try:
+            if self.vector_store_manager.vector_store is None:
+                # Nothing indexed yet: a full build records the manifests
+                documents = self.load_course_materials(directories)
+                chunks = self.process_documents(documents) if documents else []
+                if self.vector_store_manager.vector_store is None:
+                    self.loader.discard_scans()
+                return {"full_rebuild": True, "chunks_indexed": len(chunks)}
+            
+            print("\nUpdating Course Materials...")
+            print("-" * 60)
+            documents = list(self.loader.iter_sources(directories, changed_only=True))
+            report = {"full_rebuild": False}
+            for _, scan in self.loader.pending_scans:
+                for name, count in scan.summary().items():
+                    report[name] = report.get(name, 0) + count
+            
+            # Dropping a file's chunks also drops the only indexed copy of any
+            # duplicates it absorbed, so files owning those duplicates are reloaded
+            stale = set(self.loader.stale_sources)
+            reload = set()
+            while self.deduplicator is not None:
+                orphans = set(self.deduplicator.forget_sources(sorted(stale | reload))) - stale - reload
+                if not orphans:
+                    break
+                reload |= orphans
+            reload = sorted(path for path in reload if os.path.isfile(path))
+            report["reloaded"] = len(reload)
+            
+            self.vector_store_manager.delete_sources(sorted(stale.union(reload)))
+            for path in reload:
+                documents.extend(self.loader.iter_file(path))
+            chunks = self.chunker.split_documents(documents) if documents else []
+            if chunks and self.deduplicator is not None:
+                chunks = self.deduplicator.deduplicate(chunks)
+            if chunks and not self.vector_store_manager.add_documents(chunks):
+                raise RuntimeError(f"indexing {len(chunks)} changed chunks failed")
+            
+            self.knowledge_base_version += 1
+            self.loader.commit_manifests()
+            report["chunks_indexed"] = len(chunks)
+            return report
+        except Exception:
+            # Nothing is recorded: the next run rescans the same changes
+            self.loader.discard_scans()
+            raise
+    
+    def ingest_pipelined(self, sources: dict):
+        """
+        Load, split, embed and index sources as overlapping pipeline stages
+        
+        Args:
+            sources: Dictionary with source types and paths/URLs
+            
+        Returns:
+            Pipeline report with totals and per-stage throughput
+        """
+        print("\nPipelined Ingestion (load -> split -> embed -> index)...")
+        print("-" * 60)
+        
+        # Build into a staging manager so questions keep using the current
+        # index until the new one is complete
+        staging = VectorStoreManager(self.vector_store_manager.api_key)
+        pipeline = IngestionPipeline(
+            self.loader,
+            self.chunker,
+            staging,
+            deduplicator=self._new_deduplicator() if Config.DEDUP_ENABLED else None,
+            batch_size=Config.PIPELINE_BATCH_SIZE,
+            split_workers=Config.PIPELINE_SPLIT_WORKERS,
+            embed_workers=Config.PIPELINE_EMBED_WORKERS,
+            queue_size=Config.PIPELINE_QUEUE_SIZE
+        )
+        report = pipeline.run(sources)
+        
+        if staging.vector_store is not None:
+            self.vector_store_manager.adopt(staging)
+            self.deduplicator = pipeline.deduplicator
+            self.knowledge_base_version += 1
+            self.loader.commit_manifests()
+        
+        return report
+    
     def save_knowledge_base(self, path: str = None):
         """
-        Save the vector store to disk
+        Save the vector store to disk as a new snapshot
+        
+        The snapshot is written next to the live one and published by
+        atomically flipping CURRENT, so concurrent readers and crashes
+        never see a partially written index.
         
         Args:
-            path: Path to save (default from config)
+            path: Knowledge base root (default from config)
+            
+        Returns:
+            Published snapshot version, or None if nothing was saved
         """
         print("\nSaving Knowledge Base...")
         print("-" * 60)
-        self.vector_store_manager.save_vector_store(path)
+        root = path or Config.VECTOR_STORE_PATH
+        try:
+            # A memory-mapped index still reads its snapshot's files
+            protect = [self.vector_store_manager.mapped_path]
+            with write_snapshot(root, keep=Config.SNAPSHOT_KEEP, protect=protect) as (staging, version):
+                if not self.vector_store_manager.save_vector_store(staging):
+                    raise RuntimeError("vector store was not written")
+                if self.deduplicator is not None:
+                    self.deduplicator.save(self._duplicates_path(staging))
+        except Exception as e:
+            print(f"X Error saving knowledge base: {e}")
+            return None
+        
+        self.snapshot_version = version
+        print(f"+ Published snapshot {version}")
+        return version
     
     def load_knowledge_base(self, path: str = None):
         """
-        Load existing vector store from disk
+        Load the current snapshot from disk
+        
+        The new index and duplicate map replace the old ones only once fully
+        loaded, so this doubles as a hot reload: questions already running
+        finish on the index they started with.
         
         Args:
-            path: Path to load from (default from config)
+            path: Knowledge base root (default from config)
+            
+        Returns:
+            True if a vector store was loaded
         """
         print("\nLoading Knowledge Base...")
         print("-" * 60)
-        self.vector_store_manager.load_vector_store(path)
+        root = path or Config.VECTOR_STORE_PATH
+        version = current_snapshot(root)
+        load_path = snapshot_path(root, version)
+        
+        deduplicator = None
+        if os.path.exists(self._duplicates_path(load_path)):
+            deduplicator = self._new_deduplicator()
+            deduplicator.load(self._duplicates_path(load_path))
+        
+        if self.vector_store_manager.load_vector_store(load_path) is None:
+            return False
+        self.deduplicator = deduplicator
+        self.snapshot_version = version
+        self.knowledge_base_version += 1
+        if version:
+            print(f"+ Snapshot: {version}")
+        return True
     
     def initialize_rag(self):
         """Initialize RAG chain for question answering"""
         print("\nInitializing RAG Chain...")
         print("-" * 60)
+        from rag_chain import RAGChain
         self.rag_chain = RAGChain(self.vector_store_manager)
         print("+ RAG chain ready for questions")
     
-    def ask(self, question: str, verbose: bool = True):
+    def _attach_duplicate_sources(self, response):
+        if self.deduplicator is None:
+            return response
+        from dedup import attach_duplicate_sources
+        return attach_duplicate_sources(response, self.deduplicator)
+    
+    def _coalescing_key(self, question: str):
+        """Key shared by identical questions against the same knowledge base"""
+        return (normalize_question(question), self.knowledge_base_version)
+    
+    def ask(self, question: str, verbose: bool = True, guard=None):
         """
         Ask a question to the teaching assistant
         
+        Concurrent identical questions share one ask_question execution.
+        
         Args:
             question: Student's question
             verbose: Whether to print detailed response
+            guard: Optional context manager factory wrapped around the shared
+                   execution only (e.g. admission control), so coalesced
+                   followers do not hold generation slots
             
         Returns:
             Response dictionary
@@ -134,7 +321,14 @@ class AITeachingAssistant:
             print(f"Question: {question}")
             print("=" * 60)
         
-        response = self.rag_chain.ask_question(question)
+        guard = guard or contextlib.nullcontext
+        
+        def execute():
+            with guard():
+                return self.rag_chain.ask_question(question)
+        
+        response = self.singleflight.do(self._coalescing_key(question), execute)
+        response = self._attach_duplicate_sources(dict(response, question=question))
         
         if verbose:
             print(f"\nAnswer:\n{response['answer']}")
@@ -148,6 +342,47 @@ class AITeachingAssistant:
         
         return response
     
+    async def aask(self, question: str):
+        """
+        Ask a question from an asyncio event loop (used by the ASGI server)
+        
+        Args:
+            question: Student's question
+            
+        Returns:
+            Response dictionary
+        """
+        if self.rag_chain is None:
+            self.initialize_rag()
+        
+        response = await self.singleflight.ado(
+            self._coalescing_key(question),
+            lambda: self.rag_chain.aask_question(question)
+        )
+        return self._attach_duplicate_sources(dict(response, question=question))
+    
+    def ask_stream(self, question: str, guard=None):
+        """
+        Stream an answer; concurrent identical questions share one token stream
+        
+        Args:
+            question: Student's question
+            guard: Optional context manager factory wrapped around the shared stream
+            
+        Returns:
+            Iterator of answer text fragments
+        """
+        if self.rag_chain is None:
+            self.initialize_rag()
+        
+        guard = guard or contextlib.nullcontext
+        
+        def source():
+            with guard():
+                yield from self.rag_chain.stream_answer(question)
+        
+        return self.singleflight.stream(self._coalescing_key(question), source)
+    
     def interactive_mode(self):
         """Start interactive Q&A session"""
         print("\n" + "=" * 60)
@@ -179,12 +414,33 @@ class AITeachingAssistant:
                 print(f"\nError: {e}")
 
 
+def update_from_cli(ta, directories):
+    """Incrementally index changed files of the given directories/globs and save"""
+    if os.path.exists(Config.VECTOR_STORE_PATH):
+        ta.load_knowledge_base()
+    report = ta.update_course_materials({'directory': directories})
+    print(f"+ Update: {report}")
+    if report['chunks_indexed'] or report.get('modified') or report.get('removed'):
+        ta.save_knowledge_base()
+    else:
+        print("+ Knowledge base is up to date")
+
+
 def main():
     """Main function - Example usage"""
+    parser = argparse.ArgumentParser(description="AI Teaching Assistant")
+    parser.add_argument('--update', nargs='+', metavar='DIR',
+                        help="index new, modified and deleted files of these directories "
+                             "or globs into the existing knowledge base, save, and exit")
+    args = parser.parse_args()
     
     # Initialize Teaching Assistant
     ta = AITeachingAssistant()
     
+    if args.update:
+        update_from_cli(ta, args.update)
+        return
+    
     # Example: Load course materials
     sources = {
         'youtube': [
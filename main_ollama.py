@@ -2,12 +2,15 @@
 AI Teaching Assistant - Ollama Version (FREE!)
 Complete RAG pipeline using local LLMs
 """
-from document_loader import DocumentLoader
-from text_splitter import TextChunker
 from vector_store_ollama import VectorStoreManagerOllama
-from rag_chain_ollama import RAGChainOllama
+from ollama_warmup import ModelWarmupManager
+from singleflight import SingleFlight, normalize_question
+from ingestion_pipeline import IngestionPipeline
 from config_ollama import ConfigOllama
+import argparse
+import contextlib
 import os
+import time
 
 
 class AITeachingAssistantOllama:
@@ -15,11 +18,25 @@ class AITeachingAssistantOllama:
     
     def __init__(self):
         """Initialize the teaching assistant"""
-        self.loader = DocumentLoader()
-        self.chunker = TextChunker()
+        # Loader and chunker (and their LangChain/parser imports) are built on
+        # first use so importing this module and starting a server stay fast
+        self._loader = None
+        self._chunker = None
         self.vector_store_manager = VectorStoreManagerOllama()
         self.rag_chain = None
         
+        # Identical concurrent questions share one execution; the version
+        # keeps answers from an old knowledge base from being shared
+        self.singleflight = SingleFlight()
+        self.knowledge_base_version = 0
+        
+        # Dropped duplicate chunk -> surviving chunk, for source attribution
+        self.deduplicator = None
+        
+        # Warm both models in the background and keep them resident
+        self.warmup = ModelWarmupManager()
+        self.warmup.start(warm_up=ConfigOllama.OLLAMA_WARMUP_ON_START)
+        
         print("=" * 60)
         print("AI Teaching Assistant Initialized (Ollama - FREE!)")
         print("=" * 60)
@@ -27,74 +44,202 @@ class AITeachingAssistantOllama:
         print(f"Embedding Model: {ConfigOllama.EMBEDDING_MODEL}")
         print("=" * 60)
     
+    @property
+    def loader(self):
+        if self._loader is None:
+            from document_loader import DocumentLoader
+            self._loader = DocumentLoader()
+        return self._loader
+    
+    @property
+    def chunker(self):
+        if self._chunker is None:
+            from text_splitter import TextChunker
+            self._chunker = TextChunker()
+        return self._chunker
+    
     def load_course_materials(self, sources: dict):
         """Load course materials from multiple sources"""
-        all_documents = []
-        
         print("\nLoading Course Materials...")
         print("-" * 60)
         
-        # Load YouTube videos
-        if 'youtube' in sources:
-            for url in sources['youtube']:
-                docs = self.loader.load_from_youtube(url)
-                all_documents.extend(docs)
-        
-        # Load PDFs
-        if 'pdf' in sources:
-            for path in sources['pdf']:
-                docs = self.loader.load_from_pdf(path)
-                all_documents.extend(docs)
-        
-        # Load Wikipedia articles
-        if 'wikipedia' in sources:
-            for query in sources['wikipedia']:
-                docs = self.loader.load_from_wikipedia(query)
-                all_documents.extend(docs)
-        
-        # Load text files
-        if 'text' in sources:
-            for path in sources['text']:
-                docs = self.loader.load_from_text(path)
-                all_documents.extend(docs)
+        all_documents = list(self.loader.iter_sources(sources))
         
         print(f"\nTotal documents loaded: {len(all_documents)}")
         return all_documents
     
+    def _new_deduplicator(self):
+        from dedup import ChunkDeduplicator
+        return ChunkDeduplicator(
+            threshold=ConfigOllama.DEDUP_THRESHOLD,
+            num_perm=ConfigOllama.DEDUP_NUM_PERM,
+            bands=ConfigOllama.DEDUP_BANDS,
+            shingle_size=ConfigOllama.DEDUP_SHINGLE_SIZE
+        )
+    
+    def _duplicates_path(self, path: str = None):
+        return os.path.join(path or ConfigOllama.VECTOR_STORE_PATH, "duplicates.json")
+    
     def process_documents(self, documents):
         """Process documents: split into chunks and create embeddings"""
         print("\nSplitting Documents into Chunks...")
         print("-" * 60)
         chunks = self.chunker.split_documents(documents)
         
+        if ConfigOllama.DEDUP_ENABLED:
+            self.deduplicator = self._new_deduplicator()
+            chunks = self.deduplicator.deduplicate(chunks)
+        
         print("\nCreating Vector Store with Ollama Embeddings...")
         print("-" * 60)
         print("(This may take a few minutes on first run)")
         self.vector_store_manager.create_vector_store(chunks)
+        self.knowledge_base_version += 1
+        if self.vector_store_manager.vector_store is not None:
+            self.loader.commit_manifests()
         
         return chunks
     
+    def update_course_materials(self, sources: dict):
+        """
+        Incrementally index new and modified files from 'directory' sources
+        
+        Files are compared against the manifest from the last committed run
+        (size/mtime first, hash only when those differ). Chunks of modified
+        and deleted files are removed before the changed files are added.
+        Other source types have no change detection and are ignored here.
+        
+        Args:
+            sources: Dictionary with a 'directory' list (paths or globs)
+            
+        Returns:
+            Counts of added/modified/removed files and chunks indexed
+        """
+        directories = {'directory': sources.get('directory', [])}
+        try:
+            if self.vector_store_manager.vector_store is None:
+                # Nothing indexed yet: a full build records the manifests
+                documents = self.load_course_materials(directories)
+                chunks = self.process_documents(documents) if documents else []
+                if self.vector_store_manager.vector_store is None:
+                    self.loader.discard_scans()
+                return {"full_rebuild": True, "chunks_indexed": len(chunks)}
+            
+            print("\nUpdating Course Materials...")
+            print("-" * 60)
+            documents = list(self.loader.iter_sources(directories, changed_only=True))
+            report = {"full_rebuild": False}
+            for _, scan in self.loader.pending_scans:
+                for name, count in scan.summary().items():
+                    report[name] = report.get(name, 0) + count
+            
+            # Dropping a file's chunks also drops the only indexed copy of any
+            # duplicates it absorbed, so files owning those duplicates are reloaded
+            stale = set(self.loader.stale_sources)
+            reload = set()
+            while self.deduplicator is not None:
+                orphans = set(self.deduplicator.forget_sources(sorted(stale | reload))) - stale - reload
+                if not orphans:
+                    break
+                reload |= orphans
+            reload = sorted(path for path in reload if os.path.isfile(path))
+            report["reloaded"] = len(reload)
+            
+            self.vector_store_manager.delete_sources(sorted(stale.union(reload)))
+            for path in reload:
+                documents.extend(self.loader.iter_file(path))
+            chunks = self.chunker.split_documents(documents) if documents else []
+            if chunks and self.deduplicator is not None:
+                chunks = self.deduplicator.deduplicate(chunks)
+            if chunks and not self.vector_store_manager.add_documents(chunks):
+                raise RuntimeError(f"indexing {len(chunks)} changed chunks failed")
+            
+            self.knowledge_base_version += 1
+            self.loader.commit_manifests()
+            report["chunks_indexed"] = len(chunks)
+            return report
+        except Exception:
+            # Nothing is recorded: the next run rescans the same changes
+            self.loader.discard_scans()
+            raise
+    
+    def ingest_pipelined(self, sources: dict):
+        """Load, split, embed and index sources as overlapping pipeline stages"""
+        print("\nPipelined Ingestion (load -> split -> embed -> index)...")
+        print("-" * 60)
+        
+        # Build into a staging collection so questions keep using the current
+        # index until the new one is complete
+        staging = VectorStoreManagerOllama.staging()
+        pipeline = IngestionPipeline(
+            self.loader,
+            self.chunker,
+            staging,
+            deduplicator=self._new_deduplicator() if ConfigOllama.DEDUP_ENABLED else None,
+            batch_size=ConfigOllama.PIPELINE_BATCH_SIZE,
+            split_workers=ConfigOllama.PIPELINE_SPLIT_WORKERS,
+            embed_workers=ConfigOllama.PIPELINE_EMBED_WORKERS,
+            queue_size=ConfigOllama.PIPELINE_QUEUE_SIZE
+        )
+        try:
+            report = pipeline.run(sources)
+        except Exception:
+            staging.discard()
+            raise
+        
+        if staging.vector_store is not None:
+            self.vector_store_manager.adopt(staging)
+            self.deduplicator = pipeline.deduplicator
+            self.knowledge_base_version += 1
+            self.loader.commit_manifests()
+        
+        return report
+    
     def save_knowledge_base(self, path: str = None):
         """Save the vector store to disk"""
         print("\nSaving Knowledge Base...")
         print("-" * 60)
         self.vector_store_manager.save_vector_store(path)
+        if self.deduplicator is not None:
+            self.deduplicator.save(self._duplicates_path(path))
     
     def load_knowledge_base(self, path: str = None):
         """Load existing vector store from disk"""
         print("\nLoading Knowledge Base...")
         print("-" * 60)
         self.vector_store_manager.load_vector_store(path)
+        self.knowledge_base_version += 1
+        
+        self.deduplicator = None
+        if os.path.exists(self._duplicates_path(path)):
+            self.deduplicator = self._new_deduplicator()
+            self.deduplicator.load(self._duplicates_path(path))
     
     def initialize_rag(self):
         """Initialize RAG chain for question answering"""
         print("\nInitializing RAG Chain with Ollama...")
         print("-" * 60)
+        from rag_chain_ollama import RAGChainOllama
         self.rag_chain = RAGChainOllama(self.vector_store_manager)
         print("+ RAG chain ready for questions")
     
-    def ask(self, question: str, verbose: bool = True):
-        """Ask a question to the teaching assistant"""
+    def _attach_duplicate_sources(self, response):
+        if self.deduplicator is None:
+            return response
+        from dedup import attach_duplicate_sources
+        return attach_duplicate_sources(response, self.deduplicator)
+    
+    def _coalescing_key(self, question: str):
+        """Key shared by identical questions against the same knowledge base"""
+        return (normalize_question(question), self.knowledge_base_version)
+    
+    def ask(self, question: str, verbose: bool = True, guard=None):
+        """
+        Ask a question to the teaching assistant
+        
+        Concurrent identical questions share one ask_question execution;
+        guard (e.g. admission control) wraps only that shared execution.
+        """
         if self.rag_chain is None:
             self.initialize_rag()
         
@@ -103,7 +248,17 @@ class AITeachingAssistantOllama:
             print(f"Question: {question}")
             print("=" * 60)
         
-        response = self.rag_chain.ask_question(question)
+        guard = guard or contextlib.nullcontext
+        
+        def execute():
+            with guard():
+                started_at = time.time()
+                response = self.rag_chain.ask_question(question)
+                self.warmup.record_request(started_at, time.time() - started_at)
+                return response
+        
+        response = self.singleflight.do(self._coalescing_key(question), execute)
+        response = self._attach_duplicate_sources(dict(response, question=question))
         
         if verbose:
             print(f"\nAnswer:\n{response['answer']}")
@@ -117,6 +272,35 @@ class AITeachingAssistantOllama:
         
         return response
     
+    async def aask(self, question: str):
+        """Ask a question from an asyncio event loop (used by the ASGI server)"""
+        if self.rag_chain is None:
+            self.initialize_rag()
+        
+        async def execute():
+            started_at = time.time()
+            response = await self.rag_chain.aask_question(question)
+            self.warmup.record_request(started_at, time.time() - started_at)
+            return response
+        
+        response = await self.singleflight.ado(self._coalescing_key(question), execute)
+        return self._attach_duplicate_sources(dict(response, question=question))
+    
+    def ask_stream(self, question: str, guard=None):
+        """Stream an answer; concurrent identical questions share one token stream"""
+        if self.rag_chain is None:
+            self.initialize_rag()
+        
+        guard = guard or contextlib.nullcontext
+        
+        def source():
+            with guard():
+                started_at = time.time()
+                yield from self.rag_chain.stream_answer(question)
+                self.warmup.record_request(started_at, time.time() - started_at)
+        
+        return self.singleflight.stream(self._coalescing_key(question), source)
+    
     def interactive_mode(self):
         """Start interactive Q&A session"""
         print("\n" + "=" * 60)
@@ -148,8 +332,25 @@ class AITeachingAssistantOllama:
                 print(f"\nError: {e}")
 
 
+def update_from_cli(ta, directories):
+    """Incrementally index changed files of the given directories/globs and save"""
+    if os.path.exists(ConfigOllama.VECTOR_STORE_PATH):
+        ta.load_knowledge_base()
+    report = ta.update_course_materials({'directory': directories})
+    print(f"+ Update: {report}")
+    if report['chunks_indexed'] or report.get('modified') or report.get('removed'):
+        ta.save_knowledge_base()
+    else:
+        print("+ Knowledge base is up to date")
+
+
 def main():
     """Main function - Example usage"""
+    parser = argparse.ArgumentParser(description="AI Teaching Assistant")
+    parser.add_argument('--update', nargs='+', metavar='DIR',
+                        help="index new, modified and deleted files of these directories "
+                             "or globs into the existing knowledge base, save, and exit")
+    args = parser.parse_args()
     
     print("\n" + "=" * 70)
     print("AI TEACHING ASSISTANT - OLLAMA VERSION (FREE!)")
@@ -163,6 +364,10 @@ def main():
     # Initialize Teaching Assistant
     ta = AITeachingAssistantOllama()
     
+    if args.update:
+        update_from_cli(ta, args.update)
+        return
+    
     # Check if vector store already exists
     if os.path.exists(ConfigOllama.VECTOR_STORE_PATH):
         print("\nFound existing knowledge base!")
@@ -0,0 +1,363 @@
+"""
+Ollama Load Balancer Module
+Routes generation and embedding calls across several Ollama servers
+using least-outstanding-requests balancing with health checks
+"""
+from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+import threading
+import time
+import requests
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.llms import LLM
+from concurrent.futures import ThreadPoolExecutor
+from config_ollama import ConfigOllama
+
+
+def probe_endpoint(base_url: str, timeout: float = 5) -> Dict:
+    """
+    Probe an Ollama server (same checks as check_ollama.py)
+
+    Args:
+        base_url: Ollama server URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        Dictionary with version, available models and probe latency
+    """
+    start_time = time.time()
+    response = requests.get(f"{base_url}/api/version", timeout=timeout)
+    response.raise_for_status()
+    version = response.json()['version']
+
+    response = requests.get(f"{base_url}/api/tags", timeout=timeout)
+    response.raise_for_status()
+    models = [m['name'] for m in response.json()['models']]
+
+    return {
+        "version": version,
+        "models": models,
+        "latency": time.time() - start_time
+    }
+
+
+class OllamaEndpoint:
+    """Routing state for a single Ollama server"""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.outstanding = 0
+        self.healthy = True
+        self.ejected_until = 0.0
+        self.consecutive_failures = 0
+        self.latency_ewma = None
+        self.total_requests = 0
+        self.total_failures = 0
+        self.ejections = 0
+
+    def available(self, now: float) -> bool:
+        """Whether the endpoint may receive traffic"""
+        return self.healthy and now >= self.ejected_until
+
+    def stats(self) -> Dict:
+        """Snapshot of endpoint counters"""
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "ejected": time.time() < self.ejected_until,
+            "outstanding": self.outstanding,
+            "latency_ewma": self.latency_ewma,
+            "total_requests": self.total_requests,
+            "total_failures": self.total_failures,
+            "ejections": self.ejections
+        }
+
+
+class OllamaLoadBalancer:
+    """Least-outstanding-requests balancer with ejection and readmission"""
+
+    def __init__(self, urls: List[str], required_models: List[str] = None,
+                 failure_threshold: int = None, slow_factor: float = None,
+                 eject_seconds: float = None, probe_interval: float = None,
+                 probe_timeout: float = None, ewma_alpha: float = 0.3):
+        """
+        Initialize load balancer
+
+        Args:
+            urls: Ollama server URLs
+            required_models: Models a node must serve to be considered healthy
+            failure_threshold: Consecutive failures before ejection
+            slow_factor: Eject a node whose latency EWMA exceeds this multiple
+                         of the median of the other available nodes
+            eject_seconds: How long an ejected node stays out of rotation
+            probe_interval: Seconds between background health checks
+            probe_timeout: Health probe timeout in seconds
+            ewma_alpha: Smoothing factor for latency EWMA
+        """
+        if not urls:
+            raise ValueError("At least one Ollama endpoint is required")
+
+        self.endpoints = [OllamaEndpoint(url) for url in urls]
+        self.required_models = required_models or []
+        self.failure_threshold = failure_threshold or ConfigOllama.OLLAMA_FAILURE_THRESHOLD
+        self.slow_factor = slow_factor or ConfigOllama.OLLAMA_SLOW_FACTOR
+        self.eject_seconds = eject_seconds or ConfigOllama.OLLAMA_EJECT_SECONDS
+        self.probe_interval = probe_interval or ConfigOllama.OLLAMA_PROBE_INTERVAL
+        self.probe_timeout = probe_timeout or ConfigOllama.OLLAMA_PROBE_TIMEOUT
+        self.ewma_alpha = ewma_alpha
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._next = 0
+
+    def acquire(self) -> OllamaEndpoint:
+        """
+        Pick the available endpoint with the fewest outstanding requests
+
+        Falls back to every endpoint when none is available, so traffic
+        keeps flowing while the whole pool is degraded.
+        """
+        with self._lock:
+            now = time.time()
+            candidates = [ep for ep in self.endpoints if ep.available(now)] or self.endpoints
+
+            # Rotate the starting point so ties spread evenly
+            start = self._next % len(candidates)
+            self._next += 1
+            rotated = candidates[start:] + candidates[:start]
+            endpoint = min(rotated, key=lambda ep: ep.outstanding)
+
+            endpoint.outstanding += 1
+            endpoint.total_requests += 1
+            return endpoint
+
+    def release(self, endpoint: OllamaEndpoint, latency: float, success: bool):
+        """
+        Record the outcome of a routed request
+
+        Args:
+            endpoint: Endpoint returned by acquire()
+            latency: Request duration in seconds
+            success: Whether the request succeeded
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+
+            if not success:
+                endpoint.total_failures += 1
+                endpoint.consecutive_failures += 1
+                if endpoint.consecutive_failures >= self.failure_threshold:
+                    self._eject(endpoint, "failures")
+                return
+
+            endpoint.consecutive_failures = 0
+            if endpoint.latency_ewma is None:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma = (
+                    self.ewma_alpha * latency + (1 - self.ewma_alpha) * endpoint.latency_ewma
+                )
+
+            if self._is_slow(endpoint):
+                self._eject(endpoint, "slow")
+
+    @contextmanager
+    def route(self):
+        """
+        Context manager yielding the base URL to use for one request
+
+        Usage:
+            with balancer.route() as base_url:
+                requests.post(f"{base_url}/api/generate", ...)
+        """
+        endpoint = self.acquire()
+        start_time = time.time()
+        try:
+            yield endpoint.url
+        except Exception:
+            self.release(endpoint, time.time() - start_time, success=False)
+            raise
+        self.release(endpoint, time.time() - start_time, success=True)
+
+    def post_json(self, path: str, payload: Dict, timeout: float, retries: int = 1) -> Dict:
+        """
+        POST to the least-loaded endpoint, retrying connection failures elsewhere
+
+        Args:
+            path: API path, e.g. '/api/generate'
+            payload: JSON request body
+            timeout: Request timeout in seconds
+            retries: Extra attempts on connection errors
+
+        Returns:
+            Decoded JSON response
+        """
+        for attempt in range(retries + 1):
+            try:
+                with self.route() as base_url:
+                    response = requests.post(f"{base_url}{path}", json=payload, timeout=timeout)
+                    response.raise_for_status()
+                    return response.json()
+            except requests.ConnectionError:
+                if attempt == retries:
+                    raise
+
+    def _is_slow(self, endpoint: OllamaEndpoint) -> bool:
+        """Compare an endpoint's latency with the median of its available peers"""
+        now = time.time()
+        peers = sorted(
+            ep.latency_ewma for ep in self.endpoints
+            if ep is not endpoint and ep.available(now) and ep.latency_ewma is not None
+        )
+        if not peers:
+            return False
+        median = peers[len(peers) // 2]
+        return endpoint.latency_ewma > self.slow_factor * median
+
+    def _eject(self, endpoint: OllamaEndpoint, reason: str):
+        """Take an endpoint out of rotation (never the last available one)"""
+        now = time.time()
+        others = [ep for ep in self.endpoints if ep is not endpoint and ep.available(now)]
+        if not others or not endpoint.available(now):
+            return
+
+        endpoint.ejected_until = now + self.eject_seconds
+        endpoint.ejections += 1
+        # Forget the history so a readmitted node starts from a clean slate
+        endpoint.latency_ewma = None
+        endpoint.consecutive_failures = 0
+        print(f"X Ejected Ollama endpoint {endpoint.url} ({reason}) for {self.eject_seconds:.0f}s")
+
+    def check_health(self):
+        """Probe every endpoint and update its health flag"""
+        for endpoint in self.endpoints:
+            try:
+                info = probe_endpoint(endpoint.url, timeout=self.probe_timeout)
+                missing = [
+                    model for model in self.required_models
+                    if not any(name.split(':')[0] == model.split(':')[0] for name in info['models'])
+                ]
+                healthy = not missing
+            except Exception:
+                healthy = False
+
+            with self._lock:
+                if healthy and not endpoint.healthy:
+                    print(f"+ Readmitted Ollama endpoint {endpoint.url}")
+                elif not healthy and endpoint.healthy:
+                    print(f"X Ollama endpoint failed health check: {endpoint.url}")
+                endpoint.healthy = healthy
+
+    def start_health_checks(self):
+        """Start periodic background health checks"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._health_loop,
+            name="ollama-health",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop_health_checks(self):
+        """Stop background health checks"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout + 1)
+            self._thread = None
+
+    def _health_loop(self):
+        while not self._stop.is_set():
+            self.check_health()
+            self._stop.wait(self.probe_interval)
+
+    def stats(self) -> List[Dict]:
+        """Per-endpoint routing statistics"""
+        with self._lock:
+            return [ep.stats() for ep in self.endpoints]
+
+
+_balancer = None
+_balancer_lock = threading.Lock()
+
+
+def get_load_balancer() -> OllamaLoadBalancer:
+    """Process-wide balancer over ConfigOllama.OLLAMA_BASE_URLS"""
+    global _balancer
+    with _balancer_lock:
+        if _balancer is None:
+            _balancer = OllamaLoadBalancer(
+                ConfigOllama.OLLAMA_BASE_URLS,
+                required_models=[ConfigOllama.LLM_MODEL, ConfigOllama.EMBEDDING_MODEL]
+            )
+            _balancer.start_health_checks()
+        return _balancer
+
+
+def existing_load_balancer() -> Optional[OllamaLoadBalancer]:
+    """The process-wide balancer if one was already created (never creates one)"""
+    return _balancer
+
+
+class BalancedOllamaEmbeddings(Embeddings):
+    """Ollama embeddings spread across a load-balanced pool"""
+
+    def __init__(self, balancer: OllamaLoadBalancer, model: str, timeout: float = None):
+        self.balancer = balancer
+        self.model = model
+        self.timeout = timeout or ConfigOllama.HTTP_TIMEOUT
+        self.max_workers = 2 * len(balancer.endpoints)
+
+    def _embed(self, text: str) -> List[float]:
+        result = self.balancer.post_json(
+            '/api/embeddings',
+            {"model": self.model, "prompt": text},
+            timeout=self.timeout
+        )
+        return result["embedding"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents concurrently across the pool (order preserved)"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._embed, texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query"""
+        return self._embed(text)
+
+
+class BalancedOllama(LLM):
+    """Ollama LLM whose calls are routed through a load-balanced pool"""
+
+    balancer: Any
+    model: str
+    temperature: float = 0.7
+    timeout: float = 300
+
+    @property
+    def _llm_type(self) -> str:
+        return "ollama-balanced"
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        return {"model": self.model, "temperature": self.temperature}
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Any = None, **kwargs: Any) -> str:
+        options = {"temperature": self.temperature}
+        if stop:
+            options["stop"] = stop
+
+        result = self.balancer.post_json(
+            '/api/generate',
+            {
+                "model": self.model,
+                "prompt": prompt,
+                "stream": False,
+                "options": options
+            },
+            timeout=self.timeout
+        )
+        return result["response"]
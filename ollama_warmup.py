@@ -0,0 +1,175 @@
+"""
+Model Warm-up Module
+Loads the Ollama LLM and embedding model ahead of traffic, keeps them
+resident while questions are expected, and separates model-load stalls
+from generation time in latency counters
+"""
+from typing import Dict, List
+import threading
+import time
+import requests
+from config_ollama import ConfigOllama
+
+
+class ModelWarmupManager:
+    """Warm-up, keep-alive pings and cold-vs-warm latency counters"""
+
+    def __init__(self, base_urls: List[str] = None, llm_model: str = None,
+                 embedding_model: str = None, keep_alive_seconds: int = None,
+                 ping_interval: float = None, traffic_window: float = None,
+                 idle_unload_seconds: float = None):
+        """
+        Initialize warm-up manager
+
+        Args:
+            base_urls: Ollama servers to keep warm (default: all configured)
+            llm_model: Generation model name
+            embedding_model: Embedding model name
+            keep_alive_seconds: keep_alive sent with warm-up/keep-alive pings
+            ping_interval: Seconds between keep-alive pings
+            traffic_window: Keep pinging only while the last question is
+                            more recent than this many seconds
+            idle_unload_seconds: Idle time after which Ollama unloads a model;
+                                 a question arriving after such a gap is counted as cold
+        """
+        self.base_urls = base_urls or ConfigOllama.OLLAMA_BASE_URLS
+        self.llm_model = llm_model or ConfigOllama.LLM_MODEL
+        self.embedding_model = embedding_model or ConfigOllama.EMBEDDING_MODEL
+        self.keep_alive_seconds = keep_alive_seconds or ConfigOllama.OLLAMA_KEEP_ALIVE_SECONDS
+        self.ping_interval = ping_interval or ConfigOllama.OLLAMA_PING_INTERVAL
+        self.traffic_window = traffic_window or ConfigOllama.OLLAMA_TRAFFIC_WINDOW
+        self.idle_unload_seconds = idle_unload_seconds or ConfigOllama.OLLAMA_IDLE_UNLOAD_SECONDS
+
+        self.last_traffic = time.time()
+        self.last_model_activity = 0.0
+
+        self.counters = {
+            "cold_requests": 0,
+            "warm_requests": 0,
+            "cold_seconds": 0.0,
+            "warm_seconds": 0.0,
+            "model_loads": 0,
+            "model_load_seconds": 0.0,
+            "pings": 0,
+            "ping_failures": 0
+        }
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ping(self, base_url: str) -> float:
+        """
+        Load (or keep loaded) both models on one server
+
+        An empty generate prompt loads the LLM without generating tokens.
+
+        Returns:
+            Model load time in seconds reported by Ollama
+        """
+        keep_alive = f"{self.keep_alive_seconds}s"
+        timeout = ConfigOllama.HTTP_TIMEOUT
+
+        response = requests.post(
+            f"{base_url}/api/generate",
+            json={"model": self.llm_model, "prompt": "", "keep_alive": keep_alive, "stream": False},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        load_ns = response.json().get("load_duration", 0)
+
+        response = requests.post(
+            f"{base_url}/api/embeddings",
+            json={"model": self.embedding_model, "prompt": "warm-up", "keep_alive": keep_alive},
+            timeout=timeout
+        )
+        response.raise_for_status()
+
+        return load_ns / 1e9
+
+    def ping_all(self) -> Dict[str, float]:
+        """
+        Ping every server once
+
+        Returns:
+            Mapping of server URL to model load seconds (-1 on failure)
+        """
+        results = {}
+        for base_url in self.base_urls:
+            try:
+                load_seconds = self._ping(base_url)
+                with self._lock:
+                    self.counters["pings"] += 1
+                    # Sub-100ms loads are just the "already resident" bookkeeping
+                    if load_seconds > 0.1:
+                        self.counters["model_loads"] += 1
+                        self.counters["model_load_seconds"] += load_seconds
+                    self.last_model_activity = time.time()
+                results[base_url] = load_seconds
+            except Exception as e:
+                with self._lock:
+                    self.counters["ping_failures"] += 1
+                print(f"X Warm-up ping failed for {base_url}: {e}")
+                results[base_url] = -1
+        return results
+
+    def warm_up(self):
+        """Load both models on every server"""
+        start_time = time.time()
+        results = self.ping_all()
+        warmed = sum(1 for seconds in results.values() if seconds >= 0)
+        print(f"+ Warmed {self.llm_model} + {self.embedding_model} on "
+              f"{warmed}/{len(results)} server(s) in {time.time() - start_time:.2f}s")
+
+    def start(self, warm_up: bool = True):
+        """Warm up (optionally) and start keep-alive pings in the background"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(warm_up,),
+            name="ollama-keepalive",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop keep-alive pings"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _run(self, warm_up: bool):
+        if warm_up:
+            self.warm_up()
+        while not self._stop.wait(self.ping_interval):
+            if time.time() - self.last_traffic <= self.traffic_window:
+                self.ping_all()
+
+    def record_request(self, started_at: float, duration: float):
+        """
+        Record one answered question as cold or warm
+
+        Args:
+            started_at: time.time() when the question started
+            duration: Seconds the question took end-to-end
+        """
+        with self._lock:
+            cold = started_at - self.last_model_activity > self.idle_unload_seconds
+            kind = "cold" if cold else "warm"
+            self.counters[f"{kind}_requests"] += 1
+            self.counters[f"{kind}_seconds"] += duration
+            self.last_traffic = time.time()
+            self.last_model_activity = self.last_traffic
+
+    def stats(self) -> Dict:
+        """Counter snapshot with average cold and warm latency"""
+        with self._lock:
+            stats = dict(self.counters)
+        for kind in ("cold", "warm"):
+            count = stats[f"{kind}_requests"]
+            stats[f"{kind}_avg_seconds"] = stats[f"{kind}_seconds"] / count if count else None
+        stats["keep_alive_active"] = time.time() - self.last_traffic <= self.traffic_window
+        return stats
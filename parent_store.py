@@ -0,0 +1,94 @@
+"""
+Parent Store Module
+Small-to-big retrieval: small child chunks are embedded and searched, and
+each hit is answered with the larger parent window it was cut from.
+
+TextChunker attaches the parent window to every child as the transient
+"parent_text" metadata key; the vector store managers move it in here
+before indexing, so the docstore keeps one small text per child and every
+parent text is held once.
+
+    parents.jsonl   {"id", "text", "metadata": {source, start_index, end_index}}
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+import os
+from embedding_store import read_chunks, write_chunks
+
+PARENTS_FILE = "parents.jsonl"
+PARENT_TEXT_KEY = "parent_text"
+
+
+class ParentStore:
+    """Parent windows by parent id"""
+
+    def __init__(self):
+        self._parents: Dict[str, Tuple[str, Dict]] = {}
+
+    def __len__(self) -> int:
+        return len(self._parents)
+
+    def absorb(self, metadatas: Iterable[Dict]):
+        """Move parent_text out of child metadata (in place) into the store"""
+        for metadata in metadatas:
+            text = metadata.pop(PARENT_TEXT_KEY, None) if metadata else None
+            if text is None or metadata.get("parent_id") in self._parents:
+                continue
+            self._parents[metadata["parent_id"]] = (text, {
+                "source": metadata.get("source"),
+                "start_index": metadata.get("parent_start_index"),
+                "end_index": metadata.get("parent_end_index")
+            })
+
+    def text(self, parent_id: str) -> Optional[str]:
+        parent = self._parents.get(parent_id)
+        return parent[0] if parent is not None else None
+
+    def remove_sources(self, sources: Iterable[str]):
+        wanted = set(sources)
+        for parent_id in [p for p, (_, meta) in self._parents.items() if meta["source"] in wanted]:
+            del self._parents[parent_id]
+
+    def expand(self, results: List[Tuple], k: int) -> List[Tuple]:
+        """
+        Replace child hits with their parent windows, best first
+
+        Args:
+            results: (child Document, score) tuples, best first
+            k: Maximum parents to return
+
+        Returns:
+            Up to k (Document, score) tuples, one per parent: the parent
+            text with the best-matching child's metadata (so its chunk id
+            and source still resolve) and that child's score. Hits without
+            a known parent are passed through unchanged.
+        """
+        from langchain.schema import Document
+
+        expanded = []
+        seen = set()
+        for doc, score in results:
+            parent_id = doc.metadata.get("parent_id")
+            if parent_id in seen:
+                continue
+            parent = self._parents.get(parent_id)
+            if parent is not None:
+                seen.add(parent_id)
+                text, meta = parent
+                metadata = dict(doc.metadata, start_index=meta["start_index"], end_index=meta["end_index"])
+                doc = Document(page_content=text, metadata=metadata)
+            expanded.append((doc, score))
+            if len(expanded) == k:
+                break
+        return expanded
+
+    def save(self, path: str):
+        write_chunks(path, ((p, text, meta) for p, (text, meta) in self._parents.items()))
+
+    @classmethod
+    def load(cls, path: str) -> 'ParentStore':
+        """Parents saved with a snapshot (empty store if the file is absent)"""
+        store = cls()
+        if os.path.exists(path):
+            for row in read_chunks(path):
+                store._parents[row["id"]] = (row["text"], row["metadata"])
+        return store
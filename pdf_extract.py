@@ -0,0 +1,78 @@
+"""
+PDF Extraction Module
+Page-parallel, streaming PDF text extraction with a per-page cache.
+Kept free of LangChain imports so worker processes start quickly.
+"""
+from typing import Iterator, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pypdf import PdfReader
+from source_cache import DiskCache, file_sha256
+
+
+def _extract_page_range(args: Tuple[str, List[int]]) -> List[Tuple[int, str]]:
+    """Worker: extract text for a batch of pages (opens the PDF once per batch)"""
+    pdf_path, pages = args
+    reader = PdfReader(pdf_path)
+    return [(page, reader.pages[page].extract_text() or "") for page in pages]
+
+
+def iter_pdf_text(pdf_path: str, workers: int = None, pages_per_task: int = 8,
+                  cache_dir: str = None) -> Iterator[Tuple[int, str]]:
+    """
+    Yield (page_number, text) in page order as soon as each page is ready
+
+    Uncached pages are extracted in batches across a process pool; cached
+    pages (keyed by file hash and page number) are yielded without parsing.
+
+    Args:
+        pdf_path: Path to PDF file
+        workers: Worker processes (1 extracts in-process)
+        pages_per_task: Pages handed to a worker at a time
+        cache_dir: Cache root directory (None disables caching)
+
+    Yields:
+        (0-based page number, extracted text)
+    """
+    workers = workers or os.cpu_count() or 1
+    cache = DiskCache(cache_dir, 'pdf') if cache_dir else None
+    file_hash = file_sha256(pdf_path) if cache else None
+
+    page_count = len(PdfReader(pdf_path).pages)
+
+    cached = {}
+    missing = []
+    for page in range(page_count):
+        entry = cache.get(f"{file_hash}:{page}") if cache else None
+        if entry is not None:
+            cached[page] = entry["text"]
+        else:
+            missing.append(page)
+
+    batches = [
+        (pdf_path, missing[i:i + pages_per_task])
+        for i in range(0, len(missing), pages_per_task)
+    ]
+
+    # Small jobs are not worth the pool start-up cost
+    if workers <= 1 or len(batches) <= 1:
+        results = map(_extract_page_range, batches)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(batches)))
+        results = executor.map(_extract_page_range, batches)
+
+    try:
+        extracted = iter(page_text for batch in results for page_text in batch)
+        for page in range(page_count):
+            if page in cached:
+                yield page, cached.pop(page)
+                continue
+
+            extracted_page, text = next(extracted)
+            if cache:
+                cache.put(f"{file_hash}:{extracted_page}", {"text": text})
+            yield extracted_page, text
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
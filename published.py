@@ -0,0 +1,26 @@
+"""
+Published Module
+Attributes that searches read together, kept in one immutable bundle
+(a NamedTuple) that writers replace whole, so a concurrent reader that
+took the bundle never sees half of a swap
+"""
+
+
+class Published:
+    """
+    Owner attribute stored as a field of its `_index` bundle
+
+    Reading returns the field of the live bundle; assigning calls the
+    owner's `_publish(field=value)`, which swaps in a new bundle.
+    """
+
+    def __init__(self, field: str):
+        self.field = field
+
+    def __get__(self, owner, owner_type=None):
+        if owner is None:
+            return self
+        return getattr(owner._index, self.field)
+
+    def __set__(self, owner, value):
+        owner._publish(**{self.field: value})
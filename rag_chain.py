@@ -2,14 +2,30 @@
 RAG Chain Module
 Implements Retrieval-Augmented Generation using LangChain
 """
-from typing import List, Dict
+from typing import Any, List, Dict, Iterator, Optional, Tuple
+import asyncio
 from langchain_openai import ChatOpenAI
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
+from langchain.schema import BaseRetriever, Document
 from vector_store import VectorStoreManager
+from async_llm import AsyncOpenAIClient
 from config import Config
 
 
+class ManagerRetriever(BaseRetriever):
+    """
+    Retriever backed by VectorStoreManager.similarity_search (honours
+    two-stage routing and small-to-big parent windows)
+    """
+    
+    manager: Any
+    k: Optional[int] = None
+    
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.manager.similarity_search(query, k=self.k)
+
+
 class RAGChain:
     """RAG (Retrieval-Augmented Generation) implementation"""
     
@@ -31,6 +47,19 @@ class RAGChain:
             temperature=Config.TEMPERATURE
         )
         
+        # Pooled async client for the asyncio generation path
+        self.async_llm = AsyncOpenAIClient(
+            base_url=Config.OPENAI_BASE_URL,
+            api_key=self.api_key,
+            model=Config.LLM_MODEL,
+            temperature=Config.TEMPERATURE,
+            max_in_flight=Config.ASYNC_MAX_IN_FLIGHT,
+            max_connections=Config.HTTP_MAX_CONNECTIONS,
+            max_keepalive=Config.HTTP_MAX_KEEPALIVE,
+            timeout=Config.HTTP_TIMEOUT,
+            connect_timeout=Config.HTTP_CONNECT_TIMEOUT
+        )
+        
         # Custom prompt template
         self.prompt_template = """You are an AI Teaching Assistant designed to help students understand course materials.
 
@@ -50,6 +79,27 @@ Teaching Assistant Response:"""
             input_variables=["context", "question"]
         )
     
+    def _retriever(self) -> BaseRetriever:
+        if Config.RETRIEVAL_MODE == 'two_stage' or len(self.vector_store_manager.parents):
+            return ManagerRetriever(manager=self.vector_store_manager)
+        return self.vector_store_manager.vector_store.as_retriever(
+            search_kwargs={"k": Config.TOP_K_RESULTS}
+        )
+    
+    def _retrieve(self, question: str) -> Tuple[List[Document], Optional[Dict]]:
+        """
+        Retrieve documents for a question
+        
+        Returns:
+            (documents, compression stats) -- with CONTEXT_COMPRESSION the
+            documents hold only the sentences closest to the question and
+            the stats report the prompt size reduction; otherwise stats is None
+        """
+        docs = self.vector_store_manager.similarity_search(question)
+        if not (Config.CONTEXT_COMPRESSION and docs):
+            return docs, None
+        return self.vector_store_manager.compress_context(question, docs)
+    
     def create_qa_chain(self) -> RetrievalQA:
         """
         Create RetrievalQA chain
@@ -65,9 +115,7 @@ Teaching Assistant Response:"""
             qa_chain = RetrievalQA.from_chain_type(
                 llm=self.llm,
                 chain_type="stuff",
-                retriever=self.vector_store_manager.vector_store.as_retriever(
-                    search_kwargs={"k": Config.TOP_K_RESULTS}
-                ),
+                retriever=self._retriever(),
                 return_source_documents=True,
                 chain_type_kwargs={"prompt": self.prompt}
             )
@@ -97,7 +145,16 @@ Teaching Assistant Response:"""
                     "sources": []
                 }
             
-            result = qa_chain({"query": question})
+            compression = None
+            if Config.CONTEXT_COMPRESSION:
+                # Same prompt and LLM as the chain, fed the compressed documents
+                docs, compression = self._retrieve(question)
+                result = {
+                    "result": qa_chain.combine_documents_chain.run(input_documents=docs, question=question),
+                    "source_documents": docs
+                }
+            else:
+                result = qa_chain({"query": question})
             
             response = {
                 "question": question,
@@ -105,6 +162,9 @@ Teaching Assistant Response:"""
                 "sources": []
             }
             
+            if compression is not None:
+                response["context_compression"] = compression
+            
             if return_sources and "source_documents" in result:
                 response["sources"] = [
                     {
@@ -135,7 +195,7 @@ Teaching Assistant Response:"""
         """
         try:
             # Retrieve relevant documents
-            docs = self.vector_store_manager.similarity_search(question)
+            docs, _ = self._retrieve(question)
             
             if not docs:
                 return "I couldn't find relevant information in the course materials to answer this question."
@@ -153,3 +213,84 @@ Teaching Assistant Response:"""
         except Exception as e:
             print(f"X Error: {e}")
             return f"Error generating response: {str(e)}"
+    
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Stream the answer token by token
+        
+        Args:
+            question: Student's question
+            
+        Yields:
+            Answer text fragments as the LLM produces them
+        """
+        try:
+            docs, _ = self._retrieve(question)
+            
+            if not docs:
+                yield "I couldn't find relevant information in the course materials to answer this question."
+                return
+            
+            context = "\n\n".join([doc.page_content for doc in docs])
+            prompt = self.prompt.format(context=context, question=question)
+            
+            for chunk in self.llm.stream(prompt):
+                yield chunk.content
+        except Exception as e:
+            print(f"X Error: {e}")
+            yield f"Error generating response: {str(e)}"
+    
+    async def aask_question(self, question: str, return_sources: bool = True) -> Dict:
+        """
+        Ask a question using RAG without blocking the event loop
+        
+        Retrieval runs in a worker thread; generation goes through the
+        pooled async client.
+        
+        Args:
+            question: Student's question
+            return_sources: Whether to return source documents
+            
+        Returns:
+            Dictionary with answer and optional source documents
+        """
+        try:
+            docs, compression = await asyncio.to_thread(self._retrieve, question)
+            
+            if not docs:
+                return {
+                    "question": question,
+                    "answer": "I couldn't find relevant information in the course materials to answer this question.",
+                    "sources": []
+                }
+            
+            context = "\n\n".join([doc.page_content for doc in docs])
+            prompt = self.prompt.format(context=context, question=question)
+            answer = await self.async_llm.generate(prompt)
+            
+            response = {
+                "question": question,
+                "answer": answer,
+                "sources": []
+            }
+            
+            if compression is not None:
+                response["context_compression"] = compression
+            
+            if return_sources:
+                response["sources"] = [
+                    {
+                        "content": doc.page_content[:200] + "...",
+                        "metadata": doc.metadata
+                    }
+                    for doc in docs
+                ]
+            
+            return response
+        except Exception as e:
+            print(f"X Error answering question: {e}")
+            return {
+                "question": question,
+                "answer": f"Error: {str(e)}",
+                "sources": []
+            }
@@ -2,14 +2,28 @@
 RAG Chain for Ollama
 Uses local Ollama LLM for response generation
 """
-from typing import List, Dict
+from typing import Any, List, Dict, Iterator, Optional, Tuple
+import asyncio
 from langchain_community.llms import Ollama
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
+from langchain.schema import BaseRetriever, Document
 from vector_store_ollama import VectorStoreManagerOllama
+from async_llm import AsyncOllamaClient
+from ollama_pool import BalancedOllama, get_load_balancer
 from config_ollama import ConfigOllama
 
 
+class ManagerRetriever(BaseRetriever):
+    """Retriever backed by VectorStoreManagerOllama.similarity_search (small-to-big parent windows)"""
+    
+    manager: Any
+    k: Optional[int] = None
+    
+    def _get_relevant_documents(self, query: str, *, run_manager=None) -> List[Document]:
+        return self.manager.similarity_search(query, k=self.k)
+
+
 class RAGChainOllama:
     """RAG implementation using Ollama"""
     
@@ -22,11 +36,34 @@ class RAGChainOllama:
         """
         self.vector_store_manager = vector_store_manager
         
-        # Initialize Ollama LLM
-        self.llm = Ollama(
-            base_url=ConfigOllama.OLLAMA_BASE_URL,
+        # Initialize Ollama LLM (load-balanced when several servers are configured)
+        balancer = None
+        if len(ConfigOllama.OLLAMA_BASE_URLS) > 1:
+            balancer = get_load_balancer()
+            self.llm = BalancedOllama(
+                balancer=balancer,
+                model=ConfigOllama.LLM_MODEL,
+                temperature=ConfigOllama.TEMPERATURE,
+                timeout=ConfigOllama.HTTP_TIMEOUT
+            )
+        else:
+            self.llm = Ollama(
+                base_url=ConfigOllama.OLLAMA_BASE_URLS[0],
+                model=ConfigOllama.LLM_MODEL,
+                temperature=ConfigOllama.TEMPERATURE
+            )
+        
+        # Pooled async client for the asyncio generation path
+        self.async_llm = AsyncOllamaClient(
+            base_url=ConfigOllama.OLLAMA_BASE_URLS[0],
             model=ConfigOllama.LLM_MODEL,
-            temperature=ConfigOllama.TEMPERATURE
+            temperature=ConfigOllama.TEMPERATURE,
+            balancer=balancer,
+            max_in_flight=ConfigOllama.ASYNC_MAX_IN_FLIGHT,
+            max_connections=ConfigOllama.HTTP_MAX_CONNECTIONS,
+            max_keepalive=ConfigOllama.HTTP_MAX_KEEPALIVE,
+            timeout=ConfigOllama.HTTP_TIMEOUT,
+            connect_timeout=ConfigOllama.HTTP_CONNECT_TIMEOUT
         )
         
         print(f"Using Ollama LLM: {ConfigOllama.LLM_MODEL}")
@@ -50,6 +87,27 @@ Teaching Assistant Response:"""
             input_variables=["context", "question"]
         )
     
+    def _retriever(self) -> BaseRetriever:
+        if len(self.vector_store_manager.parents):
+            return ManagerRetriever(manager=self.vector_store_manager)
+        return self.vector_store_manager.vector_store.as_retriever(
+            search_kwargs={"k": ConfigOllama.TOP_K_RESULTS}
+        )
+    
+    def _retrieve(self, question: str) -> Tuple[List[Document], Optional[Dict]]:
+        """
+        Retrieve documents for a question
+        
+        Returns:
+            (documents, compression stats) -- with CONTEXT_COMPRESSION the
+            documents hold only the sentences closest to the question and
+            the stats report the prompt size reduction; otherwise stats is None
+        """
+        docs = self.vector_store_manager.similarity_search(question)
+        if not (ConfigOllama.CONTEXT_COMPRESSION and docs):
+            return docs, None
+        return self.vector_store_manager.compress_context(question, docs)
+    
     def create_qa_chain(self) -> RetrievalQA:
         """Create RetrievalQA chain"""
         try:
@@ -60,9 +118,7 @@ Teaching Assistant Response:"""
             qa_chain = RetrievalQA.from_chain_type(
                 llm=self.llm,
                 chain_type="stuff",
-                retriever=self.vector_store_manager.vector_store.as_retriever(
-                    search_kwargs={"k": ConfigOllama.TOP_K_RESULTS}
-                ),
+                retriever=self._retriever(),
                 return_source_documents=True,
                 chain_type_kwargs={"prompt": self.prompt}
             )
@@ -93,7 +149,16 @@ Teaching Assistant Response:"""
                 }
             
             print(f"\nProcessing question with Ollama...")
-            result = qa_chain({"query": question})
+            compression = None
+            if ConfigOllama.CONTEXT_COMPRESSION:
+                # Same prompt and LLM as the chain, fed the compressed documents
+                docs, compression = self._retrieve(question)
+                result = {
+                    "result": qa_chain.combine_documents_chain.run(input_documents=docs, question=question),
+                    "source_documents": docs
+                }
+            else:
+                result = qa_chain({"query": question})
             
             response = {
                 "question": question,
@@ -101,6 +166,9 @@ Teaching Assistant Response:"""
                 "sources": []
             }
             
+            if compression is not None:
+                response["context_compression"] = compression
+            
             if return_sources and "source_documents" in result:
                 response["sources"] = [
                     {
@@ -123,7 +191,7 @@ Teaching Assistant Response:"""
         """Ask question and get answer with retrieved context"""
         try:
             # Retrieve relevant documents
-            docs = self.vector_store_manager.similarity_search(question)
+            docs, _ = self._retrieve(question)
             
             if not docs:
                 return "I couldn't find relevant information in the course materials to answer this question."
@@ -142,3 +210,77 @@ Teaching Assistant Response:"""
         except Exception as e:
             print(f"X Error: {e}")
             return f"Error generating response: {str(e)}"
+    
+    def stream_answer(self, question: str) -> Iterator[str]:
+        """
+        Stream the answer token by token
+        
+        Args:
+            question: Student's question
+            
+        Yields:
+            Answer text fragments as the Ollama produces them
+        """
+        try:
+            docs, _ = self._retrieve(question)
+            
+            if not docs:
+                yield "I couldn't find relevant information in the course materials to answer this question."
+                return
+            
+            context = "\n\n".join([doc.page_content for doc in docs])
+            prompt = self.prompt.format(context=context, question=question)
+            
+            for chunk in self.llm.stream(prompt):
+                yield chunk
+        except Exception as e:
+            print(f"X Error: {e}")
+            yield f"Error generating response: {str(e)}"
+    
+    async def aask_question(self, question: str, return_sources: bool = True) -> Dict:
+        """
+        Ask a question using RAG with Ollama without blocking the event loop
+        
+        Retrieval runs in a worker thread; generation goes through the
+        pooled async client.
+        """
+        try:
+            docs, compression = await asyncio.to_thread(self._retrieve, question)
+            
+            if not docs:
+                return {
+                    "question": question,
+                    "answer": "I couldn't find relevant information in the course materials to answer this question.",
+                    "sources": []
+                }
+            
+            context = "\n\n".join([doc.page_content for doc in docs])
+            prompt = self.prompt.format(context=context, question=question)
+            answer = await self.async_llm.generate(prompt)
+            
+            response = {
+                "question": question,
+                "answer": answer,
+                "sources": []
+            }
+            
+            if compression is not None:
+                response["context_compression"] = compression
+            
+            if return_sources:
+                response["sources"] = [
+                    {
+                        "content": doc.page_content[:200] + "...",
+                        "metadata": doc.metadata
+                    }
+                    for doc in docs
+                ]
+            
+            return response
+        except Exception as e:
+            print(f"X Error answering question: {e}")
+            return {
+                "question": question,
+                "answer": f"Error: {str(e)}",
+                "sources": []
+            }
@@ -0,0 +1,39 @@
+"""
+Rate Limit Module
+Thread-safe token bucket shared by concurrent fetchers of one remote service
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Sustained acquisitions per second (<= 0 disables limiting)
+            burst: Acquisitions allowed back-to-back after an idle period
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
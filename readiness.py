@@ -0,0 +1,229 @@
+"""
+Readiness Module
+Loads the knowledge base in a background thread so the server can bind
+its port immediately, reports liveness/readiness for health probes, and
+hot-reloads newly published snapshots
+"""
+from typing import Dict
+import os
+import threading
+import time
+from snapshots import current_snapshot, snapshot_path
+
+
+def directory_size(path: str) -> int:
+    """Total bytes of the files under a path (0 if it does not exist)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(directory, name))
+            except OSError:
+                pass
+    return total
+
+
+class IndexLoader:
+    """Background knowledge base loader with liveness/readiness reporting"""
+
+    # States: starting -> loading -> ready | failed. With no index on disk
+    # the server is ready straight away (it can still accept uploads); a
+    # failed load becomes ready once an upload rebuilds the index.
+    # Phases are (name, share of the progress bar).
+    PHASES = (("index", 0.9), ("rag", 0.1))
+
+    def __init__(self, assistant, path: str, retry_after: int = 5, watch_interval: float = 0):
+        """
+        Initialize loader
+
+        Args:
+            assistant: Teaching assistant exposing load_knowledge_base/initialize_rag
+            path: Vector store path
+            retry_after: Retry-After seconds suggested to clients while loading
+            watch_interval: Seconds between checks for a new snapshot (0 = never)
+        """
+        self.assistant = assistant
+        self.path = path
+        self.retry_after = retry_after
+
+        self.state = "starting"
+        self.phase = None
+        self.progress = 0.0
+        self.error = None
+        self.index_bytes = 0
+        self.started_at = time.time()
+        self.load_seconds = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = None
+
+        self.watch_interval = watch_interval
+        self.reloads = 0
+        self.last_reload_seconds = None
+        self._failed_snapshot = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @property
+    def accepts_uploads(self) -> bool:
+        """Uploads replace the index, so they only wait for a load in progress"""
+        return self.ready or self.state == "failed"
+
+    def rebuilt(self):
+        """Serve the index an upload rebuilt after the load had failed"""
+        if self.state == "failed" and self.assistant.vector_store_manager.vector_store is not None:
+            print("+ Knowledge base rebuilt by upload")
+            self._set(error=None)
+            self._finish("ready")
+
+    def start(self, background: bool = True):
+        """
+        Begin loading the knowledge base
+
+        Args:
+            background: Load in a daemon thread (False blocks until loaded)
+        """
+        if self.state != "starting":
+            # Already loaded (e.g. by a pre-fork master before forking workers)
+            return
+        if not os.path.exists(self.path):
+            self._finish("ready")
+            return
+        self.index_bytes = self._snapshot_bytes()
+        if background:
+            self._thread = threading.Thread(target=self._load, name="index-loader", daemon=True)
+            self._thread.start()
+        else:
+            self._load()
+
+    def _snapshot_bytes(self) -> int:
+        return directory_size(snapshot_path(self.path, current_snapshot(self.path)))
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until loading finishes or fails (or timeout); returns readiness"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def _load(self):
+        self._set(state="loading")
+        start_time = time.perf_counter()
+        try:
+            done = 0.0
+            for phase, share in self.PHASES:
+                self._set(phase=phase, progress=done)
+                if phase == "index":
+                    self.assistant.load_knowledge_base(self.path)
+                    if self.assistant.vector_store_manager.vector_store is None:
+                        raise RuntimeError(f"Vector store at {self.path} could not be loaded")
+                else:
+                    self.assistant.initialize_rag()
+                done += share
+            self.load_seconds = time.perf_counter() - start_time
+            print(f"+ Knowledge base ready in {self.load_seconds:.1f}s")
+            self._finish("ready")
+        except Exception as e:
+            print(f"X Error loading knowledge base: {e}")
+            self._set(error=str(e))
+            self._finish("failed")
+
+    def _set(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def _finish(self, state: str):
+        self._set(state=state, phase=None, progress=1.0 if state == "ready" else self.progress)
+        if state == "ready":
+            self._ready.set()
+            if self.watch_interval:
+                self.watch()
+
+    def watch(self):
+        """Start polling CURRENT for new snapshots (safe to call again after fork)"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch, name="snapshot-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.watch_interval + 1)
+            self._watcher = None
+
+    def _watch(self):
+        while not self._stop_watching.wait(self.watch_interval):
+            version = current_snapshot(self.path)
+            if version is None or version == self._failed_snapshot:
+                continue
+            if version != getattr(self.assistant, "snapshot_version", None):
+                self.reload(version)
+
+    def reload(self, version: str = None) -> bool:
+        """
+        Hot-swap to the current snapshot while serving continues
+
+        Args:
+            version: Snapshot expected to be loaded (for logging/failure tracking)
+
+        Returns:
+            True if the new snapshot is live
+        """
+        print(f"\nReloading knowledge base (snapshot {version or current_snapshot(self.path)})...")
+        start_time = time.perf_counter()
+        try:
+            loaded = self.assistant.load_knowledge_base(self.path)
+            if loaded and self.assistant.rag_chain is None:
+                self.assistant.initialize_rag()
+        except Exception as e:
+            print(f"X Error reloading knowledge base: {e}")
+            loaded = False
+        if not loaded:
+            # Keep serving the old index; retry only once a newer snapshot appears
+            self._failed_snapshot = version
+            return False
+        self._set(reloads=self.reloads + 1, last_reload_seconds=time.perf_counter() - start_time,
+                  index_bytes=self._snapshot_bytes(), _failed_snapshot=None)
+        print(f"+ Hot-swapped knowledge base in {self.last_reload_seconds:.1f}s")
+        return True
+
+    def live(self) -> Dict:
+        """Liveness: the process is up and serving requests"""
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.time() - self.started_at, 1)
+        }
+
+    def status(self) -> Dict:
+        """Readiness with load progress and index size"""
+        with self._lock:
+            status = {
+                "ready": self.ready,
+                "state": self.state,
+                "phase": self.phase,
+                "progress": round(self.progress, 2),
+                "elapsed_seconds": round(time.time() - self.started_at, 1),
+                "index_bytes": self.index_bytes
+            }
+            if self.load_seconds is not None:
+                status["load_seconds"] = round(self.load_seconds, 2)
+            if self.error:
+                status["error"] = self.error
+            if self.watch_interval:
+                status["reloads"] = self.reloads
+                if self.last_reload_seconds is not None:
+                    status["last_reload_seconds"] = round(self.last_reload_seconds, 2)
+        if self.ready:
+            status["index_chunks"] = self.assistant.vector_store_manager.count()
+        snapshot = getattr(self.assistant, "snapshot_version", None)
+        if snapshot:
+            status["snapshot"] = snapshot
+        return status
@@ -0,0 +1,240 @@
+"""
+Offline Index Rebuild
+Builds a new index from the raw embeddings saved with a snapshot
+(embeddings.npy + chunks.jsonl, see embedding_store.py), so changing the
+index type, quantization or graph parameters costs no embedding calls and
+works without network access.
+
+FAISS (default): any faiss.index_factory description. The result is
+published as a new snapshot, which running servers hot-reload.
+    python rebuild_index.py --index Flat
+    python rebuild_index.py --index "IVF1024,Flat" --search-params nprobe=16
+    python rebuild_index.py --index "IVF1024,PQ32" --workers 8
+    python rebuild_index.py --index HNSW32 --search-params efSearch=64
+    python rebuild_index.py --index "PCA256,Flat"          (same as PCA_DIMENSIONS=256)
+
+Chroma (--backend ollama): a fresh collection with the given HNSW graph
+size, written to --out (the live directory is never modified in place).
+    python rebuild_index.py --backend ollama --index HNSW32 --out ./vector_store_ollama.new
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import re
+import shutil
+import sys
+import time
+import numpy as np
+from context_compression import SENTENCES_FILE
+from document_router import ROUTING_FILE
+from embedding_store import CHUNKS_FILE, EMBEDDINGS_FILE, load_raw, write_docstore
+from parent_store import PARENTS_FILE
+from snapshots import current_snapshot, snapshot_path, write_snapshot
+
+_BATCH_SIZE = 10000
+
+
+def _batches(total: int, size: int = _BATCH_SIZE):
+    for start in range(0, total, size):
+        yield start, min(start + size, total)
+
+
+def train_sample(vectors: np.ndarray, size: int, seed: int = 0) -> np.ndarray:
+    """Random float32 training sample (all rows if there are fewer than size)"""
+    if len(vectors) <= size:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+    rows = np.sort(np.random.default_rng(seed).choice(len(vectors), size, replace=False))
+    return np.ascontiguousarray(vectors[rows], dtype=np.float32)
+
+
+def build_faiss_index(vectors: np.ndarray, description: str, workers: int = None,
+                      train_size: int = 100000, search_params: str = None):
+    """
+    Build and fill a FAISS index from float16 vectors
+
+    IVF-family indexes are filled in parallel: each worker adds one
+    contiguous partition to its own copy of the trained (empty) index and
+    the partitions are merged in order, so index positions still match
+    chunks.jsonl rows. Other types add in batches and let FAISS
+    parallelize internally (OpenMP).
+
+    Args:
+        vectors: [n, dim] raw embeddings (float16, may be memory-mapped)
+        description: faiss.index_factory string, e.g. "IVF1024,PQ32"
+        workers: Threads for training and adding (default: all CPUs)
+        train_size: Maximum vectors sampled for training
+        search_params: faiss.ParameterSpace settings stored with the index,
+            e.g. "nprobe=16" or "efSearch=64"
+
+    Returns:
+        Filled faiss index
+    """
+    import faiss
+
+    workers = workers or os.cpu_count() or 1
+    faiss.omp_set_num_threads(workers)
+    total, dimension = vectors.shape
+    index = faiss.index_factory(dimension, description)
+
+    if not index.is_trained:
+        sample = train_sample(vectors, train_size)
+        print(f"  Training {description} on {len(sample)} vectors...")
+        index.train(sample)
+
+    def fill(target, start: int, end: int):
+        for batch_start, batch_end in _batches(end - start):
+            target.add(np.ascontiguousarray(vectors[start + batch_start:start + batch_end],
+                                            dtype=np.float32))
+        return target
+
+    if workers > 1 and total > _BATCH_SIZE and isinstance(index, faiss.IndexIVF):
+        bounds = np.linspace(0, total, workers + 1, dtype=int)
+        faiss.omp_set_num_threads(1)  # one thread per partition instead
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(lambda i: fill(faiss.clone_index(index), bounds[i], bounds[i + 1]),
+                                  range(workers)))
+        faiss.omp_set_num_threads(workers)
+        for part in parts:
+            index.merge_from(part, index.ntotal)
+    else:
+        fill(index, 0, total)
+
+    if search_params:
+        faiss.ParameterSpace().set_index_parameters(index, search_params)
+    return index
+
+
+def rebuild_faiss(source_root: str, description: str, out_root: str = None, workers: int = None,
+                  train_size: int = 100000, search_params: str = None, keep: int = 3) -> str:
+    """
+    Rebuild the current FAISS snapshot as a different index type
+
+    Args:
+        source_root: Knowledge base root to read the current snapshot from
+        description: faiss.index_factory string
+        out_root: Root to publish into (default: source_root)
+        workers: Build threads (default: all CPUs)
+        train_size: Maximum training sample
+        search_params: faiss.ParameterSpace settings stored with the index
+        keep: Snapshots kept after publishing
+
+    Returns:
+        Published snapshot version
+    """
+    import faiss
+
+    source = snapshot_path(source_root, current_snapshot(source_root))
+    vectors, chunks = load_raw(source)
+    print(f"+ Read {len(chunks)} raw embeddings ({vectors.shape[1]} dims) from {source}")
+
+    start_time = time.perf_counter()
+    index = build_faiss_index(vectors, description, workers, train_size, search_params)
+    print(f"+ Built {type(index).__name__} in {time.perf_counter() - start_time:.1f}s")
+
+    out_root = out_root or source_root
+    os.makedirs(out_root, exist_ok=True)
+    with write_snapshot(out_root, keep=keep) as (staging, version):
+        faiss.write_index(index, os.path.join(staging, "index.faiss"))
+        write_docstore(chunks, os.path.join(staging, "index.pkl"))
+        # Row order is unchanged, so the routing index stays valid
+        for name in (EMBEDDINGS_FILE, CHUNKS_FILE, ROUTING_FILE, PARENTS_FILE, SENTENCES_FILE,
+                     "duplicates.json"):
+            if os.path.exists(os.path.join(source, name)):
+                shutil.copyfile(os.path.join(source, name), os.path.join(staging, name))
+    return version
+
+
+def rebuild_chroma(source: str, out: str, description: str, workers: int = None,
+                   space: str = 'l2', batch_size: int = 5000) -> int:
+    """
+    Rebuild a Chroma collection from the raw embeddings exported on save
+
+    Args:
+        source: Chroma persist directory holding embeddings.npy + chunks.jsonl
+        out: New persist directory (must not exist yet)
+        description: "HNSW<M>" graph size (plain "HNSW" keeps Chroma's default)
+        workers: Concurrent batch inserts (default: all CPUs)
+        space: Distance ("l2", "ip" or "cosine")
+        batch_size: Vectors per insert
+
+    Returns:
+        Number of vectors written
+    """
+    import chromadb
+    from langchain_community.vectorstores import Chroma
+
+    match = re.fullmatch(r'HNSW(\d*)', description)
+    if match is None:
+        raise ValueError(f"Chroma indexes are HNSW graphs; got {description!r}")
+    if os.path.exists(out):
+        raise FileExistsError(f"{out} already exists")
+
+    vectors, chunks = load_raw(source)
+    metadata = {"hnsw:space": space}
+    if match.group(1):
+        metadata["hnsw:M"] = int(match.group(1))
+    client = chromadb.PersistentClient(path=out)
+    collection = client.create_collection(Chroma._LANGCHAIN_DEFAULT_COLLECTION_NAME, metadata=metadata)
+
+    def insert(bounds):
+        start, end = bounds
+        rows = chunks[start:end]
+        collection.add(
+            ids=[row["id"] for row in rows],
+            embeddings=np.asarray(vectors[start:end], dtype=np.float32).tolist(),
+            documents=[row["text"] for row in rows],
+            metadatas=[row["metadata"] or None for row in rows]
+        )
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        list(pool.map(insert, _batches(len(chunks), batch_size)))
+    for name in (EMBEDDINGS_FILE, CHUNKS_FILE, PARENTS_FILE, SENTENCES_FILE):
+        if os.path.exists(os.path.join(source, name)):
+            shutil.copyfile(os.path.join(source, name), os.path.join(out, name))
+    return collection.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the vector index from saved raw embeddings")
+    parser.add_argument('--backend', choices=('openai', 'ollama'),
+                        default=os.getenv('TA_BACKEND', 'openai').lower())
+    parser.add_argument('--index', default='Flat',
+                        help='faiss.index_factory string (FAISS) or HNSW<M> (Chroma)')
+    parser.add_argument('--source', help='Knowledge base to read (default: VECTOR_STORE_PATH)')
+    parser.add_argument('--out', help='Where to write (FAISS default: publish into --source; '
+                                      'required for Chroma)')
+    parser.add_argument('--workers', type=int, help='Build threads (default: all CPUs)')
+    parser.add_argument('--train-size', type=int, default=100000,
+                        help='Maximum vectors sampled to train IVF/PQ/SQ indexes')
+    parser.add_argument('--search-params', help='FAISS search settings stored with the index, '
+                                                'e.g. nprobe=16 or efSearch=64')
+    parser.add_argument('--space', default='l2', choices=('l2', 'ip', 'cosine'),
+                        help='Chroma distance')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print(f"Rebuilding {args.backend} index as {args.index}")
+    print("=" * 60)
+    start_time = time.perf_counter()
+    try:
+        if args.backend == 'ollama':
+            from config_ollama import ConfigOllama
+            if not args.out:
+                parser.error("--out is required for Chroma (the live directory is not rebuilt in place)")
+            count = rebuild_chroma(args.source or ConfigOllama.VECTOR_STORE_PATH, args.out,
+                                   args.index, args.workers, args.space)
+            print(f"+ Wrote {count} vectors to {args.out}; point VECTOR_STORE_PATH at it to switch")
+        else:
+            from config import Config
+            version = rebuild_faiss(args.source or Config.VECTOR_STORE_PATH, args.index, args.out,
+                                    args.workers, args.train_size, args.search_params,
+                                    keep=Config.SNAPSHOT_KEEP)
+            print(f"+ Published snapshot {version}")
+    except Exception as e:
+        print(f"X Rebuild failed: {e}")
+        sys.exit(1)
+    print(f"+ Done in {time.perf_counter() - start_time:.1f}s (no embedding calls)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Pre-fork Server for AI Teaching Assistant
+Loads the knowledge base once in the master process, then forks worker
+processes that inherit it copy-on-write and share one listening socket,
+so adding workers adds throughput without multiplying index memory.
+
+Run with:
+    python serve_prefork.py --workers 4
+    python serve_prefork.py --backend ollama --workers 2
+    python serve_prefork.py --server asgi --workers 4
+
+Send SIGUSR1 to the master for a per-worker memory report (Linux).
+"""
+from typing import Dict, Optional
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+_SMAPS_FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def memory_usage(pid: int) -> Optional[Dict[str, int]]:
+    """
+    RSS, PSS, shared and unique (private) memory of a process in KiB
+
+    Args:
+        pid: Process id
+
+    Returns:
+        Memory breakdown, or None where /proc/<pid>/smaps_rollup is unavailable
+    """
+    values = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+            for line in f:
+                name, _, rest = line.partition(':')
+                if name in _SMAPS_FIELDS:
+                    values[name] = int(rest.split()[0])
+    except (OSError, ValueError):
+        return None
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+        "unique": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    }
+
+
+def print_memory_report(master_pid: int, workers: Dict[int, int]):
+    """Print shared vs unique memory for the master and every worker"""
+    rows = [("master", master_pid)] + [(f"worker {slot}", pid) for slot, pid in sorted(workers.items())]
+    usage = {pid: memory_usage(pid) for _, pid in rows}
+    if usage[master_pid] is None:
+        print("X Memory report needs /proc/<pid>/smaps_rollup (Linux)")
+        return
+
+    print(f"\n{'process':<10} {'pid':>7} {'rss':>9} {'pss':>9} {'shared':>9} {'unique':>9}  (MiB)")
+    for role, pid in rows:
+        m = usage[pid]
+        if m is None:
+            continue
+        print(f"{role:<10} {pid:>7} {m['rss'] / 1024:9.1f} {m['pss'] / 1024:9.1f} "
+              f"{m['shared'] / 1024:9.1f} {m['unique'] / 1024:9.1f}")
+
+    total_pss = sum(m["pss"] for m in usage.values() if m)
+    independent = usage[master_pid]["rss"] * len(workers)
+    print(f"Total PSS: {total_pss / 1024:.1f} MiB for {len(workers)} workers "
+          f"(~{independent / 1024:.1f} MiB if each worker loaded its own copy)\n")
+
+
+def _load_application(server: str, backend: str):
+    """Import the app module and load the knowledge base in this (master) process"""
+    # Load synchronously: loader threads do not survive fork
+    os.environ['INDEX_BACKGROUND_LOAD'] = 'false'
+    os.environ['TA_BACKEND'] = backend
+
+    if server == 'asgi':
+        module = importlib.import_module('app_asgi')
+        module.index_loader.start(background=False)
+    else:
+        module = importlib.import_module('app_ollama' if backend == 'ollama' else 'app')
+    # In case config was imported before the override took effect
+    module.index_loader.wait()
+    return module
+
+
+def _ollama_balancer():
+    """Ollama load balancer created while loading the app, if any"""
+    pool = sys.modules.get('ollama_pool')
+    return pool.existing_load_balancer() if pool is not None else None
+
+
+def _prepare_for_fork(module):
+    """Stop master-only threads and freeze the heap so workers share it"""
+    # Each worker watches for new snapshots itself (threads don't survive fork)
+    module.index_loader.stop_watching()
+
+    warmup = getattr(module.ta, 'warmup', None)
+    if warmup is not None:
+        # Keep-alive pings follow per-process traffic, so each worker runs its own
+        warmup.stop()
+
+    balancer = _ollama_balancer()
+    if balancer is not None:
+        # The health-check thread would not survive fork (leaving endpoints
+        # the master marked unhealthy ejected for good in every worker), and
+        # a probe holding the balancer lock at fork time would deadlock one
+        balancer.stop_health_checks()
+
+    # The FAISS vectors live in C++ memory and are never refcounted, but the
+    # docstore is millions of small Python objects. Moving them into the
+    # permanent generation keeps the cyclic GC from writing to (and so
+    # copying) their pages in every worker.
+    gc.collect()
+    gc.freeze()
+
+
+def _serve_worker(module, server: str, sock: socket.socket):
+    """Worker body: serve requests on the inherited listening socket"""
+    signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    if module.index_loader.watch_interval:
+        module.index_loader.watch()
+    warmup = getattr(module.ta, 'warmup', None)
+    if warmup is not None:
+        warmup.start(warm_up=False)
+    balancer = _ollama_balancer()
+    if balancer is not None:
+        balancer.start_health_checks()
+
+    if server == 'asgi':
+        import uvicorn
+        config = uvicorn.Config(module.app, lifespan='on', log_level='warning')
+        uvicorn.Server(config).run(sockets=[sock])
+        return
+
+    from werkzeug.serving import make_server
+    host, port = sock.getsockname()[:2]
+    httpd = make_server(host, port, module.app, threaded=True, fd=sock.fileno())
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so call it off-thread
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    httpd.serve_forever()
+
+
+def _spawn(module, server: str, sock: socket.socket) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _serve_worker(module, server, sock)
+        except Exception as e:
+            print(f"X Worker {os.getpid()} crashed: {e}")
+            code = 1
+        finally:
+            sys.stdout.flush()
+            os._exit(code)
+    return pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-fork AI Teaching Assistant server")
+    parser.add_argument('--backend', choices=('openai', 'ollama'),
+                        default=os.getenv('TA_BACKEND', 'openai').lower())
+    parser.add_argument('--server', choices=('flask', 'asgi'), default='flask',
+                        help='WSGI app (threaded per worker) or ASGI app (uvicorn per worker)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: PREFORK_WORKERS)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--report-interval', type=float,
+                        help='Seconds between memory reports, 0 to disable '
+                             '(default: PREFORK_MEMORY_REPORT_INTERVAL)')
+    args = parser.parse_args()
+
+    print("\n" + "=" * 60)
+    print(f"Starting AI Teaching Assistant Pre-fork Server ({args.backend}, {args.server})")
+    print("=" * 60)
+
+    start_time = time.perf_counter()
+    module = _load_application(args.server, args.backend)
+    if module.index_loader.state == 'failed':
+        print(f"X Knowledge base failed to load: {module.index_loader.error}")
+        sys.exit(1)
+    print(f"+ Master loaded application in {time.perf_counter() - start_time:.1f}s")
+
+    config = importlib.import_module('config_ollama' if args.backend == 'ollama' else 'config')
+    settings = config.ConfigOllama if args.backend == 'ollama' else config.Config
+    worker_count = args.workers or settings.PREFORK_WORKERS
+    report_interval = (settings.PREFORK_MEMORY_REPORT_INTERVAL
+                       if args.report_interval is None else args.report_interval)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(128)
+    sock.set_inheritable(True)
+
+    _prepare_for_fork(module)
+
+    workers = {}
+    for slot in range(worker_count):
+        workers[slot] = _spawn(module, args.server, sock)
+    print(f"+ Server running at: http://{args.host}:{args.port} with {worker_count} workers")
+
+    master_pid = os.getpid()
+    stopping = threading.Event()
+    report_requested = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGUSR1, lambda signum, frame: report_requested.set())
+
+    # First report once workers have served nothing yet: the shared baseline
+    next_report = time.monotonic() + min(report_interval, 5) if report_interval else None
+    while not stopping.is_set():
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            pid = 0
+        if pid:
+            slot = next((s for s, p in workers.items() if p == pid), None)
+            if slot is not None and not stopping.is_set():
+                print(f"X Worker {slot} (pid {pid}) exited with status {status}, restarting")
+                workers[slot] = _spawn(module, args.server, sock)
+            continue
+
+        if report_requested.is_set() or (next_report and time.monotonic() >= next_report):
+            report_requested.clear()
+            print_memory_report(master_pid, workers)
+            if report_interval:
+                next_report = time.monotonic() + report_interval
+        stopping.wait(0.5)
+
+    print("\nStopping workers...")
+    for pid in workers.values():
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    deadline = time.monotonic() + 10
+    remaining = set(workers.values())
+    while remaining and time.monotonic() < deadline:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid:
+            remaining.discard(pid)
+        else:
+            time.sleep(0.1)
+    for pid in remaining:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    sock.close()
+    print("+ Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Single-flight Module
+Coalesces identical in-flight questions so concurrent callers share one
+underlying execution (or one token stream fanned out to every waiter)
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterator, Tuple
+import asyncio
+import re
+import threading
+
+
+def normalize_question(question: str) -> str:
+    """Lower-case and collapse whitespace/trailing punctuation"""
+    return re.sub(r'\s+', ' ', question).strip().rstrip('?!. ').lower()
+
+
+class _Call:
+    """One in-flight execution shared by a leader and its followers"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Stream:
+    """One in-flight token stream replayed to every subscriber"""
+
+    def __init__(self):
+        self.tokens = []
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+
+
+class SingleFlight:
+    """Share results of identical concurrent calls keyed by an arbitrary key"""
+
+    def __init__(self):
+        self._calls = {}
+        self._async_calls = {}
+        self._streams = {}
+        self._lock = threading.Lock()
+        self.counters = {
+            "executions": 0,
+            "coalesced": 0,
+            "stream_executions": 0,
+            "stream_coalesced": 0
+        }
+
+    def do(self, key: Tuple, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument callable producing the result
+
+        Returns:
+            The shared result (exceptions are re-raised in every caller)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.counters["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.counters["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    async def ado(self, key: Tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of do() for callers on a single event loop
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            The shared result
+        """
+        future = self._async_calls.get(key)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this caller was cancelled
+                # The leader was cancelled, not us: run (or join) a fresh call
+                return await self.ado(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        self.counters["executions"] += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Followers waiting on the shared future are cancelled with the leader
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader-only failure does not log a warning
+            future.exception()
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            del self._async_calls[key]
+
+    def stream(self, key: Tuple, fn: Callable[[], Iterator[str]]) -> Iterator[str]:
+        """
+        Stream tokens from fn once for all concurrent subscribers with the same key
+
+        The first subscriber drives fn; later subscribers first replay the
+        tokens produced so far, then follow the live stream.
+
+        Args:
+            key: Coalescing key
+            fn: Zero-argument callable returning a token iterator
+
+        Yields:
+            Tokens of the shared stream
+        """
+        with self._lock:
+            shared = self._streams.get(key)
+            if shared is not None:
+                self.counters["stream_coalesced"] += 1
+                leader = False
+            else:
+                shared = self._streams[key] = _Stream()
+                self.counters["stream_executions"] += 1
+                leader = True
+
+        if leader:
+            # Drive the source in a thread so a slow or disconnected leader
+            # client cannot stall the followers
+            threading.Thread(
+                target=self._pump,
+                args=(key, shared, fn),
+                daemon=True
+            ).start()
+
+        position = 0
+        while True:
+            with shared.condition:
+                while position >= len(shared.tokens) and not shared.finished:
+                    shared.condition.wait()
+                pending = shared.tokens[position:]
+                finished = shared.finished
+            position += len(pending)
+            yield from pending
+            if finished and position >= len(shared.tokens):
+                break
+
+        if shared.error is not None:
+            raise shared.error
+
+    def _pump(self, key: Tuple, shared: _Stream, fn: Callable[[], Iterator[str]]):
+        try:
+            for token in fn():
+                with shared.condition:
+                    shared.tokens.append(token)
+                    shared.condition.notify_all()
+        except Exception as e:
+            shared.error = e
+        finally:
+            # Late arrivals start a fresh stream instead of replaying a finished one
+            with self._lock:
+                del self._streams[key]
+            with shared.condition:
+                shared.finished = True
+                shared.condition.notify_all()
+
+    def stats(self) -> Dict:
+        """Execution and coalescing counters"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats["in_flight"] = len(self._calls) + len(self._async_calls) + len(self._streams)
+        return stats
@@ -0,0 +1,143 @@
+"""
+Snapshots Module
+Versioned, atomically published knowledge base snapshots.
+
+    <root>/CURRENT                    name of the live snapshot
+    <root>/snapshots/<version>/       index.faiss, index.pkl, duplicates.json
+
+A save writes a new snapshot into a hidden staging directory, renames it
+into place and only then flips CURRENT (write-to-temp + os.replace), so a
+reader or a crash never observes a half-written index. A root without
+CURRENT is read as a pre-snapshot layout with the files directly inside.
+"""
+from typing import Iterable, Iterator, Optional, Tuple
+from contextlib import contextmanager
+import os
+import shutil
+import time
+import uuid
+
+CURRENT_FILE = "CURRENT"
+SNAPSHOT_DIR = "snapshots"
+_STAGING_PREFIX = ".staging-"
+_STALE_STAGING_SECONDS = 3600
+
+
+def _fsync_dir(path: str):
+    """Persist a directory entry change (no-op where directories can't be opened)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _fsync_tree(path: str):
+    for directory, _, files in os.walk(path):
+        for name in files:
+            with open(os.path.join(directory, name), 'rb') as f:
+                os.fsync(f.fileno())
+        _fsync_dir(directory)
+
+
+def new_version() -> str:
+    """Sortable, collision-free snapshot name (UTC timestamp + random suffix)"""
+    now = time.time()
+    stamp = time.strftime('%Y%m%dT%H%M%S', time.gmtime(now))
+    return f"{stamp}.{int(now % 1 * 1e6):06d}Z-{uuid.uuid4().hex[:8]}"
+
+
+def current_snapshot(root: str) -> Optional[str]:
+    """Version named by CURRENT, or None for an unversioned root"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def snapshot_path(root: str, version: Optional[str]) -> str:
+    """Directory holding a snapshot (the root itself for an unversioned root)"""
+    if version is None:
+        return root
+    return os.path.join(root, SNAPSHOT_DIR, version)
+
+
+def publish(root: str, version: str):
+    """Atomically point CURRENT at a snapshot"""
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(version + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+    _fsync_dir(root)
+
+
+def prune(root: str, keep: int, protect: Iterable[str] = ()):
+    """
+    Delete old snapshots and abandoned staging directories
+
+    Args:
+        root: Knowledge base root
+        keep: Newest snapshots to keep (the current one is always kept)
+        protect: Snapshot directories never deleted (e.g. one this process
+            has memory-mapped)
+    """
+    directory = os.path.join(root, SNAPSHOT_DIR)
+    if not os.path.isdir(directory):
+        return
+    current = current_snapshot(root)
+    names = sorted(os.listdir(directory))
+    protected = {os.path.realpath(path) for path in protect if path}
+
+    versions = [n for n in names if not n.startswith('.')]
+    for name in versions[:-keep] if keep > 0 else versions:
+        path = os.path.join(directory, name)
+        if name != current and os.path.realpath(path) not in protected:
+            shutil.rmtree(path, ignore_errors=True)
+
+    for name in names:
+        path = os.path.join(directory, name)
+        if name.startswith(_STAGING_PREFIX) and time.time() - os.path.getmtime(path) > _STALE_STAGING_SECONDS:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def write_snapshot(root: str, keep: int = 3, protect: Iterable[str] = ()) -> Iterator[Tuple[str, str]]:
+    """
+    Stage a new snapshot and publish it when the block succeeds
+
+    Yields a staging directory to write the files into and the version it
+    will be published as. On normal exit the files are fsynced, the
+    directory is renamed to its version and CURRENT is flipped to it; on
+    an exception the staging directory is removed and CURRENT is left
+    untouched.
+
+    Args:
+        root: Knowledge base root
+        keep: Snapshots kept after publishing
+        protect: Snapshot directories pruning must not delete
+
+    Yields:
+        (staging directory, version)
+    """
+    version = new_version()
+    directory = os.path.join(root, SNAPSHOT_DIR)
+    staging = os.path.join(directory, f"{_STAGING_PREFIX}{version}")
+    os.makedirs(staging)
+    try:
+        yield staging, version
+        _fsync_tree(staging)
+        os.rename(staging, os.path.join(directory, version))
+        _fsync_dir(directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    publish(root, version)
+    prune(root, keep, protect)
@@ -0,0 +1,61 @@
+"""
+Source Cache Module
+Small on-disk JSON cache for extracted/fetched source material
+"""
+from typing import Any, Optional
+import hashlib
+import json
+import os
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """
+    Hash a file in fixed-size blocks
+
+    Args:
+        path: File path
+        block_size: Read size in bytes
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """JSON values stored one file per key under a namespace directory"""
+
+    def __init__(self, root: str, namespace: str):
+        """
+        Initialize cache
+
+        Args:
+            root: Cache root directory
+            namespace: Sub-directory for this kind of entry (e.g. 'pdf')
+        """
+        self.directory = os.path.join(root, namespace)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None"""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def put(self, key: str, value: Any):
+        """Store a value atomically (write to temp file, then rename)"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
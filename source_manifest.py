@@ -0,0 +1,125 @@
+"""
+Source Manifest Module
+Tracks the files ingested from a directory (path, size, mtime, hash) so
+later runs only load files that are new or modified. Size and mtime are
+compared first; files are hashed only when those differ.
+"""
+from typing import Dict, List, Sequence
+import glob
+import json
+import os
+from source_cache import file_sha256
+
+
+class ManifestScan:
+    """Result of comparing a directory against its manifest"""
+
+    def __init__(self):
+        self.added: List[str] = []
+        self.modified: List[str] = []
+        self.unchanged: List[str] = []
+        self.removed: List[str] = []
+        self.hashed = 0
+        self.entries: Dict[str, Dict] = {}
+
+    @property
+    def changed(self) -> List[str]:
+        """Files that need (re)loading, in walk order"""
+        return sorted(self.added + self.modified)
+
+    def summary(self) -> Dict:
+        return {
+            "added": len(self.added),
+            "modified": len(self.modified),
+            "unchanged": len(self.unchanged),
+            "removed": len(self.removed),
+            "hashed": self.hashed
+        }
+
+
+def list_files(pattern: str, extensions: Sequence[str]) -> List[str]:
+    """
+    Files under a directory, or matching a glob pattern, with given extensions
+
+    Args:
+        pattern: Directory path (walked recursively) or glob (supports **)
+        extensions: Lower-case extensions to keep, e.g. ['.pdf', '.txt']
+
+    Returns:
+        Sorted absolute file paths
+    """
+    if os.path.isdir(pattern):
+        paths = []
+        for directory, subdirectories, files in os.walk(pattern):
+            subdirectories[:] = sorted(d for d in subdirectories if not d.startswith('.'))
+            paths.extend(os.path.join(directory, name) for name in files)
+    else:
+        paths = [p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p)]
+
+    return sorted(
+        os.path.abspath(p) for p in paths
+        if os.path.splitext(p)[1].lower() in extensions
+    )
+
+
+class SourceManifest:
+    """JSON manifest of {path: {size, mtime_ns, sha256}} for one source tree"""
+
+    def __init__(self, path: str):
+        """
+        Initialize manifest
+
+        Args:
+            path: Manifest file path (created on first commit)
+        """
+        self.path = path
+        self.files: Dict[str, Dict] = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.files = json.load(f)
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def scan(self, paths: Sequence[str]) -> ManifestScan:
+        """
+        Classify files as added, modified, unchanged or removed
+
+        Args:
+            paths: Current files of the source tree
+
+        Returns:
+            ManifestScan with the entries to record once ingestion succeeds
+        """
+        scan = ManifestScan()
+        for path in paths:
+            stat = os.stat(path)
+            entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+            known = self.files.get(path)
+
+            if known and known["size"] == entry["size"] and known["mtime_ns"] == entry["mtime_ns"]:
+                entry["sha256"] = known["sha256"]
+                scan.unchanged.append(path)
+            else:
+                entry["sha256"] = file_sha256(path)
+                scan.hashed += 1
+                if known is None:
+                    scan.added.append(path)
+                elif known["sha256"] == entry["sha256"]:
+                    # Touched but identical: record the new mtime, skip loading
+                    scan.unchanged.append(path)
+                else:
+                    scan.modified.append(path)
+            scan.entries[path] = entry
+
+        current = set(paths)
+        scan.removed = sorted(p for p in self.files if p not in current)
+        return scan
+
+    def commit(self, scan: ManifestScan):
+        """Record a scan's entries and write the manifest atomically"""
+        self.files = dict(scan.entries)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.files, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,41 @@
+"""
+Two-stage retrieval against flat search
+"""
+import faiss
+import numpy as np
+from document_router import DocumentRouter
+
+
+def _corpus(documents=12, chunks=9, dimension=32, seed=3):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((documents * chunks, dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Interleave documents so positions of one document are not contiguous
+    keys = [f"lecture{i % documents}.pdf" for i in range(len(vectors))]
+    return vectors, keys
+
+
+def test_full_fan_out_matches_flat_search():
+    vectors, keys = _corpus()
+    router = DocumentRouter.build(keys, lambda positions: vectors[positions], batch_size=25)
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    queries = np.random.default_rng(5).standard_normal((20, vectors.shape[1])).astype(np.float32)
+
+    for fan_out in (len(router.keys), len(router.keys) + 5):
+        for query in queries:
+            positions, distances = router.search(query, 6, fan_out, lambda p: vectors[p])
+            flat_distances, flat_positions = flat.search(query[None, :], 6)
+            assert positions.tolist() == flat_positions[0].tolist()
+            np.testing.assert_allclose(distances, flat_distances[0], rtol=1e-5, atol=1e-5)
+
+
+def test_saved_router_routes_the_same(tmp_path):
+    vectors, keys = _corpus()
+    router = DocumentRouter.build(keys, lambda positions: vectors[positions])
+    router.save(str(tmp_path / "routing.npz"))
+    loaded = DocumentRouter.load(str(tmp_path / "routing.npz"))
+    assert loaded.keys == router.keys and loaded.total == len(vectors)
+    query = vectors[17]
+    assert loaded.route(query, 3).tolist() == router.route(query, 3).tolist()
+    assert loaded.search(query, 1, 3, lambda p: vectors[p])[0].tolist() == [17]
@@ -0,0 +1,126 @@
+"""
+Ollama load balancing against local stub servers
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from ollama_pool import OllamaLoadBalancer
+
+
+class StubOllama:
+    """Minimal Ollama API on a local port; flip `failing` to return 500s"""
+
+    def __init__(self, models=("mistral:latest",)):
+        self.models = list(models)
+        self.failing = False
+        self.generations = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if stub.failing:
+                    return self._reply(500, {"error": "down"})
+                if self.path == '/api/version':
+                    return self._reply(200, {"version": "0.1.0"})
+                return self._reply(200, {"models": [{"name": name} for name in stub.models]})
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if stub.failing:
+                    return self._reply(500, {"error": "down"})
+                stub.generations += 1
+                return self._reply(200, {"response": "ok"})
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _balancer(stubs, **kwargs):
+    kwargs.setdefault('failure_threshold', 2)
+    kwargs.setdefault('eject_seconds', 60)
+    kwargs.setdefault('probe_timeout', 2)
+    return OllamaLoadBalancer([stub.url for stub in stubs], required_models=['mistral'], **kwargs)
+
+
+def _generate(balancer):
+    return balancer.post_json('/api/generate', {"model": "mistral", "prompt": "hi"}, timeout=5)
+
+
+def test_least_outstanding_selection():
+    stubs = [StubOllama() for _ in range(3)]
+    try:
+        balancer = _balancer(stubs)
+        held = [balancer.acquire(), balancer.acquire()]
+        # The only idle endpoint takes the next request, whatever the rotation
+        idle = balancer.acquire()
+        assert {ep.url for ep in held + [idle]} == {stub.url for stub in stubs}
+        balancer.release(idle, 0.01, success=True)
+        for _ in range(4):
+            endpoint = balancer.acquire()
+            assert endpoint is idle
+            balancer.release(endpoint, 0.01, success=True)
+        for endpoint in held:
+            balancer.release(endpoint, 0.01, success=True)
+        assert all(stat["outstanding"] == 0 for stat in balancer.stats())
+    finally:
+        for stub in stubs:
+            stub.close()
+
+
+def test_failing_endpoint_is_ejected_after_threshold():
+    healthy, broken = StubOllama(), StubOllama()
+    broken.failing = True
+    try:
+        balancer = _balancer([healthy, broken], failure_threshold=2)
+        failures = 0
+        for _ in range(4):
+            try:
+                assert _generate(balancer) == {"response": "ok"}
+            except Exception:
+                failures += 1
+        assert failures == 2
+        stats = {stat["url"]: stat for stat in balancer.stats()}
+        assert stats[broken.url]["ejected"] and stats[broken.url]["ejections"] == 1
+
+        served = healthy.generations
+        for _ in range(5):
+            assert _generate(balancer) == {"response": "ok"}
+        assert healthy.generations == served + 5
+    finally:
+        healthy.close()
+        broken.close()
+
+
+def test_health_probe_readmits_endpoint():
+    first, second = StubOllama(), StubOllama(models=["llama2:latest"])
+    try:
+        balancer = _balancer([first, second])
+        balancer.check_health()
+        # Missing the required model counts as unhealthy
+        assert [stat["healthy"] for stat in balancer.stats()] == [True, False]
+        assert all(balancer.acquire().url == first.url for _ in range(3))
+
+        second.models.append("mistral:7b")
+        balancer.check_health()
+        assert [stat["healthy"] for stat in balancer.stats()] == [True, True]
+        assert {balancer.acquire().url for _ in range(4)} == {first.url, second.url}
+    finally:
+        first.close()
+        second.close()
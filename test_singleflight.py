@@ -0,0 +1,44 @@
+"""
+Single-flight coalescing when the leading caller goes away
+"""
+import asyncio
+from singleflight import SingleFlight
+
+
+def test_follower_survives_cancelled_leader():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def answer():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(flight.ado(("q",), answer))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.ado(("q",), answer))
+        await asyncio.sleep(0)
+        leader.cancel()
+        result = await asyncio.wait_for(follower, timeout=2)
+        return result, len(calls), flight._async_calls
+
+    result, executions, pending = asyncio.run(scenario())
+    assert result == "answer"
+    assert executions == 2
+    assert pending == {}
+
+
+def test_leader_failure_reaches_followers():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        return await asyncio.gather(flight.ado(("q",), fail), flight.ado(("q",), fail),
+                                    return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
@@ -0,0 +1,25 @@
+"""
+Snapshot pruning while an older snapshot is still memory-mapped
+"""
+import os
+from snapshots import SNAPSHOT_DIR, current_snapshot, snapshot_path, write_snapshot
+
+
+def _save(root, keep, protect=()):
+    with write_snapshot(root, keep=keep, protect=protect) as (staging, version):
+        with open(os.path.join(staging, "index.faiss"), "w") as f:
+            f.write(version)
+    return version
+
+
+def test_prune_keeps_protected_snapshot(tmp_path):
+    root = str(tmp_path)
+    mapped = snapshot_path(root, _save(root, keep=1))
+    for _ in range(3):
+        latest = _save(root, keep=1, protect=[mapped])
+    assert sorted(os.listdir(os.path.join(root, SNAPSHOT_DIR))) == \
+        sorted([os.path.basename(mapped), latest])
+    assert current_snapshot(root) == latest
+
+    _save(root, keep=1)
+    assert not os.path.exists(mapped)
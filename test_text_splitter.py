@@ -0,0 +1,43 @@
+"""
+Token-aware chunking with non-ASCII text
+
+Uses a byte-level stand-in for tiktoken (one token per UTF-8 byte, offsets
+as tiktoken's decode_with_offsets reports them), so it runs offline.
+"""
+import text_splitter
+from text_splitter import TextChunker, TokenCounter
+
+
+class ByteEncoder:
+    """Every UTF-8 byte is a token; continuation bytes share their character's offset"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode('utf-8'))
+
+    def decode_with_offsets(self, tokens):
+        offsets = []
+        chars = 0
+        for token in tokens:
+            continuation = 0x80 <= token < 0xC0
+            offsets.append(max(0, chars - continuation))
+            chars += not continuation
+        return bytes(tokens).decode('utf-8'), offsets
+
+
+def test_token_counter_counts_shared_offsets():
+    counter = TokenCounter("日本語", ByteEncoder())
+    assert counter.starts == [0, 0, 0, 1, 1, 1, 2, 2, 2]
+    assert counter(0, 1) == 3
+    assert counter(1, 2) == 3
+    assert counter(0, 3) == 9
+
+
+def test_token_chunks_stay_within_budget(monkeypatch):
+    monkeypatch.setattr(text_splitter, "get_token_encoder", lambda name: ByteEncoder())
+    # Long unspaced CJK runs are split character by character
+    text = " ".join(["日本語のテキストを分割します" * 5, "emoji 🙂🚀 mixed", "naïve café", "中文分词测试"] * 10)
+    chunker = TextChunker(chunk_size=40, chunk_overlap=10, length_unit='tokens', child_chunk_size=0)
+    chunks = chunker.split_text(text)
+    assert chunks
+    for chunk in chunks:
+        assert len(chunk.encode('utf-8')) <= 40
@@ -0,0 +1,40 @@
+"""
+Streamed text segments keep exact byte offsets, even for invalid UTF-8
+"""
+from text_stream import iter_text_segments
+
+
+def _check(path, data, **kwargs):
+    segments = list(iter_text_segments(path, **kwargs))
+    position = 0
+    chars = 0
+    for segment, byte_start, byte_end, char_start in segments:
+        assert byte_start == position and char_start == chars
+        assert not any(0xDC80 <= ord(c) < 0xDD00 for c in segment)
+        raw = data[byte_start:byte_end].decode('utf-8', errors='surrogateescape')
+        assert segment == "".join("\ufffd" if 0xDC80 <= ord(c) < 0xDD00 else c for c in raw)
+        position = byte_end
+        chars += len(segment)
+    assert position == len(data)
+    return segments
+
+
+def test_offsets_with_multibyte_text(tmp_path):
+    data = ("Gradient descent — naïve café. 日本語のテキスト 🙂\n\n" * 40).encode('utf-8')
+    path = tmp_path / "lecture.txt"
+    path.write_bytes(data)
+    assert len(_check(str(path), data, segment_chars=50, window_bytes=7)) > 10
+
+
+def test_offsets_survive_invalid_bytes(tmp_path):
+    # Stray Latin-1 bytes, a truncated sequence and a lone continuation byte
+    data = b"".join(
+        b"caf\xe9 notes \xe6\x97 on entropy \x80 and " + "日本語 ".encode('utf-8') * 3
+        for _ in range(30)
+    ) + b"trailing \xe6"
+    path = tmp_path / "lecture.txt"
+    path.write_bytes(data)
+    segments = _check(str(path), data, segment_chars=40, window_bytes=5)
+    text = "".join(segment for segment, _, _, _ in segments)
+    assert text.count("\ufffd") == 30 * 4 + 1
+    assert "日本語" in text
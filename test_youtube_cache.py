@@ -0,0 +1,159 @@
+"""
+YouTube transcript cache and rate limiting against recorded fixtures
+
+fixtures/youtube_cache is a YOUTUBE_CACHE_DIR recorded from a three-video
+playlist (one video with transcripts disabled); every entry is older than
+a day, so a short TTL makes them all stale.
+"""
+import os
+import shutil
+import threading
+import time
+import pytest
+import youtube_cache
+from rate_limit import RateLimiter
+from youtube_cache import OfflineCacheMiss, YouTubeTranscriptStore
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "youtube_cache")
+PLAYLIST = "https://www.youtube.com/playlist?list=PLcourse101"
+
+
+class FakeTranscript:
+    def __init__(self, language_code, is_generated, text):
+        self.language_code = language_code
+        self.is_generated = is_generated
+        self.text = text
+
+    def fetch(self):
+        return [{"text": part} for part in self.text.split(". ")]
+
+
+class FakeTranscriptList(list):
+    def find_transcript(self, languages):
+        return self[0]
+
+
+class FakeYouTube:
+    def __init__(self, url):
+        self.title = f"Video {url[-11:]}"
+        self.description = self.thumbnail_url = self.author = None
+        self.views = self.length = 0
+        self.publish_date = None
+
+
+class FakeNetwork:
+    """Stands in for youtube-transcript-api and pytube, counting calls"""
+
+    def __init__(self, monkeypatch, tracks=(("en", False),), text="Fresh transcript. Second part"):
+        self.listings = 0
+        self.playlists = 0
+        self.tracks = list(tracks)
+        self.text = text
+        self.playlist_urls = []
+        network = self
+
+        class Api:
+            @staticmethod
+            def list_transcripts(video_id):
+                network.listings += 1
+                return FakeTranscriptList(FakeTranscript(code, generated, network.text)
+                                          for code, generated in network.tracks)
+
+        class Playlist:
+            def __init__(self, url):
+                network.playlists += 1
+                self.video_urls = network.playlist_urls
+
+        monkeypatch.setattr(youtube_cache, "YouTubeTranscriptApi", Api)
+        monkeypatch.setattr(youtube_cache, "YouTube", FakeYouTube)
+        monkeypatch.setattr(youtube_cache, "Playlist", Playlist)
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    target = tmp_path / "cache"
+    shutil.copytree(FIXTURES, target)
+    return str(target)
+
+
+def _store(cache_dir, **kwargs):
+    kwargs.setdefault("ttl", 3600)
+    return YouTubeTranscriptStore(cache_dir, workers=2, rate=0, **kwargs)
+
+
+def test_offline_playlist_loads_from_fixtures(monkeypatch):
+    network = FakeNetwork(monkeypatch)
+    store = _store(FIXTURES, offline=True)
+    documents = store.load([PLAYLIST])
+    assert [doc.metadata["title"] for doc in documents] == \
+        ["Lecture 1: Gradient Descent", "Lecture 2: Backpropagation"]
+    assert store.counters == {"cached": 3, "revalidated": 0, "downloaded": 0}
+    assert network.listings == network.playlists == 0
+
+    with pytest.raises(OfflineCacheMiss):
+        store.get("notrecorded")
+    with pytest.raises(OfflineCacheMiss):
+        store.expand("https://www.youtube.com/playlist?list=PLunknown")
+
+
+def test_fresh_entries_skip_the_network(cache_dir, monkeypatch):
+    network = FakeNetwork(monkeypatch)
+    store = _store(cache_dir, ttl=float("inf"))
+    assert store.get("lecture0001").metadata["source"] == "lecture0001"
+    assert store.get("nocaptions1") is None
+    assert store.expand(PLAYLIST) == ["lecture0001", "nocaptions1", "lecture0002"]
+    assert network.listings == network.playlists == 0
+
+
+def test_stale_entry_is_revalidated_when_transcripts_are_unchanged(cache_dir, monkeypatch):
+    network = FakeNetwork(monkeypatch)
+    store = _store(cache_dir)
+    document = store.get("lecture0002")
+    assert document.page_content.startswith("Backpropagation applies the chain rule")
+    assert store.counters["revalidated"] == 1 and network.listings == 1
+
+    # Renewed on disk, so the next read is fresh again
+    assert store.get("lecture0002").page_content == document.page_content
+    assert store.counters["cached"] == 1 and network.listings == 1
+
+
+def test_stale_entry_is_downloaded_when_transcripts_change(cache_dir, monkeypatch):
+    network = FakeNetwork(monkeypatch, tracks=[("en", False), ("de", True)])
+    store = _store(cache_dir)
+    document = store.get("lecture0001")
+    assert document.page_content == "Fresh transcript Second part"
+    assert document.metadata["title"] == "Video lecture0001"
+    assert store.counters["downloaded"] == 1
+
+    offline = _store(cache_dir, offline=True)
+    assert offline.get("lecture0001").page_content == "Fresh transcript Second part"
+
+
+def test_stale_playlist_is_expanded_again(cache_dir, monkeypatch):
+    network = FakeNetwork(monkeypatch)
+    network.playlist_urls = ["https://www.youtube.com/watch?v=lecture0002",
+                             "https://youtu.be/lecture0003"]
+    store = _store(cache_dir)
+    assert store.expand(PLAYLIST) == ["lecture0002", "lecture0003"]
+    assert store.expand(PLAYLIST) == ["lecture0002", "lecture0003"]
+    assert network.playlists == 1
+
+
+def test_rate_limiter_spaces_acquisitions_after_the_burst():
+    limiter = RateLimiter(rate=50, burst=2)
+    start = time.monotonic()
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(7)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Two tokens up front, then one every 20 ms
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(rate=0)
+    start = time.monotonic()
+    for _ in range(1000):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.5
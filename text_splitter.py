@@ -2,47 +2,284 @@
 Text Splitter Module
 Handles splitting documents into smaller chunks with overlap
 """
-from typing import List
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import Dict, List, Tuple
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import hashlib
+import heapq
+import json
 from langchain.schema import Document
+from fast_splitter import FastRecursiveSplitter
 from config import Config
 
 
+@lru_cache(maxsize=None)
+def get_token_encoder(encoding_name: str):
+    """Load a tiktoken encoding once per process"""
+    import tiktoken
+    return tiktoken.get_encoding(encoding_name)
+
+
+class TokenCounter:
+    """Token length of any span of a text, from a single encoding pass"""
+    
+    def __init__(self, text: str, encoder):
+        """
+        Encode the text once and remember where each token starts
+        
+        Args:
+            text: Full document text
+            encoder: tiktoken Encoding
+        """
+        tokens = encoder.encode(text, disallowed_special=())
+        _, self.starts = encoder.decode_with_offsets(tokens)
+    
+    def __call__(self, start: int, end: int) -> int:
+        """Number of tokens overlapping text[start:end]"""
+        if end <= start or not self.starts:
+            return 0
+        # Byte-level tokens of one character (CJK, emoji) share its start
+        # offset: count from the first token at the covering token's offset
+        covering = max(bisect_right(self.starts, start) - 1, 0)
+        first = bisect_left(self.starts, self.starts[covering])
+        return bisect_left(self.starts, end) - first
+
+
+def document_key(doc: Document) -> str:
+    """Stable key for a source document (metadata plus content)"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps(doc.metadata, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(b"\0")
+    digest.update(doc.page_content.encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def balanced_batches(sizes: List[int], batch_count: int) -> List[List[int]]:
+    """
+    Partition item indices into batches of similar total size
+    
+    Largest items are placed first, each into the currently lightest batch.
+    
+    Args:
+        sizes: Size of each item
+        batch_count: Number of batches to fill
+        
+    Returns:
+        Non-empty lists of item indices, each in ascending order
+    """
+    heap = [(0, i, []) for i in range(max(1, batch_count))]
+    for index in sorted(range(len(sizes)), key=lambda i: -sizes[i]):
+        total, i, batch = heapq.heappop(heap)
+        batch.append(index)
+        heapq.heappush(heap, (total + sizes[index], i, batch))
+    return [sorted(batch) for _, _, batch in heap if batch]
+
+
+def _split_batch(args: Tuple[Dict, List[Tuple[int, str, Dict]]]) -> List[Tuple[int, List[Tuple[str, Dict]]]]:
+    """Worker: split a batch of (index, text, metadata) documents
+    
+    Chunks go back as plain (text, metadata) tuples, which pickle much
+    faster than Document objects.
+    """
+    settings, items = args
+    chunker = _worker_chunker(**settings)
+    results = []
+    for index, text, metadata in items:
+        chunks = chunker._split_document(Document(page_content=text, metadata=metadata))
+        results.append((index, [(chunk.page_content, chunk.metadata) for chunk in chunks]))
+    return results
+
+
+@lru_cache(maxsize=4)
+def _worker_chunker(**settings) -> "TextChunker":
+    """One chunker per worker process and settings"""
+    return TextChunker(**settings)
+
+
 class TextChunker:
     """Split documents into smaller chunks for efficient retrieval"""
     
-    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+    def __init__(self, chunk_size: int = None, chunk_overlap: int = None,
+                 splitter: str = None, length_unit: str = None,
+                 child_chunk_size: int = None, child_chunk_overlap: int = None):
         """
         Initialize text splitter
         
         Args:
             chunk_size: Size of each chunk (default from config)
             chunk_overlap: Overlap between chunks (default from config)
+            splitter: 'fast' or 'recursive' (default from config)
+            length_unit: 'chars' or 'tokens' (default from config); token
+                         mode always uses the fast splitter
+            child_chunk_size: Small-to-big retrieval: cut every chunk into
+                              children of this size (same unit), which are
+                              embedded while the chunk is kept as their
+                              parent window (default from config, 0 = off)
+            child_chunk_overlap: Overlap between children (default from config)
         """
-        self.chunk_size = chunk_size or Config.CHUNK_SIZE
-        self.chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
+        self.length_unit = length_unit or Config.CHUNK_LENGTH_UNIT
+        if self.length_unit == 'tokens':
+            self.chunk_size = chunk_size or Config.CHUNK_SIZE_TOKENS
+            self.chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP_TOKENS
+            self.splitter = 'fast'
+        else:
+            self.chunk_size = chunk_size or Config.CHUNK_SIZE
+            self.chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
+            self.splitter = splitter or Config.CHUNKER
+        self.separators = ["\n\n", "\n", " ", ""]
+        self._text_splitter = None
         
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.child_chunk_size = Config.CHILD_CHUNK_SIZE if child_chunk_size is None else child_chunk_size
+        self.child_chunk_overlap = (Config.CHILD_CHUNK_OVERLAP if child_chunk_overlap is None
+                                    else child_chunk_overlap)
+        self.child_splitter = None
+        if self.child_chunk_size:
+            self.child_splitter = FastRecursiveSplitter(
+                chunk_size=self.child_chunk_size,
+                chunk_overlap=min(self.child_chunk_overlap, self.child_chunk_size // 2),
+                separators=self.separators
+            )
+        
+        # Same boundaries, computed on offsets instead of string copies
+        self.fast_splitter = FastRecursiveSplitter(
             chunk_size=self.chunk_size,
             chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
+            separators=self.separators
         )
     
-    def split_documents(self, documents: List[Document]) -> List[Document]:
+    @property
+    def text_splitter(self):
+        """LangChain splitter, imported and built only when actually used"""
+        if self._text_splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                length_function=len,
+                separators=self.separators
+            )
+        return self._text_splitter
+    
+    def _length_function(self, text: str):
+        """Span length function for the fast splitter (None = characters)"""
+        if self.length_unit != 'tokens':
+            return None
+        return TokenCounter(text, get_token_encoder(Config.TOKEN_ENCODING))
+    
+    def _split_with_offsets(self, doc: Document) -> List[Document]:
+        """Split with the fast splitter, recording start/end offsets in metadata"""
+        chunks = []
+        text = doc.page_content
+        length = self._length_function(text)
+        for start, end in self.fast_splitter.split_spans(text, length):
+            metadata = dict(doc.metadata)
+            metadata["start_index"] = start
+            metadata["end_index"] = end
+            if length is not None:
+                metadata["token_count"] = length(start, end)
+            chunks.append(Document(page_content=text[start:end], metadata=metadata))
+        return chunks
+    
+    def _split_document(self, doc: Document) -> List[Document]:
+        """Split one document and number its chunks with stable chunk ids"""
+        if self.splitter == 'fast':
+            chunks = self._split_with_offsets(doc)
+        else:
+            chunks = self.text_splitter.split_documents([doc])
+        key = document_key(doc)
+        for i, chunk in enumerate(chunks):
+            chunk.metadata["chunk_id"] = f"{key}-{i}"
+        if self.child_splitter is not None:
+            return [child for chunk in chunks for child in self._split_children(chunk)]
+        return chunks
+    
+    def _split_children(self, parent: Document) -> List[Document]:
+        """Cut a chunk into child chunks that point back at it as their parent window"""
+        text = parent.page_content
+        length = self._length_function(text)
+        parent_id = parent.metadata["chunk_id"]
+        offset = parent.metadata.get("start_index")
+        children = []
+        for j, (start, end) in enumerate(self.child_splitter.split_spans(text, length)):
+            metadata = dict(parent.metadata)
+            metadata["chunk_id"] = f"{parent_id}.{j}"
+            metadata["parent_id"] = parent_id
+            metadata["parent_text"] = text
+            if offset is not None:
+                metadata["parent_start_index"] = offset
+                metadata["parent_end_index"] = parent.metadata.get("end_index", offset + len(text))
+                metadata["start_index"] = offset + start
+                metadata["end_index"] = offset + end
+            if length is not None:
+                metadata["token_count"] = length(start, end)
+            children.append(Document(page_content=text[start:end], metadata=metadata))
+        return children
+    
+    def _settings(self) -> Dict:
+        return {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "splitter": self.splitter,
+            "length_unit": self.length_unit,
+            "child_chunk_size": self.child_chunk_size,
+            "child_chunk_overlap": self.child_chunk_overlap
+        }
+    
+    def _split_parallel(self, documents: List[Document], workers: int) -> List[Document]:
+        """Split across a process pool in size-balanced batches, keeping document order"""
+        sizes = [len(doc.page_content) for doc in documents]
+        batches = balanced_batches(sizes, workers * Config.CHUNK_BATCHES_PER_WORKER)
+        settings = self._settings()
+        tasks = [
+            (settings, [(i, documents[i].page_content, documents[i].metadata) for i in batch])
+            for batch in batches
+        ]
+        
+        results = [None] * len(documents)
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            for batch_result in executor.map(_split_batch, tasks):
+                for index, chunks in batch_result:
+                    results[index] = chunks
+        return [
+            Document(page_content=text, metadata=metadata)
+            for chunks in results for text, metadata in chunks
+        ]
+    
+    def split_documents(self, documents: List[Document], verbose: bool = True,
+                        workers: int = None) -> List[Document]:
         """
         Split documents into chunks
         
+        Large inputs are split across worker processes; small ones (below
+        CHUNK_PARALLEL_MIN_CHARS) stay in-process where pool start-up
+        would dominate. Output order and chunk ids are the same either way.
+        
         Args:
             documents: List of Document objects
+            verbose: Whether to print a summary
+            workers: Worker processes (default from config, 1 = in-process)
             
         Returns:
             List of chunked Document objects
         """
         try:
-            chunks = self.text_splitter.split_documents(documents)
-            print(f"+ Split {len(documents)} documents into {len(chunks)} chunks")
-            print(f"  Chunk size: {self.chunk_size}, Overlap: {self.chunk_overlap}")
+            workers = workers or Config.CHUNK_WORKERS
+            total_chars = sum(len(doc.page_content) for doc in documents)
+            parallel = (workers > 1 and len(documents) > 1
+                        and total_chars >= Config.CHUNK_PARALLEL_MIN_CHARS)
+            if parallel:
+                chunks = self._split_parallel(documents, workers)
+            else:
+                chunks = [chunk for doc in documents for chunk in self._split_document(doc)]
+            if verbose:
+                print(f"+ Split {len(documents)} documents into {len(chunks)} chunks")
+                print(f"  Chunk size: {self.chunk_size} {self.length_unit}, Overlap: {self.chunk_overlap}")
+                if self.child_splitter is not None:
+                    print(f"  Child chunks: {self.child_chunk_size} {self.length_unit} "
+                          f"(parent windows of {self.chunk_size})")
+                if parallel:
+                    print(f"  Split across {workers} worker processes")
             return chunks
         except Exception as e:
             print(f"X Error splitting documents: {e}")
@@ -59,7 +296,13 @@ class TextChunker:
             List of text chunks
         """
         try:
-            chunks = self.text_splitter.split_text(text)
+            if self.splitter == 'fast':
+                chunks = [
+                    text[start:end]
+                    for start, end in self.fast_splitter.split_spans(text, self._length_function(text))
+                ]
+            else:
+                chunks = self.text_splitter.split_text(text)
             print(f"+ Split text into {len(chunks)} chunks")
             return chunks
         except Exception as e:
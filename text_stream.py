@@ -0,0 +1,76 @@
+"""
+Text Stream Module
+Constant-memory reading of very large text files as chunk-ready segments.
+The file is read in fixed-size binary windows and decoded incrementally;
+each segment ends on a paragraph, line or word boundary and carries its
+byte and character offsets into the file.
+"""
+from typing import Iterator, Tuple
+import codecs
+
+_BOUNDARIES = ("\n\n", "\n", " ")
+
+# surrogateescape decodes each undecodable byte to U+DC80..U+DCFF
+_ESCAPED_BYTES = {code: "\ufffd" for code in range(0xDC80, 0xDD00)}
+
+
+def _cut_point(text: str, limit: int) -> int:
+    """Largest boundary position <= limit (paragraph, then line, then word)"""
+    floor = limit // 2  # never cut so early that segments become tiny
+    for boundary in _BOUNDARIES:
+        position = text.rfind(boundary, floor, limit)
+        if position != -1:
+            return position + len(boundary)
+    return limit
+
+
+def iter_text_segments(path: str, segment_chars: int, window_bytes: int = 1 << 20,
+                       encoding: str = 'utf-8') -> Iterator[Tuple[str, int, int, int]]:
+    """
+    Yield (segment, byte_start, byte_end, char_start) covering the whole file
+
+    Memory use is bounded by segment_chars plus one window regardless of
+    file size. Multi-byte characters split across windows are handled by
+    the incremental decoder. Undecodable bytes are decoded with
+    surrogateescape, so re-encoding a segment gives back exactly the bytes
+    it came from and the byte offsets stay exact; in the yielded text each
+    such byte is one U+FFFD replacement character.
+
+    Args:
+        path: Text file path
+        segment_chars: Target segment length in characters
+        window_bytes: Bytes read from disk at a time
+        encoding: File encoding
+
+    Yields:
+        Segment text and its [byte_start, byte_end) and character offsets
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='surrogateescape')
+    encoder = codecs.getincrementalencoder(encoding)(errors='surrogateescape')
+
+    buffer = ""
+    byte_position = 0
+    char_position = 0
+
+    def emit(segment):
+        nonlocal byte_position, char_position
+        byte_length = len(encoder.encode(segment))
+        result = (segment.translate(_ESCAPED_BYTES), byte_position,
+                  byte_position + byte_length, char_position)
+        byte_position += byte_length
+        char_position += len(segment)
+        return result
+
+    with open(path, 'rb') as f:
+        while True:
+            window = f.read(window_bytes)
+            buffer += decoder.decode(window, final=not window)
+            while len(buffer) >= segment_chars:
+                cut = _cut_point(buffer, segment_chars)
+                yield emit(buffer[:cut])
+                buffer = buffer[cut:]
+            if not window:
+                break
+
+    if buffer:
+        yield emit(buffer)
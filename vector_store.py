@@ -2,17 +2,65 @@
 Vector Store Module
 Handles embedding generation and FAISS vector store operations
 """
-from typing import List, Optional
-from langchain.schema import Document
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import FAISS
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
 from config import Config
+from context_compression import SENTENCES_FILE, SentenceStore
+from document_router import ROUTING_FILE, DocumentRouter
+from embedding_store import CHUNKS_FILE, EMBEDDINGS_FILE, EmbeddingTable, write_chunks
+from parent_store import PARENTS_FILE, ParentStore
+from published import Published
 import os
+import threading
+import uuid
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+    from langchain_community.vectorstores import FAISS
+
+
+def _faiss():
+    """FAISS store class, imported on first use (LangChain + faiss take ~0.5s to import)"""
+    from langchain_community.vectorstores import FAISS
+    return FAISS
+
+
+class LoadedIndex(NamedTuple):
+    """
+    Everything a search reads, published as one value
+    
+    A load or adopt replaces the whole bundle in a single assignment, so a
+    search that took the bundle never mixes one snapshot's store with
+    another's parents or sentences.
+    """
+    vector_store: Optional['FAISS']
+    # Snapshot directory of a memory-mapped (read-only) index, if any
+    mapped_path: Optional[str]
+    # float16 copy of every indexed vector, saved as embeddings.npy so
+    # rebuild_index.py can build other index types without re-embedding
+    raw_embeddings: EmbeddingTable
+    # (store, raw embeddings, DocumentRouter) for two-stage retrieval;
+    # only used while store is still the bundle's vector store
+    routing: Optional[tuple]
+    # Parent windows of small-to-big child chunks (empty when not used)
+    parents: ParentStore
+    # Sentence embeddings of retrievable texts for context compression
+    sentences: SentenceStore
+    
+    @classmethod
+    def empty(cls) -> 'LoadedIndex':
+        return cls(None, None, EmbeddingTable(), None, ParentStore(), SentenceStore())
 
 
 class VectorStoreManager:
     """Manage FAISS vector store for document embeddings"""
     
+    vector_store = Published('vector_store')
+    mapped_path = Published('mapped_path')
+    raw_embeddings = Published('raw_embeddings')
+    _routing = Published('routing')
+    parents = Published('parents')
+    sentences = Published('sentences')
+    
     def __init__(self, api_key: str = None):
         """
         Initialize vector store manager
@@ -21,13 +69,29 @@ class VectorStoreManager:
             api_key: OpenAI API key (default from config)
         """
         self.api_key = api_key or Config.OPENAI_API_KEY
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=self.api_key,
-            model=Config.EMBEDDING_MODEL
-        )
-        self.vector_store = None
+        self._embeddings = None
+        # Searches read this once; writers replace it under _publish_lock
+        self._index = LoadedIndex.empty()
+        self._publish_lock = threading.Lock()
+        self._routing_lock = threading.Lock()
+    
+    def _publish(self, **fields):
+        """Replace fields of the live bundle (a swap, never an in-place change)"""
+        with self._publish_lock:
+            self._index = self._index._replace(**fields)
+    
+    @property
+    def embeddings(self):
+        """OpenAI embeddings client, constructed on first use"""
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embeddings = OpenAIEmbeddings(
+                openai_api_key=self.api_key,
+                model=Config.EMBEDDING_MODEL
+            )
+        return self._embeddings
     
-    def create_vector_store(self, documents: List[Document]) -> FAISS:
+    def create_vector_store(self, documents: List['Document']) -> 'FAISS':
         """
         Create FAISS vector store from documents
         
@@ -39,88 +103,440 @@ class VectorStoreManager:
         """
         try:
             print(f"Creating embeddings for {len(documents)} documents...")
-            self.vector_store = FAISS.from_documents(
-                documents=documents,
-                embedding=self.embeddings
-            )
+            # Build beside the live store: searches keep using it until the
+            # new one is complete, and keep it if embedding fails
+            staging = VectorStoreManager(self.api_key)
+            staging._embeddings = self.embeddings
+            staging._embed_and_add(documents)
+            self.adopt(staging)
             print(f"+ Vector store created successfully")
             return self.vector_store
         except Exception as e:
             print(f"X Error creating vector store: {e}")
             return None
     
-    def add_documents(self, documents: List[Document]):
+    def adopt(self, staging: 'VectorStoreManager'):
+        """
+        Take over the store built by another manager, with everything kept
+        alongside it (raw embeddings, routing, parents, sentences)
+        
+        Args:
+            staging: Manager whose store replaces this one's
+        """
+        with self._publish_lock:
+            self._index = staging._index
+    
+    def add_documents(self, documents: List['Document']):
         """
         Add documents to existing vector store
         
         Args:
             documents: List of Document objects to add
+            
+        Returns:
+            True if the documents were indexed
         """
         try:
             if self.vector_store is None:
                 print("No existing vector store. Creating new one...")
-                self.create_vector_store(documents)
-            else:
-                self.vector_store.add_documents(documents)
-                print(f"+ Added {len(documents)} documents to vector store")
+                return self.create_vector_store(documents) is not None
+            self._embed_and_add(documents)
+            print(f"+ Added {len(documents)} documents to vector store")
+            return True
         except Exception as e:
             print(f"X Error adding documents: {e}")
+            return False
     
-    def save_vector_store(self, path: str = None):
+    def _embed_and_add(self, documents: List['Document']):
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embeddings.embed_documents(texts)
+        self.add_embeddings(texts, vectors, [doc.metadata for doc in documents])
+    
+    def add_embeddings(self, texts: List[str], embeddings: List[List[float]],
+                       metadatas: List[dict]):
+        """
+        Index precomputed embeddings (used by the ingestion pipeline)
+        
+        Args:
+            texts: Chunk texts
+            embeddings: One vector per text
+            metadatas: One metadata dict per text
+        """
+        self.parents.absorb(metadatas)
+        text_embeddings = list(zip(texts, embeddings))
+        ids = self._assign_ids(metadatas)
+        self._routing = None
+        if self.vector_store is None:
+            self.vector_store = _faiss().from_embeddings(
+                text_embeddings,
+                self.embeddings,
+                metadatas=metadatas,
+                ids=ids
+            )
+            self.mapped_path = None
+        else:
+            self._ensure_writable()
+            self.vector_store.add_embeddings(text_embeddings, metadatas=metadatas, ids=ids)
+        if Config.STORE_RAW_EMBEDDINGS:
+            self.raw_embeddings.add(ids, embeddings)
+        if Config.CONTEXT_COMPRESSION:
+            self._embed_sentences(texts, metadatas)
+    
+    def _embed_sentences(self, texts: List[str], metadatas: List[dict]):
+        """Embed the sentences of what retrieval returns: parent windows, else the chunks"""
+        retrievable = [self.parents.text((metadata or {}).get("parent_id")) or text
+                       for text, metadata in zip(texts, metadatas)]
+        sources = [(metadata or {}).get("source") for metadata in metadatas]
+        count = self.sentences.add(retrievable, sources, self.embeddings.embed_documents)
+        if count:
+            print(f"+ Embedded {count} sentences for context compression")
+    
+    def _assign_ids(self, metadatas: List[dict]) -> List[str]:
+        """Docstore ids: the chunk id where it is unique, else a fresh uuid"""
+        existing = self.vector_store.docstore._dict if self.vector_store is not None else {}
+        ids = []
+        taken = set()
+        for metadata in metadatas:
+            chunk_id = (metadata or {}).get("chunk_id")
+            if not chunk_id or chunk_id in taken or chunk_id in existing:
+                chunk_id = str(uuid.uuid4())
+            taken.add(chunk_id)
+            ids.append(chunk_id)
+        return ids
+    
+    def _ensure_writable(self):
+        """Swap a read-only memory-mapped index for an in-memory copy before modifying it"""
+        if self.mapped_path is not None:
+            import faiss
+            self.vector_store.index = faiss.read_index(os.path.join(self.mapped_path, "index.faiss"))
+            self.mapped_path = None
+    
+    def delete_sources(self, sources: List[str]) -> int:
+        """
+        Remove every chunk whose metadata source is one of the given sources
+        
+        Args:
+            sources: Source paths/URLs to drop
+            
+        Returns:
+            Number of chunks removed
+        """
+        if self.vector_store is None or not sources:
+            return 0
+        
+        wanted = set(sources)
+        ids = [
+            doc_id for doc_id, doc in self.vector_store.docstore._dict.items()
+            if doc.metadata.get("source") in wanted
+        ]
+        if ids:
+            self._ensure_writable()
+            self.vector_store.delete(ids)
+            self.raw_embeddings.remove(ids)
+            self._routing = None
+        self.parents.remove_sources(wanted)
+        self.sentences.remove_sources(wanted)
+        print(f"+ Removed {len(ids)} chunks from {len(wanted)} sources")
+        return len(ids)
+    
+    def count(self) -> int:
+        """Number of indexed chunks (0 when no store is loaded)"""
+        if self.vector_store is None:
+            return 0
+        return self.vector_store.index.ntotal
+    
+    def save_vector_store(self, path: str = None) -> bool:
         """
         Save vector store to disk
         
         Args:
             path: Path to save vector store (default from config)
+            
+        Returns:
+            True if the store was written
         """
         try:
             if self.vector_store is None:
                 print("X No vector store to save")
-                return
+                return False
             
             save_path = path or Config.VECTOR_STORE_PATH
             os.makedirs(save_path, exist_ok=True)
             
+            if Config.PCA_DIMENSIONS:
+                # Fitted once the index has data; later saves keep the same projection
+                self.project(Config.PCA_DIMENSIONS)
             self.vector_store.save_local(save_path)
+            if Config.STORE_RAW_EMBEDDINGS:
+                self._save_raw_embeddings(save_path)
+            if len(self.parents):
+                self.parents.save(os.path.join(save_path, PARENTS_FILE))
+            if len(self.sentences):
+                self.sentences.save(os.path.join(save_path, SENTENCES_FILE))
+            routing = self._current_routing(self._index) if Config.RETRIEVAL_MODE == 'two_stage' else None
+            if routing is not None and routing[2] is not None:
+                routing[2].save(os.path.join(save_path, ROUTING_FILE))
             print(f"+ Vector store saved to: {save_path}")
+            return True
         except Exception as e:
             print(f"X Error saving vector store: {e}")
+            return False
+    
+    def _position_ids(self) -> List[str]:
+        return [self.vector_store.index_to_docstore_id[i] for i in range(self.vector_store.index.ntotal)]
+    
+    def _raw_fallback(self, position_ids: List[str]):
+        """
+        Source for chunks missing from raw_embeddings (indexed before they were kept)
+        
+        Returns:
+            None if nothing is missing, index.reconstruct for flat indexes
+            (which hold the exact vectors), False if they can't be recovered
+        """
+        import faiss
+        index = self.vector_store.index
+        missing = sum(1 for doc_id in position_ids if doc_id not in self.raw_embeddings)
+        if not missing:
+            return None
+        if not isinstance(index, faiss.IndexFlat):
+            # Projected or quantized indexes only give approximations back
+            print(f"X {missing} chunks have no raw embedding and {type(index).__name__} "
+                  f"can't reconstruct them exactly")
+            return False
+        print(f"  Recovering {missing} raw embeddings from the index")
+        return index.reconstruct
+    
+    def _save_raw_embeddings(self, path: str):
+        """Write embeddings.npy + chunks.jsonl, one row per index position"""
+        position_ids = self._position_ids()
+        fallback = self._raw_fallback(position_ids)
+        if fallback is False:
+            print(f"X {EMBEDDINGS_FILE} not written")
+            return
+        
+        self.raw_embeddings.write(os.path.join(path, EMBEDDINGS_FILE), position_ids, fallback=fallback)
+        docstore = self.vector_store.docstore
+        write_chunks(os.path.join(path, CHUNKS_FILE), (
+            (doc_id, doc.page_content, doc.metadata)
+            for doc_id, doc in ((doc_id, docstore.search(doc_id)) for doc_id in position_ids)
+        ))
     
-    def load_vector_store(self, path: str = None) -> Optional[FAISS]:
+    def project(self, dimensions: int, train_size: int = None) -> bool:
+        """
+        Re-index with a PCA projection to fewer dimensions
+        
+        The PCA matrix is fitted on the raw embeddings and stored in front of
+        a flat index (faiss IndexPreTransform), so it is saved inside
+        index.faiss and applied to every later added and query vector.
+        1536 -> 256 dims cuts index memory and brute-force search time ~6x;
+        `python benchmark.py pca` reports the recall given up.
+        
+        Args:
+            dimensions: Target dimension
+            train_size: Maximum vectors sampled to fit the PCA (default from config)
+            
+        Returns:
+            True if the index is now projected to that dimension
+        """
+        import faiss
+        from rebuild_index import build_faiss_index
+        
+        index = self.vector_store.index
+        if isinstance(index, faiss.IndexPreTransform) and index.index.d == dimensions:
+            return True
+        if dimensions >= index.d:
+            print(f"X PCA to {dimensions} dims needs vectors with more than {index.d}")
+            return False
+        if index.ntotal < dimensions:
+            print(f"X PCA to {dimensions} dims needs at least {dimensions} vectors, have {index.ntotal}")
+            return False
+        
+        position_ids = self._position_ids()
+        fallback = self._raw_fallback(position_ids)
+        if fallback is False:
+            return False
+        vectors = self.raw_embeddings.stack(position_ids, fallback)
+        self.vector_store.index = build_faiss_index(vectors, f"PCA{dimensions},Flat",
+                                                    train_size=train_size or Config.PCA_TRAIN_SIZE)
+        self.mapped_path = None
+        print(f"+ Projected {len(vectors)} vectors from {index.d} to {dimensions} dims (PCA)")
+        return True
+    
+    def load_vector_store(self, path: str = None, mmap: bool = None) -> Optional['FAISS']:
         """
         Load vector store from disk
         
         Args:
             path: Path to load vector store from (default from config)
+            mmap: Memory-map the index read-only instead of reading it into
+                RAM (default from config). IVF indexes then stay in the page
+                cache, shared by every process serving the same snapshot;
+                flat indexes are still read into memory by FAISS.
             
         Returns:
             FAISS vector store or None
         """
         try:
             load_path = path or Config.VECTOR_STORE_PATH
+            mmap = Config.FAISS_MMAP if mmap is None else mmap
             
             if not os.path.exists(load_path):
                 print(f"X Vector store not found at: {load_path}")
                 return None
             
-            self.vector_store = FAISS.load_local(
-                load_path,
-                self.embeddings,
-                allow_dangerous_deserialization=True
-            )
-            print(f"+ Vector store loaded from: {load_path}")
+            if mmap:
+                vector_store = self._load_mapped(load_path)
+            else:
+                vector_store = _faiss().load_local(
+                    load_path,
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+            raw_embeddings = EmbeddingTable.load(load_path) if Config.STORE_RAW_EMBEDDINGS else None
+            raw_embeddings = raw_embeddings or EmbeddingTable()
+            routing = None
+            routing_path = os.path.join(load_path, ROUTING_FILE)
+            if Config.RETRIEVAL_MODE == 'two_stage' and os.path.exists(routing_path):
+                router = DocumentRouter.load(routing_path)
+                if router.total == vector_store.index.ntotal:
+                    routing = (vector_store, raw_embeddings, router)
+            parents = ParentStore.load(os.path.join(load_path, PARENTS_FILE))
+            sentences = SentenceStore.load(os.path.join(load_path, SENTENCES_FILE))
+            with self._publish_lock:
+                self._index = LoadedIndex(vector_store, load_path if mmap else None, raw_embeddings,
+                                          routing, parents, sentences)
+            print(f"+ Vector store loaded from: {load_path}" + (" (memory-mapped)" if mmap else ""))
             return self.vector_store
         except Exception as e:
             print(f"X Error loading vector store: {e}")
             return None
     
-    def similarity_search(self, query: str, k: int = None) -> List[Document]:
+    def _load_mapped(self, path: str) -> 'FAISS':
+        """Same files as FAISS.load_local, with the index opened via IO_FLAG_MMAP"""
+        import faiss
+        import pickle
+        index = faiss.read_index(
+            os.path.join(path, "index.faiss"),
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        with open(os.path.join(path, "index.pkl"), "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        return _faiss()(self.embeddings, index, docstore, index_to_docstore_id)
+    
+    def build_router(self) -> bool:
+        """
+        Build the per-document centroid index used by two-stage retrieval
+        
+        Each source's centroid is the normalized mean of its chunks' raw
+        embeddings, so this needs raw embeddings for every chunk.
+        
+        Returns:
+            True if a router is now available for the current store
+        """
+        routing = self._build_routing(self._index)
+        return routing is not None and routing[2] is not None
+    
+    def _build_routing(self, index: LoadedIndex) -> Optional[tuple]:
+        """(store, raw embeddings, router or None) for a bundle, published while its store is live"""
+        store = index.vector_store
+        raw_embeddings = index.raw_embeddings
+        if store is None:
+            return None
+        position_ids = [store.index_to_docstore_id[i] for i in range(store.index.ntotal)]
+        missing = sum(1 for doc_id in position_ids if doc_id not in raw_embeddings)
+        if missing:
+            print(f"X Two-stage retrieval needs raw embeddings; {missing} chunks have none "
+                  f"(re-save with STORE_RAW_EMBEDDINGS=true), using flat search")
+            routing = (store, raw_embeddings, None)
+        else:
+            keys = [store.docstore.search(doc_id).metadata.get("source", "") for doc_id in position_ids]
+            router = DocumentRouter.build(
+                keys, lambda positions: raw_embeddings.stack([position_ids[p] for p in positions])
+            )
+            routing = (store, raw_embeddings, router)
+            print(f"+ Routing index built: {len(router.keys)} documents over {len(position_ids)} chunks")
+        with self._publish_lock:
+            if self._index.vector_store is store:
+                self._index = self._index._replace(routing=routing)
+        return routing
+    
+    def _current_routing(self, index: LoadedIndex) -> Optional[tuple]:
+        """Routing for a bundle's store, built on first use (its router is None if it can't be)"""
+        routing = index.routing
+        if routing is None or routing[0] is not index.vector_store:
+            with self._routing_lock:
+                # Another search may have built it for the same store meanwhile
+                routing = self._index.routing
+                if routing is None or routing[0] is not index.vector_store:
+                    routing = self._build_routing(index)
+        return routing
+    
+    def _routed_search(self, index: LoadedIndex, query: str, k: int) -> Optional[List[tuple]]:
+        """Top documents by centroid first, then exact L2 over only their chunks"""
+        routing = self._current_routing(index)
+        if routing is None or routing[2] is None:
+            return None
+        store, raw_embeddings, router = routing
+        id_of = store.index_to_docstore_id
+        positions, distances = router.search(
+            self.embeddings.embed_query(query), k, Config.ROUTING_FAN_OUT,
+            lambda positions: raw_embeddings.stack([id_of[p] for p in positions])
+        )
+        return [(store.docstore.search(id_of[p]), float(d)) for p, d in zip(positions, distances)]
+    
+    def _search(self, query: str, k: int = None) -> List[tuple]:
+        """(Document, score) hits, routed or flat, as parent windows when chunks have them"""
+        # One bundle for the whole search, even if a reload swaps it meanwhile
+        index = self._index
+        small_to_big = len(index.parents) > 0
+        if k is None:
+            k = Config.PARENT_TOP_K if small_to_big else Config.TOP_K_RESULTS
+        # Neighbouring children often share a parent: over-fetch so k distinct parents remain
+        fetch = k * 4 if small_to_big else k
+        routed = self._routed_search(index, query, fetch) if Config.RETRIEVAL_MODE == 'two_stage' else None
+        results = routed if routed is not None else \
+            index.vector_store.similarity_search_with_score(query, k=fetch)
+        return index.parents.expand(results, k) if small_to_big else results
+    
+    def compress_context(self, query: str, documents: List['Document'],
+                         budget: int = None) -> Tuple[List['Document'], dict]:
+        """
+        Keep only the retrieved sentences closest to the query
+        
+        Uses the sentence embeddings cached at ingest time; the only
+        embedding call is for the query itself.
+        
+        Args:
+            query: User question
+            documents: Retrieved documents, best first
+            budget: Characters kept across all documents (default from config)
+            
+        Returns:
+            (compressed documents -- those with no sentence kept are dropped
+            and each keeps its uncompressed length as "original_chars" --,
+            size stats {original_chars, compressed_chars, reduction, ...})
+        """
+        from langchain.schema import Document
+        
+        budget = budget or Config.CONTEXT_BUDGET_CHARS
+        texts = [doc.page_content for doc in documents]
+        compressed, stats = self.sentences.compress(self.embeddings.embed_query(query), texts, budget)
+        results = [
+            Document(page_content=text, metadata=dict(doc.metadata, original_chars=len(doc.page_content)))
+            for doc, text in zip(documents, compressed) if text is not None
+        ]
+        print(f"+ Compressed context: {stats['original_chars']} -> {stats['compressed_chars']} chars "
+              f"({stats['reduction']:.0%} smaller, {stats['sentences_kept']}/{stats['sentences_total']} sentences)")
+        return results, stats
+    
+    def similarity_search(self, query: str, k: int = None) -> List['Document']:
         """
         Search for similar documents using cosine similarity
         
         Args:
             query: Search query
-            k: Number of results to return (default from config)
+            k: Number of results to return (default from config: TOP_K_RESULTS,
+               or PARENT_TOP_K parent windows for small-to-big chunks)
             
         Returns:
             List of similar Document objects
@@ -130,8 +546,7 @@ class VectorStoreManager:
                 print("X No vector store available")
                 return []
             
-            k = k or Config.TOP_K_RESULTS
-            results = self.vector_store.similarity_search(query, k=k)
+            results = [doc for doc, _ in self._search(query, k)]
             print(f"+ Found {len(results)} similar documents")
             return results
         except Exception as e:
@@ -154,8 +569,7 @@ class VectorStoreManager:
                 print("X No vector store available")
                 return []
             
-            k = k or Config.TOP_K_RESULTS
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            results = self._search(query, k)
             print(f"+ Found {len(results)} similar documents with scores")
             return results
         except Exception as e:
@@ -2,27 +2,125 @@
 Vector Store Manager for Ollama
 Uses Chroma DB with local embeddings
 """
-from typing import List, Optional
-from langchain.schema import Document
-from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.vectorstores import Chroma
+from typing import TYPE_CHECKING, List, NamedTuple, Optional, Tuple
 from config_ollama import ConfigOllama
+from context_compression import SENTENCES_FILE, SentenceStore
+from embedding_store import CHUNKS_FILE, EMBEDDINGS_FILE, write_chunks
+from parent_store import PARENTS_FILE, ParentStore
+from published import Published
 import os
+import threading
+import uuid
+
+if TYPE_CHECKING:
+    from langchain.schema import Document
+    from langchain_community.vectorstores import Chroma
+
+
+# Collections built by staging managers until adopt() swaps them in
+STAGING_COLLECTION_PREFIX = "staging-"
+
+
+def _chroma():
+    """Chroma store class, imported on first use (LangChain + chromadb are slow to import)"""
+    from langchain_community.vectorstores import Chroma
+    return Chroma
+
+
+class LoadedCollection(NamedTuple):
+    """Collection plus what searches read alongside it, published as one value"""
+    vector_store: Optional['Chroma']
+    # Parent windows of small-to-big child chunks (empty when not used)
+    parents: ParentStore
+    # Sentence embeddings of retrievable texts for context compression
+    sentences: SentenceStore
 
 
 class VectorStoreManagerOllama:
     """Manage Chroma vector store with Ollama embeddings"""
     
-    def __init__(self):
-        """Initialize vector store manager with Ollama"""
-        self.embeddings = OllamaEmbeddings(
-            base_url=ConfigOllama.OLLAMA_BASE_URL,
-            model=ConfigOllama.EMBEDDING_MODEL
-        )
-        self.vector_store = None
+    vector_store = Published('vector_store')
+    parents = Published('parents')
+    sentences = Published('sentences')
+    
+    def __init__(self, collection_name: str = None):
+        """
+        Initialize vector store manager with Ollama
+        
+        Args:
+            collection_name: Chroma collection to build into (default: the
+                live collection every manager loads)
+        """
+        self._embeddings = None
+        self.collection_name = collection_name
+        # Searches read this once; writers replace it under _publish_lock
+        self._index = LoadedCollection(None, ParentStore(), SentenceStore())
+        self._publish_lock = threading.Lock()
         print(f"Using Ollama embeddings: {ConfigOllama.EMBEDDING_MODEL}")
     
-    def create_vector_store(self, documents: List[Document]) -> Chroma:
+    def _publish(self, **fields):
+        """Replace fields of the live bundle (a swap, never an in-place change)"""
+        with self._publish_lock:
+            self._index = self._index._replace(**fields)
+    
+    @property
+    def embeddings(self):
+        """Ollama embeddings client (load-balanced for several URLs), built on first use"""
+        if self._embeddings is None:
+            if len(ConfigOllama.OLLAMA_BASE_URLS) > 1:
+                from ollama_pool import BalancedOllamaEmbeddings, get_load_balancer
+                self._embeddings = BalancedOllamaEmbeddings(
+                    balancer=get_load_balancer(),
+                    model=ConfigOllama.EMBEDDING_MODEL
+                )
+            else:
+                from langchain_community.embeddings import OllamaEmbeddings
+                self._embeddings = OllamaEmbeddings(
+                    base_url=ConfigOllama.OLLAMA_BASE_URLS[0],
+                    model=ConfigOllama.EMBEDDING_MODEL
+                )
+        return self._embeddings
+    
+    @classmethod
+    def staging(cls) -> 'VectorStoreManagerOllama':
+        """Manager that builds into a fresh collection, invisible to live queries until adopted"""
+        return cls(collection_name=f"{STAGING_COLLECTION_PREFIX}{uuid.uuid4().hex[:12]}")
+    
+    def adopt(self, staging: 'VectorStoreManagerOllama'):
+        """
+        Take over the collection built by a staging manager, with its
+        parent windows and sentence embeddings
+        
+        Queries switch to the new collection first; the old collection is
+        then dropped and the new one renamed to the live name, so it is
+        also what load_vector_store opens after a restart.
+        
+        Args:
+            staging: Manager created with staging()
+        """
+        with self._publish_lock:
+            self._index = staging._index
+        collection = staging.vector_store._collection
+        client = staging.vector_store._client
+        live_name = _chroma()._LANGCHAIN_DEFAULT_COLLECTION_NAME
+        if collection.name != live_name:
+            try:
+                client.delete_collection(live_name)
+            except ValueError:
+                pass  # first build: no live collection yet
+            collection.modify(name=live_name)
+        # Collections left behind by builds that were interrupted
+        for leftover in client.list_collections():
+            if leftover.name.startswith(STAGING_COLLECTION_PREFIX):
+                client.delete_collection(leftover.name)
+    
+    def discard(self):
+        """Drop a staging manager's collection (after a failed build)"""
+        if self.vector_store is not None and self.collection_name:
+            self.vector_store._client.delete_collection(self.collection_name)
+            self.vector_store = None
+    
+    def create_vector_store(self, documents: List['Document']) -> 'Chroma':
         """
         Create Chroma vector store from documents
         
@@ -34,42 +132,150 @@ class VectorStoreManagerOllama:
         """
         try:
             print(f"Creating embeddings for {len(documents)} documents...")
-            self.vector_store = Chroma.from_documents(
-                documents=documents,
-                embedding=self.embeddings,
-                persist_directory=ConfigOllama.VECTOR_STORE_PATH
-            )
+            self._embed_and_add(documents)
             print(f"+ Vector store created successfully")
             return self.vector_store
         except Exception as e:
             print(f"X Error creating vector store: {e}")
             return None
     
-    def add_documents(self, documents: List[Document]):
-        """Add documents to existing vector store"""
+    def add_documents(self, documents: List['Document']):
+        """Add documents to existing vector store (True if they were indexed)"""
         try:
             if self.vector_store is None:
                 print("No existing vector store. Creating new one...")
-                self.create_vector_store(documents)
-            else:
-                self.vector_store.add_documents(documents)
-                print(f"+ Added {len(documents)} documents to vector store")
+                return self.create_vector_store(documents) is not None
+            self._embed_and_add(documents)
+            print(f"+ Added {len(documents)} documents to vector store")
+            return True
         except Exception as e:
             print(f"X Error adding documents: {e}")
+            return False
+    
+    def _embed_and_add(self, documents: List['Document']):
+        texts = [doc.page_content for doc in documents]
+        vectors = self.embeddings.embed_documents(texts)
+        self.add_embeddings(texts, vectors, [doc.metadata for doc in documents])
+    
+    def add_embeddings(self, texts: List[str], embeddings: List[List[float]],
+                       metadatas: List[dict]):
+        """Index precomputed embeddings (used by the ingestion pipeline)"""
+        self.parents.absorb(metadatas)
+        if self.vector_store is None:
+            Chroma = _chroma()
+            self.vector_store = Chroma(
+                collection_name=self.collection_name or Chroma._LANGCHAIN_DEFAULT_COLLECTION_NAME,
+                persist_directory=ConfigOllama.VECTOR_STORE_PATH,
+                embedding_function=self.embeddings
+            )
+        
+        self.vector_store._collection.upsert(
+            ids=self._assign_ids(metadatas),
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas
+        )
+        if ConfigOllama.CONTEXT_COMPRESSION:
+            self._embed_sentences(texts, metadatas)
+    
+    def _embed_sentences(self, texts: List[str], metadatas: List[dict]):
+        """Embed the sentences of what retrieval returns: parent windows, else the chunks"""
+        retrievable = [self.parents.text((metadata or {}).get("parent_id")) or text
+                       for text, metadata in zip(texts, metadatas)]
+        sources = [(metadata or {}).get("source") for metadata in metadatas]
+        count = self.sentences.add(retrievable, sources, self.embeddings.embed_documents)
+        if count:
+            print(f"+ Embedded {count} sentences for context compression")
+    
+    def _assign_ids(self, metadatas: List[dict]) -> List[str]:
+        """Collection ids: the chunk id where it is unique, else a fresh uuid"""
+        wanted = [(metadata or {}).get("chunk_id") for metadata in metadatas]
+        lookup = [chunk_id for chunk_id in wanted if chunk_id]
+        existing = set(self.vector_store._collection.get(ids=lookup, include=[])["ids"]) if lookup else set()
+        ids = []
+        for chunk_id in wanted:
+            if not chunk_id or chunk_id in existing:
+                chunk_id = str(uuid.uuid4())
+            existing.add(chunk_id)
+            ids.append(chunk_id)
+        return ids
+    
+    def delete_sources(self, sources: List[str]) -> int:
+        """Remove every chunk whose metadata source is one of the given sources"""
+        if self.vector_store is None or not sources:
+            return 0
+        
+        collection = self.vector_store._collection
+        found = collection.get(where={"source": {"$in": list(sources)}}, include=[])
+        if found["ids"]:
+            collection.delete(ids=found["ids"])
+        self.parents.remove_sources(sources)
+        self.sentences.remove_sources(sources)
+        print(f"+ Removed {len(found['ids'])} chunks from {len(sources)} sources")
+        return len(found["ids"])
+    
+    def count(self) -> int:
+        """Number of indexed chunks (0 when no store is loaded)"""
+        if self.vector_store is None:
+            return 0
+        return self.vector_store._collection.count()
     
     def save_vector_store(self, path: str = None):
-        """Save vector store to disk (Chroma auto-persists)"""
+        """Save vector store to disk (Chroma auto-persists; raw embeddings are exported)"""
         try:
             if self.vector_store is None:
                 print("X No vector store to save")
                 return
             
             # Chroma auto-persists, just confirm
+            if ConfigOllama.STORE_RAW_EMBEDDINGS:
+                self._save_raw_embeddings(ConfigOllama.VECTOR_STORE_PATH)
+            if len(self.parents):
+                parents_path = os.path.join(ConfigOllama.VECTOR_STORE_PATH, PARENTS_FILE)
+                self.parents.save(parents_path + ".tmp")
+                os.replace(parents_path + ".tmp", parents_path)
+            if len(self.sentences):
+                sentences_path = os.path.join(ConfigOllama.VECTOR_STORE_PATH, SENTENCES_FILE)
+                self.sentences.save(sentences_path + ".tmp")
+                os.replace(sentences_path + ".tmp", sentences_path)
             print(f"+ Vector store saved to: {ConfigOllama.VECTOR_STORE_PATH}")
         except Exception as e:
             print(f"X Error saving vector store: {e}")
     
-    def load_vector_store(self, path: str = None) -> Optional[Chroma]:
+    def _save_raw_embeddings(self, path: str, page_size: int = 5000):
+        """
+        Export every vector as float16 embeddings.npy + chunks.jsonl
+        
+        Both files are written under temporary names and renamed into
+        place, so rebuild_index.py never reads a half-written pair.
+        """
+        import numpy as np
+        
+        collection = self.vector_store._collection
+        total = collection.count()
+        embeddings_tmp = os.path.join(path, f".{EMBEDDINGS_FILE}.tmp")
+        chunks_tmp = os.path.join(path, f".{CHUNKS_FILE}.tmp")
+        out = None
+        rows = []
+        for offset in range(0, total, page_size):
+            page = collection.get(include=["embeddings", "documents", "metadatas"],
+                                  limit=page_size, offset=offset)
+            vectors = np.asarray(page["embeddings"], dtype=np.float16)
+            if out is None:
+                out = np.lib.format.open_memmap(embeddings_tmp, mode='w+', dtype=np.float16,
+                                                shape=(total, vectors.shape[1]))
+            out[offset:offset + len(vectors)] = vectors
+            rows.extend(zip(page["ids"], page["documents"], page["metadatas"]))
+        if out is None:
+            return
+        out.flush()
+        del out
+        write_chunks(chunks_tmp, rows)
+        os.replace(embeddings_tmp, os.path.join(path, EMBEDDINGS_FILE))
+        os.replace(chunks_tmp, os.path.join(path, CHUNKS_FILE))
+        print(f"+ Exported {total} raw embeddings")
+    
+    def load_vector_store(self, path: str = None) -> Optional['Chroma']:
         """Load vector store from disk"""
         try:
             load_path = path or ConfigOllama.VECTOR_STORE_PATH
@@ -78,25 +284,63 @@ class VectorStoreManagerOllama:
                 print(f"X Vector store not found at: {load_path}")
                 return None
             
-            self.vector_store = Chroma(
+            vector_store = _chroma()(
                 persist_directory=load_path,
                 embedding_function=self.embeddings
             )
+            parents = ParentStore.load(os.path.join(load_path, PARENTS_FILE))
+            sentences = SentenceStore.load(os.path.join(load_path, SENTENCES_FILE))
+            with self._publish_lock:
+                self._index = LoadedCollection(vector_store, parents, sentences)
             print(f"+ Vector store loaded from: {load_path}")
             return self.vector_store
         except Exception as e:
             print(f"X Error loading vector store: {e}")
             return None
     
-    def similarity_search(self, query: str, k: int = None) -> List[Document]:
+    def _search(self, query: str, k: int = None) -> List[tuple]:
+        """(Document, score) hits, as parent windows when chunks have them"""
+        # One bundle for the whole search, even if a reload swaps it meanwhile
+        index = self._index
+        small_to_big = len(index.parents) > 0
+        if k is None:
+            k = ConfigOllama.PARENT_TOP_K if small_to_big else ConfigOllama.TOP_K_RESULTS
+        # Neighbouring children often share a parent: over-fetch so k distinct parents remain
+        results = index.vector_store.similarity_search_with_score(query, k=k * 4 if small_to_big else k)
+        return index.parents.expand(results, k) if small_to_big else results
+    
+    def compress_context(self, query: str, documents: List['Document'],
+                         budget: int = None) -> Tuple[List['Document'], dict]:
+        """
+        Keep only the retrieved sentences closest to the query
+        
+        Uses the sentence embeddings cached at ingest time; the only
+        embedding call is for the query itself.
+        
+        Returns:
+            (compressed documents, size stats) as in VectorStoreManager
+        """
+        from langchain.schema import Document
+        
+        budget = budget or ConfigOllama.CONTEXT_BUDGET_CHARS
+        texts = [doc.page_content for doc in documents]
+        compressed, stats = self.sentences.compress(self.embeddings.embed_query(query), texts, budget)
+        results = [
+            Document(page_content=text, metadata=dict(doc.metadata, original_chars=len(doc.page_content)))
+            for doc, text in zip(documents, compressed) if text is not None
+        ]
+        print(f"+ Compressed context: {stats['original_chars']} -> {stats['compressed_chars']} chars "
+              f"({stats['reduction']:.0%} smaller, {stats['sentences_kept']}/{stats['sentences_total']} sentences)")
+        return results, stats
+    
+    def similarity_search(self, query: str, k: int = None) -> List['Document']:
         """Search for similar documents"""
         try:
             if self.vector_store is None:
                 print("X No vector store available")
                 return []
             
-            k = k or ConfigOllama.TOP_K_RESULTS
-            results = self.vector_store.similarity_search(query, k=k)
+            results = [doc for doc, _ in self._search(query, k)]
             print(f"+ Found {len(results)} similar documents")
             return results
         except Exception as e:
@@ -110,8 +354,7 @@ class VectorStoreManagerOllama:
                 print("X No vector store available")
                 return []
             
-            k = k or ConfigOllama.TOP_K_RESULTS
-            results = self.vector_store.similarity_search_with_score(query, k=k)
+            results = self._search(query, k)
             print(f"+ Found {len(results)} similar documents with scores")
             return results
         except Exception as e:
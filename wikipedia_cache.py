@@ -0,0 +1,334 @@
+"""
+Wikipedia Cache Module
+Cached, concurrent Wikipedia loading through the MediaWiki API, plus
+streaming ingestion from a local pages-articles XML dump.
+Search results are cached per (query, lang) and article text per
+(lang, title, revision), so unchanged articles are never re-downloaded
+and a knowledge base can be rebuilt without network access.
+"""
+from typing import Dict, Iterator, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+import bz2
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+import requests
+from langchain.schema import Document
+from rate_limit import RateLimiter
+from source_cache import DiskCache
+from config import Config
+
+_TITLES_PER_REQUEST = 50  # MediaWiki limit for titles= on anonymous requests
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a query or article is not cached"""
+
+
+def _summary(content: str) -> str:
+    """Lead section of a plain-text extract (text before the first heading)"""
+    return re.split(r"\n+==", content, maxsplit=1)[0].strip()
+
+
+class WikipediaArticleStore:
+    """Wikipedia search + article fetcher backed by a DiskCache"""
+
+    def __init__(self, cache_dir: str, ttl: float, workers: int, rate: float,
+                 lang: str = "en", doc_chars_max: int = 4000, offline: bool = False,
+                 timeout: float = 30):
+        """
+        Initialize store
+
+        Args:
+            cache_dir: Cache root directory
+            ttl: Seconds a cached search result is used before re-checking revisions
+            workers: Concurrent API requests
+            rate: Maximum API requests per second across all workers
+            lang: Wikipedia language edition
+            doc_chars_max: Article text is truncated to this length (like WikipediaLoader)
+            offline: Serve only from cache and never touch the network
+            timeout: Per-request timeout in seconds
+        """
+        self.cache = DiskCache(cache_dir, 'wikipedia')
+        self.ttl = ttl
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate, burst=self.workers)
+        self.lang = lang
+        self.doc_chars_max = doc_chars_max
+        self.offline = offline
+        self.timeout = timeout
+        self.api_url = f"https://{lang}.wikipedia.org/w/api.php"
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "AI-Teaching-Assistant/1.0"
+
+        self.counters = {"cached": 0, "downloaded": 0, "api_requests": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _api(self, **params) -> Dict:
+        self.limiter.acquire()
+        self._count("api_requests")
+        params.update(action="query", format="json", formatversion=2)
+        response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get("query", {})
+
+    def _search(self, query: str, max_docs: int) -> List[str]:
+        result = self._api(list="search", srsearch=query[:300], srlimit=max_docs, srprop="")
+        return [hit["title"] for hit in result.get("search", [])]
+
+    def _latest_revisions(self, titles: Sequence[str]) -> Dict[str, Dict]:
+        """Latest revision id and URL per title, batched 50 titles per request"""
+        batches = [titles[i:i + _TITLES_PER_REQUEST] for i in range(0, len(titles), _TITLES_PER_REQUEST)]
+
+        def lookup(batch):
+            result = self._api(prop="info", inprop="url", redirects=1, titles="|".join(batch))
+            aliases = {r["from"]: r["to"] for r in result.get("redirects", [])}
+            aliases.update({n["from"]: n["to"] for n in result.get("normalized", [])})
+            pages = {
+                page["title"]: {"title": page["title"], "revision": page["lastrevid"], "url": page["fullurl"]}
+                for page in result.get("pages", []) if "missing" not in page
+            }
+            return {title: pages.get(aliases.get(title, title)) for title in batch}
+
+        info = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for found in executor.map(lookup, batches):
+                info.update({title: page for title, page in found.items() if page})
+        return info
+
+    def _article_key(self, title: str, revision: int) -> str:
+        return f"article:{self.lang}:{title}:{revision}"
+
+    def _fetch_article(self, page: Dict) -> Dict:
+        result = self._api(prop="extracts", explaintext=1, titles=page["title"])
+        pages = result.get("pages", [])
+        content = pages[0].get("extract", "") if pages else ""
+        article = dict(page, content=content)
+        self.cache.put(self._article_key(page["title"], page["revision"]), article)
+        self._count("downloaded")
+        return article
+
+    def _resolve(self, query: str, max_docs: int) -> List[Dict]:
+        """(title, revision, url) for a query's top results, from cache when fresh"""
+        key = f"query:{self.lang}:{max_docs}:{query}"
+        entry = self.cache.get(key)
+        if entry is not None and (self.offline or time.time() - entry["fetched_at"] < self.ttl):
+            return entry["pages"]
+        if self.offline:
+            raise OfflineCacheMiss(f"Wikipedia query '{query}' is not cached")
+        return None
+
+    def load(self, queries: Sequence[str], max_docs: int) -> List[Document]:
+        """
+        Load the top articles for many queries concurrently
+
+        Stale or uncached queries are searched again and their current
+        revision ids looked up in batches; article text is downloaded only
+        for (title, revision) pairs missing from the cache.
+
+        Args:
+            queries: Search queries
+            max_docs: Articles per query
+
+        Returns:
+            Documents in query order, then search-rank order
+        """
+        self.counters = dict.fromkeys(self.counters, 0)
+        resolved = {}
+        stale = []
+        for query in queries:
+            try:
+                pages = self._resolve(query, max_docs)
+            except OfflineCacheMiss as e:
+                print(f"X Error loading Wikipedia: {e}")
+                continue
+            if pages is None:
+                stale.append(query)
+            else:
+                resolved[query] = pages
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                searches = dict(zip(stale, executor.map(
+                    lambda q: self._safe(self._search, q, max_docs), stale)))
+            titles = sorted({t for found in searches.values() if found for t in found})
+            revisions = self._safe(self._latest_revisions, titles) if titles else {}
+            for query, found in searches.items():
+                # Failed lookups are reported, not cached
+                if found is None or revisions is None:
+                    continue
+                pages = [revisions[t] for t in found if t in revisions]
+                self.cache.put(f"query:{self.lang}:{max_docs}:{query}",
+                               {"pages": pages, "fetched_at": time.time()})
+                resolved[query] = pages
+
+        wanted = [page for query in queries for page in resolved.get(query, [])]
+        articles = {}
+        missing = []
+        for page in wanted:
+            cached = self.cache.get(self._article_key(page["title"], page["revision"]))
+            if cached is not None:
+                articles[(page["title"], page["revision"])] = cached
+                self._count("cached")
+            elif self.offline:
+                print(f"X Error loading Wikipedia: article '{page['title']}' is not cached")
+            elif page not in missing:
+                missing.append(page)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for page, article in zip(missing, executor.map(
+                    lambda p: self._safe(self._fetch_article, p), missing)):
+                if article is not None:
+                    articles[(page["title"], page["revision"])] = article
+
+        documents = []
+        for page in wanted:
+            article = articles.get((page["title"], page["revision"]))
+            if article is not None:
+                documents.append(self._document(article))
+
+        print(f"+ Loaded {len(documents)} Wikipedia articles for {len(queries)} queries "
+              f"(cached: {self.counters['cached']}, downloaded: {self.counters['downloaded']}, "
+              f"API requests: {self.counters['api_requests']})")
+        return documents
+
+    @staticmethod
+    def _safe(fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"X Error loading Wikipedia: {e}")
+            return None
+
+    def _document(self, article: Dict) -> Document:
+        content = article["content"]
+        return Document(
+            page_content=content[:self.doc_chars_max],
+            metadata={
+                "title": article["title"],
+                "summary": _summary(content),
+                "source": article["url"],
+                "revision_id": article["revision"]
+            }
+        )
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+_WIKITEXT_RULES = [
+    (re.compile(r"<!--.*?-->", re.S), ""),
+    (re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.S), ""),
+    (re.compile(r"\{\|.*?\|\}", re.S), ""),                       # tables
+    (re.compile(r"\[\[(?:File|Image|Category):[^\]]*\]\]", re.I), ""),
+    (re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]"), r"\1"),      # [[link|text]] -> text
+    (re.compile(r"\[https?://\S+\s*([^\]]*)\]"), r"\1"),         # [url text] -> text
+    (re.compile(r"'{2,}"), ""),                                  # bold/italic
+    (re.compile(r"<[^>]+>"), ""),
+    (re.compile(r"^=+\s*(.*?)\s*=+\s*$", re.M), r"\1"),          # == Heading == -> Heading
+    (re.compile(r"\n{3,}"), "\n\n"),
+]
+
+
+def wikitext_to_text(wikitext: str) -> str:
+    """Approximate plain text from wikitext (templates, refs and markup removed)"""
+    # Templates nest, so strip innermost {{...}} until none remain
+    previous = None
+    while previous != wikitext:
+        previous = wikitext
+        wikitext = re.sub(r"\{\{[^{}]*\}\}", "", wikitext)
+    for pattern, replacement in _WIKITEXT_RULES:
+        wikitext = pattern.sub(replacement, wikitext)
+    return wikitext.strip()
+
+
+def iter_wikipedia_dump(path: str, lang: str = "en", titles: Optional[Sequence[str]] = None,
+                        max_pages: int = 0) -> Iterator[Document]:
+    """
+    Stream articles from a pages-articles XML dump (.xml or .xml.bz2)
+
+    Pages are parsed one at a time with iterparse and cleared afterwards,
+    so memory stays flat regardless of dump size. Redirects and non-article
+    namespaces are skipped.
+
+    Args:
+        path: Dump file path
+        lang: Language edition (used to build source URLs)
+        titles: Only yield these titles (default: all articles)
+        max_pages: Stop after this many articles (0 = no limit)
+
+    Yields:
+        One Document per article
+    """
+    wanted = set(titles) if titles else None
+    opener = bz2.open if path.endswith('.bz2') else open
+    count = 0
+    with opener(path, 'rb') as f:
+        page = {}
+        root = None
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            if root is None:
+                root = elem
+            if event == "start":
+                continue
+            name = _local_name(elem.tag)
+            if name in ("title", "ns", "text") and name not in page:
+                page[name] = elem.text or ""
+            elif name == "redirect":
+                page["redirect"] = True
+            elif name == "id" and "text" not in page:
+                # Page id, then revision id (contributor ids come later)
+                page.setdefault("_ids", []).append(elem.text)
+            elif name == "revision":
+                ids = page.get("_ids", [])
+                page["revision"] = int(ids[1]) if len(ids) > 1 else None
+            elif name == "page":
+                title = page.get("title", "")
+                if (page.get("ns") == "0" and not page.get("redirect")
+                        and (wanted is None or title in wanted)):
+                    wikitext = page.get("text", "")
+                    lead = re.split(r"^==", wikitext, maxsplit=1, flags=re.M)[0]
+                    yield Document(
+                        page_content=wikitext_to_text(wikitext),
+                        metadata={
+                            "title": title,
+                            "summary": wikitext_to_text(lead),
+                            "source": f"https://{lang}.wikipedia.org/wiki/{quote(title.replace(' ', '_'))}",
+                            "revision_id": page.get("revision")
+                        }
+                    )
+                    count += 1
+                    if max_pages and count >= max_pages:
+                        return
+                page = {}
+                # Drop the finished page from the tree so memory stays flat
+                root.clear()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_wikipedia_store() -> WikipediaArticleStore:
+    """Process-wide store configured from Config (shares one rate limit)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = WikipediaArticleStore(
+                Config.CACHE_DIR,
+                ttl=Config.WIKIPEDIA_CACHE_TTL,
+                workers=Config.WIKIPEDIA_FETCH_WORKERS,
+                rate=Config.WIKIPEDIA_RATE_LIMIT,
+                lang=Config.WIKIPEDIA_LANG,
+                doc_chars_max=Config.WIKIPEDIA_DOC_CHARS_MAX,
+                offline=Config.WIKIPEDIA_OFFLINE
+            )
+        return _store
@@ -0,0 +1,258 @@
+"""
+YouTube Cache Module
+Cached, rate-limited, concurrent YouTube transcript loading.
+Transcripts and video info are cached per video id; playlist expansions
+are cached per playlist id, so a course can be rebuilt fully offline.
+"""
+from typing import Dict, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlparse
+import hashlib
+import threading
+import time
+from langchain.schema import Document
+from youtube_transcript_api import NoTranscriptFound, TranscriptsDisabled, YouTubeTranscriptApi
+from pytube import Playlist, YouTube
+from rate_limit import RateLimiter
+from source_cache import DiskCache
+from config import Config
+
+
+_YOUTUBE_HOSTS = {
+    "youtu.be", "m.youtube.com", "youtube.com", "www.youtube.com",
+    "www.youtube-nocookie.com", "vid.plus"
+}
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a video or playlist is not cached"""
+
+
+def extract_video_id(url: str) -> str:
+    """
+    Video id from a YouTube URL (same rules as YoutubeLoader.extract_video_id,
+    without importing every LangChain document loader)
+
+    Args:
+        url: watch, youtu.be, embed or shorts URL
+
+    Returns:
+        11-character video id
+    """
+    parsed = urlparse(url)
+    video_id = None
+    if parsed.scheme in ("http", "https") and parsed.netloc in _YOUTUBE_HOSTS:
+        if parsed.path.endswith("/watch"):
+            video_id = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            video_id = parsed.path.lstrip("/").split("/")[-1]
+    if not video_id or len(video_id) != 11:
+        raise ValueError(f"Could not determine the video ID for the URL {url}")
+    return video_id
+
+
+def playlist_id(url: str) -> Optional[str]:
+    """Playlist id for /playlist URLs (watch URLs with a list= are single videos)"""
+    parsed = urlparse(url)
+    if parsed.path.rstrip('/').endswith('/playlist'):
+        return parse_qs(parsed.query).get('list', [None])[0]
+    return None
+
+
+class YouTubeTranscriptStore:
+    """Transcript + video info fetcher backed by a DiskCache"""
+
+    def __init__(self, cache_dir: str, ttl: float, workers: int, rate: float,
+                 languages: Sequence[str] = ("en",), offline: bool = False):
+        """
+        Initialize store
+
+        Args:
+            cache_dir: Cache root directory (e.g. a directory of recorded fixtures)
+            ttl: Seconds a cached entry is used without revalidation
+            workers: Concurrent video fetches
+            rate: Maximum YouTube requests per second across all workers
+            languages: Preferred transcript languages, in order
+            offline: Serve only from cache and never touch the network
+        """
+        self.cache = DiskCache(cache_dir, 'youtube')
+        self.ttl = ttl
+        self.workers = max(1, workers)
+        self.limiter = RateLimiter(rate, burst=self.workers)
+        self.languages = list(languages)
+        self.offline = offline
+
+        self.counters = {"cached": 0, "revalidated": 0, "downloaded": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _transcript_list(self, video_id: str):
+        self.limiter.acquire()
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+
+    @staticmethod
+    def _validator(transcript_list) -> str:
+        """Fingerprint of the available transcripts (cheap to obtain, like an ETag)"""
+        tracks = sorted(
+            f"{t.language_code}:{int(t.is_generated)}" for t in transcript_list
+        )
+        return hashlib.sha1("|".join(tracks).encode('utf-8')).hexdigest()
+
+    def _fetch(self, video_id: str, transcript_list) -> Optional[Dict]:
+        """Download transcript text and video info (same shape as YoutubeLoader)"""
+        try:
+            transcript = transcript_list.find_transcript(self.languages)
+        except NoTranscriptFound:
+            transcript = transcript_list.find_transcript(["en"])
+        self.limiter.acquire()
+        pieces = transcript.fetch()
+        text = " ".join(piece["text"].strip(" ") for piece in pieces)
+
+        self.limiter.acquire()
+        yt = YouTube(f"https://www.youtube.com/watch?v={video_id}")
+        metadata = {
+            "source": video_id,
+            "title": yt.title or "Unknown",
+            "description": yt.description or "Unknown",
+            "view_count": yt.views or 0,
+            "thumbnail_url": yt.thumbnail_url or "Unknown",
+            "publish_date": yt.publish_date.strftime("%Y-%m-%d %H:%M:%S")
+            if yt.publish_date
+            else "Unknown",
+            "length": yt.length or 0,
+            "author": yt.author or "Unknown",
+        }
+        return {"text": text, "metadata": metadata}
+
+    def get(self, video_id: str) -> Optional[Document]:
+        """
+        Transcript Document for a video, from cache when fresh
+
+        Fresh entries (younger than ttl) are used as-is. Stale entries are
+        revalidated by listing the video's transcripts: if the listing is
+        unchanged the entry is kept and only its timestamp is renewed.
+
+        Args:
+            video_id: YouTube video id
+
+        Returns:
+            Document, or None if the video has transcripts disabled
+        """
+        key = f"video:{video_id}"
+        entry = self.cache.get(key)
+
+        if entry is not None and (self.offline or time.time() - entry["fetched_at"] < self.ttl):
+            self._count("cached")
+            return self._document(entry)
+        if self.offline:
+            raise OfflineCacheMiss(f"Video {video_id} is not cached")
+
+        try:
+            transcript_list = self._transcript_list(video_id)
+            validator = self._validator(transcript_list)
+        except TranscriptsDisabled:
+            # Cached too, so offline rebuilds know the video has no transcript
+            transcript_list, validator = None, "disabled"
+
+        if entry is not None and entry.get("validator") == validator:
+            self._count("revalidated")
+        elif transcript_list is None:
+            entry = {"text": None, "metadata": {"source": video_id}, "validator": validator}
+            self._count("downloaded")
+        else:
+            entry = self._fetch(video_id, transcript_list)
+            entry["validator"] = validator
+            self._count("downloaded")
+        entry["fetched_at"] = time.time()
+        self.cache.put(key, entry)
+        return self._document(entry)
+
+    @staticmethod
+    def _document(entry: Dict) -> Optional[Document]:
+        if entry.get("text") is None:
+            return None
+        return Document(page_content=entry["text"], metadata=dict(entry["metadata"]))
+
+    def expand(self, url: str) -> List[str]:
+        """
+        Video ids for a video or playlist URL (playlist listings are cached too)
+
+        Args:
+            url: Video or playlist URL
+
+        Returns:
+            Video ids in playlist order
+        """
+        list_id = playlist_id(url)
+        if list_id is None:
+            return [extract_video_id(url)]
+
+        key = f"playlist:{list_id}"
+        entry = self.cache.get(key)
+        if entry is not None and (self.offline or time.time() - entry["fetched_at"] < self.ttl):
+            return entry["video_ids"]
+        if self.offline:
+            raise OfflineCacheMiss(f"Playlist {list_id} is not cached")
+
+        self.limiter.acquire()
+        video_ids = [extract_video_id(u) for u in Playlist(url).video_urls]
+        self.cache.put(key, {"video_ids": video_ids, "fetched_at": time.time()})
+        return video_ids
+
+    def load(self, urls: Sequence[str]) -> List[Document]:
+        """
+        Load many videos/playlists concurrently, preserving input order
+
+        Failures are reported and skipped, like the other loaders.
+
+        Args:
+            urls: Video and/or playlist URLs
+
+        Returns:
+            List of transcript Documents
+        """
+        self.counters = dict.fromkeys(self.counters, 0)
+        video_ids = []
+        for url in urls:
+            try:
+                video_ids.extend(self.expand(url))
+            except Exception as e:
+                print(f"X Error expanding YouTube URL {url}: {e}")
+
+        def load_one(video_id):
+            try:
+                return self.get(video_id)
+            except Exception as e:
+                print(f"X Error loading YouTube video {video_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            documents = [doc for doc in executor.map(load_one, video_ids) if doc is not None]
+
+        print(f"+ Loaded {len(documents)} YouTube transcripts "
+              f"(cached: {self.counters['cached']}, revalidated: {self.counters['revalidated']}, "
+              f"downloaded: {self.counters['downloaded']})")
+        return documents
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_youtube_store() -> YouTubeTranscriptStore:
+    """Process-wide store configured from Config (shares one rate limit)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = YouTubeTranscriptStore(
+                Config.YOUTUBE_CACHE_DIR or Config.CACHE_DIR,
+                ttl=Config.YOUTUBE_CACHE_TTL,
+                workers=Config.YOUTUBE_FETCH_WORKERS,
+                rate=Config.YOUTUBE_RATE_LIMIT,
+                languages=Config.YOUTUBE_LANGUAGES,
+                offline=Config.YOUTUBE_OFFLINE
+            )
+        return _store